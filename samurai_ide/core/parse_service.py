@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+
+from PyQt5.QtCore import QObject
+from PyQt5.QtCore import QThread
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtCore import pyqtSlot
+
+from samurai_ide.tools import parse_cache
+
+
+class _ParseWorker(QObject):
+
+    parsed = pyqtSignal('QString', 'PyQt_PyObject')
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._sources = {}
+
+    def set_source(self, path, source):
+        """Called from the GUI thread, only the last source of each path
+        is parsed"""
+        with self._lock:
+            self._sources[path] = source
+
+    @pyqtSlot('QString')
+    def parse(self, path):
+        with self._lock:
+            source = self._sources.pop(path, None)
+        if source is None:
+            # Already parsed by a previous request
+            return
+        self.parsed.emit(path, parse_cache.parse(path, source))
+
+
+class ParseService(QObject):
+    """Parse the python sources of the editors in a worker thread.
+
+    The results are shared through tools.parse_cache, so the checkers and
+    the locator get the same AST and symbols without parsing again.
+
+    SIGNALS:
+    @parsed(QString, PyQt_PyObject)  path, parse_cache.ParseResult
+    """
+
+    parsed = pyqtSignal('QString', 'PyQt_PyObject')
+    _parseRequested = pyqtSignal('QString')
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._worker = _ParseWorker()
+        self._thread = QThread(self)
+        self._worker.moveToThread(self._thread)
+        self._parseRequested.connect(self._worker.parse)
+        self._worker.parsed.connect(self.parsed)
+        self._thread.start()
+
+    def request(self, path, source):
+        """Emit parsed for source, at once if the result is cached"""
+        result = parse_cache.cache.lookup(path, source)
+        if result is not None:
+            self.parsed.emit(path, result)
+            return
+        self._worker.set_source(path, source)
+        self._parseRequested.emit(path)
+
+    def shutdown(self):
+        self._thread.quit()
+        self._thread.wait()
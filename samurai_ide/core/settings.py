@@ -114,6 +114,14 @@ HIDE_TOOLBAR = PYTHON_EXEC_CONFIGURED_BY_USER = False
 
 
 PYTHON_EXEC = sys.executable
+# Lines kept in the output of the programs executed, 0: No limit
+OUTPUT_MAX_LINES = 10000
+# Save the output of the programs executed to a file instead of memory
+OUTPUT_TO_FILE = False
+# Lines kept in the python console, 0: No limit
+CONSOLE_MAX_LINES = 5000
+# Targets of a project running at the same time, 0: one per CPU
+MAX_PARALLEL_RUNS = 0
 
 SESSIONS = {}
 
@@ -171,6 +179,10 @@ NOTIFICATION_POSITION = 0
 NOTIFICATION_COLOR = "#000"
 
 LAST_CLEAN_LOCATOR = None
+# Processes used to index the projects, 0: One per CPU
+LOCATOR_WORKERS = 0
+# Processes used to lint the projects, 0: One per CPU
+LINT_WORKERS = 0
 
 
 ###############################################################################
@@ -226,6 +238,16 @@ RELOAD_FILE = 0
 # MINIMAP
 ###############################################################################
 
+###############################################################################
+# FIND IN FILES
+###############################################################################
+
+# 0: One worker per CPU
+FIND_IN_FILES_WORKERS = 0
+FIND_IN_FILES_USE_PROCESSES = True
+# Narrow the searches with a trigram index of each project
+FIND_IN_FILES_USE_INDEX = True
+
 ###############################################################################
 # FILE MANAGER
 ###############################################################################
@@ -400,6 +422,10 @@ def load_settings():
     # global UI_LAYOUT
     global PYTHON_EXEC
     global EXECUTION_OPTIONS
+    global OUTPUT_MAX_LINES
+    global OUTPUT_TO_FILE
+    global MAX_PARALLEL_RUNS
+    global CONSOLE_MAX_LINES
     # global SWAP_FILE
     # global SWAP_FILE_INTERVAL
     # global PYTHON_EXEC_CONFIGURED_BY_USER
@@ -459,6 +485,8 @@ def load_settings():
     global NOTIFICATION_ON_SAVE
     # global NOTIFICATION_COLOR
     global LAST_CLEAN_LOCATOR
+    global LOCATOR_WORKERS
+    global LINT_WORKERS
     global SHOW_LINE_NUMBERS
     global SHOW_TEXT_CHANGES
     global RELOAD_FILE
@@ -468,6 +496,9 @@ def load_settings():
     global HIGHLIGHT_CURRENT_LINE_MODE
     global BRACE_MATCHING
     global EDITOR_SCHEME
+    global FIND_IN_FILES_WORKERS
+    global FIND_IN_FILES_USE_PROCESSES
+    global FIND_IN_FILES_USE_INDEX
     # General
     HIDE_TOOLBAR = qsettings.value("window/hide_toolbar", False, type=bool)
     # TOOLBAR_AREA = qsettings.value('preferences/general/toolbarArea', 1,
@@ -492,6 +523,14 @@ def load_settings():
     # EXECUTION OPTIONS
     EXECUTION_OPTIONS = qsettings.value(
         'execution/executionOptions', defaultValue='', type=str)
+    OUTPUT_MAX_LINES = qsettings.value(
+        'execution/outputMaxLines', 10000, type=int)
+    OUTPUT_TO_FILE = qsettings.value(
+        'execution/outputToFile', False, type=bool)
+    MAX_PARALLEL_RUNS = qsettings.value(
+        'execution/maxParallelRuns', 0, type=int)
+    CONSOLE_MAX_LINES = qsettings.value(
+        'execution/consoleMaxLines', 5000, type=int)
     #    'preferences/general/supportedExtensions', []))]
     WORKSPACE = qsettings.value("ide/workspace", "", type=str)
     # Editor
@@ -582,7 +621,16 @@ def load_settings():
     #    'preferences/editor/checkForDocstrings', False, type=bool)
     #    'interface/notification_position', 1, type=int)
     #    'preferences/general/notification_color', "#222", type='QString')
+    # Find in Files
+    FIND_IN_FILES_WORKERS = qsettings.value(
+        "ide/findInFiles/workers", 0, type=int)
+    FIND_IN_FILES_USE_PROCESSES = qsettings.value(
+        "ide/findInFiles/useProcesses", True, type=bool)
+    FIND_IN_FILES_USE_INDEX = qsettings.value(
+        "ide/findInFiles/useIndex", True, type=bool)
     LAST_CLEAN_LOCATOR = qsettings.value("ide/cleanLocator", None)
+    LOCATOR_WORKERS = qsettings.value("ide/locatorWorkers", 0, type=int)
+    LINT_WORKERS = qsettings.value("ide/lintWorkers", 0, type=int)
     from samurai_ide.extensions import handlers
     handlers.init_basic_handlers()
     clean_locator_db(qsettings)
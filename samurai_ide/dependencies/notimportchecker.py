@@ -10,6 +10,9 @@ __status__ = "Beta"
 import ast
 import os
 import sys
+import json
+import importlib.util
+from importlib.machinery import PathFinder
 
 
 class SearchImport(ast.NodeVisitor):
@@ -33,6 +36,9 @@ class SearchImport(ast.NodeVisitor):
         """Visit Import from
         This is the visit from of ast module
         """
+        if stmt.level:
+            # Relative imports are resolved inside the package
+            return
         module_name = stmt.module
         names = stmt.names
         names_dict = {}
@@ -127,7 +133,7 @@ class Checker(object):
             return self._imports
         return (-1)
 
-    def get_not_imports_on_file(self, stmt, path=None):
+    def get_not_imports_on_file(self, stmt, path=None, resolver=None):
         """Get imports that dont exist on the file
 
         Parameters
@@ -139,6 +145,11 @@ class Checker(object):
 
         path: string -> default None. path is the basename
         of the file.
+
+        resolver: callable -> default None. Receives the list of
+        module names and the sys.path entries to add and returns the
+        names that can't be found. By default they are looked up in
+        this interpreter without importing them (see find_missing).
         """
         if (stmt == -1):
             self._import_error_list = {}
@@ -146,33 +157,74 @@ class Checker(object):
 
         if path is None:
             path = self._path
-        workspace = os.getcwd()
-        dn = os.path.dirname(path)
-        if dn == '':  # if path file is in the current folder
-            os.chdir(workspace)
-        else:
-            os.chdir(dn)  # if path is complete
-        for key, value in stmt.items():
-            for mod_name in value['mod_name']:
-                try:
-                    if key == mod_name:
-                        exec('import {}'.format(key))
-                    else:
-                        exec('from {} import {}'.format(key, mod_name))
-                except RuntimeError as e:
-                    pass
-                except ImportError as e:
-                    self._import_error_list.setdefault(key,
-                                                       {'mod_name': mod_name,
-                                                        'lineno':
-                                                        value['lineno']})
-        os.chdir(workspace)
+        if resolver is None:
+            resolver = find_missing
+        # The folder of the file is the first entry of sys.path when it runs
+        folder = os.path.dirname(os.path.abspath(path))
+        for key in resolver(list(stmt.keys()), [folder]):
+            value = stmt[key]
+            self._import_error_list.setdefault(key,
+                                               {'mod_name': value['mod_name'],
+                                                'lineno': value['lineno']})
         if len(self._import_error_list) == 0:
             return None
         else:
             return self._import_error_list
 
 
+def module_exists(name):
+    """Return True if the module can be imported with the current sys.path.
+
+    Only the packages are searched, the modules are not executed. When a
+    parent is a plain module (like os.path) the parents are imported."""
+    spec = None
+    parts = name.split('.')
+    for i in range(len(parts)):
+        fullname = '.'.join(parts[:i + 1])
+        try:
+            if spec is None:
+                spec = importlib.util.find_spec(fullname)
+            elif spec.submodule_search_locations is None:
+                # The rest of the name is an attribute of a module
+                return importlib.util.find_spec(name) is not None
+            else:
+                spec = PathFinder.find_spec(
+                    fullname, spec.submodule_search_locations)
+        except Exception:
+            # Can't know without running the module, don't report it
+            return True
+        if spec is None:
+            return False
+    return True
+
+
+def find_missing(modules, path=()):
+    """Return the modules that can't be found with path added at the
+    beginning of sys.path"""
+    old_path = list(sys.path)
+    sys.path[:0] = [entry for entry in path if entry not in sys.path]
+    importlib.invalidate_caches()
+    try:
+        return [name for name in modules if not module_exists(name)]
+    finally:
+        sys.path[:] = old_path
+
+
+def serve(stdin=sys.stdin, stdout=sys.stdout):
+    """Answer find_missing requests, one JSON object per line:
+    {"modules": [...], "path": [...]} -> {"missing": [...],
+                                          "sys_path": [...]}
+
+    Used to resolve the modules with the interpreter of a project,
+    sys_path lets the caller notice packages installed later."""
+    for line in stdin:
+        request = json.loads(line)
+        missing = find_missing(request['modules'], request.get('path', []))
+        stdout.write(json.dumps(
+            {'missing': missing, 'sys_path': sys.path}) + '\n')
+        stdout.flush()
+
+
 def print_report(dict_not_imports):
     """Print the report of not imports on the file"""
     if dict_not_imports is None:
@@ -192,6 +244,11 @@ def print_report(dict_not_imports):
 
 
 if __name__ == "__main__":
+    if sys.argv[1:] == ['--serve']:
+        # Don't resolve the modules next to this script
+        del sys.path[0]
+        serve()
+        sys.exit(0)
     files = sys.argv[1:]
     checker_list = dict()
     for f in files:
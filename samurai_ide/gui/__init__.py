@@ -99,6 +99,7 @@ def start_ide(app, filenames, projects_path, extra_plugins, linenos):
     import samurai_ide.gui.tools_dock.tools_dock  # noqa
     import samurai_ide.gui.tools_dock.console_widget  # noqa
     import samurai_ide.gui.tools_dock.run_widget  # noqa
+    import samurai_ide.gui.tools_dock.profiler_widget  # noqa
     import samurai_ide.gui.tools_dock.find_in_files  # noqa
 
     import samurai_ide.gui.main_panel.main_container  # noqa
@@ -120,6 +120,9 @@ class GeneralExecution(QWidget):
 
         box.addWidget(group_python_path)
         box.addWidget(group_python_opt)
+        self._check_output_to_file = QCheckBox(
+            translations.TR_OUTPUT_TO_FILE)
+        box.addWidget(self._check_output_to_file)
         box.addItem(QSpacerItem(0, 0,
                     QSizePolicy.Expanding, QSizePolicy.Expanding))
 
@@ -149,6 +152,7 @@ class GeneralExecution(QWidget):
             index = self._combo_warning.findText(opt)
 
             self._combo_warning.setCurrentIndex(index)
+        self._check_output_to_file.setChecked(settings.OUTPUT_TO_FILE)
         # Connections
         self._preferences.savePreferences.connect(self.save)
         btn_choose_path.clicked.connect(self._load_python_path)
@@ -194,6 +198,9 @@ class GeneralExecution(QWidget):
         settings.EXECUTION_OPTIONS = options
         qsettings.setValue("executionOptions", options)
 
+        settings.OUTPUT_TO_FILE = self._check_output_to_file.isChecked()
+        qsettings.setValue("outputToFile", settings.OUTPUT_TO_FILE)
+
         qsettings.endGroup()
 
 
@@ -114,6 +114,7 @@ class ProjectProperties(QDialog):
         self.project.pre_exec_script = self.project_execution.pre_script
         self.project.post_exec_script = self.project_execution.post_script
         self.project.program_params = self.project_execution.params
+        self.project.run_targets = self.project_execution.run_targets
 
         # Save NProject
         self.project.save_project_properties()
@@ -389,6 +390,13 @@ class ProjectExecution(QWidget):
             os.path.join(os.path.expanduser("~"), 'path', 'to', 'virtualenv'))
         grid.addWidget(QLabel(translations.TR_PROJECT_VIRTUALENV), 9, 0)
         grid.addWidget(self.txtVenvPath, 9, 1)
+        self.txt_run_targets = QPlainTextEdit()
+        self.txt_run_targets.setToolTip(
+            translations.TR_PROJECT_RUN_TARGETS_TOOLTIP)
+        self.txt_run_targets.setPlainText(
+            '\n'.join(self._parent.project.run_targets))
+        grid.addWidget(QLabel(translations.TR_PROJECT_RUN_TARGETS), 10, 0)
+        grid.addWidget(self.txt_run_targets, 10, 1)
 
         choose_main_file_action.triggered.connect(self.select_file)
         choose_interpreter.triggered.connect(self._load_python_path)
@@ -423,6 +431,11 @@ class ProjectExecution(QWidget):
     def params(self):
         return self._line_params.text()
 
+    @property
+    def run_targets(self):
+        lines = self.txt_run_targets.toPlainText().splitlines()
+        return [line.strip() for line in lines if line.strip()]
+
     def _load_python_path(self):
         """Ask the user a python path and set its value"""
         path_interpreter = QFileDialog.getOpenFileName(
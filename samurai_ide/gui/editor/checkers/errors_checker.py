@@ -15,95 +15,39 @@
 # You should have received a copy of the GNU General Public License
 # along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
 
-import _ast
 from collections import defaultdict
 
-from PyQt5.QtCore import (
-    QThread,
-    pyqtSignal,
-    QTimer
-)
 from samurai_ide.gui.editor.checkers import (
     register_checker,
     remove_checker
 )
+from samurai_ide.gui.editor.checkers.scheduler import BaseChecker
 from samurai_ide import resources
 from samurai_ide import translations
 from samurai_ide.core import settings
-from samurai_ide.dependencies.pyflakes_mod import checker
 from samurai_ide.gui.ide import IDE
 from samurai_ide.gui.editor import helpers
+from samurai_ide.tools import lint
 from samurai_ide.tools.logger import NinjaLogger
 from samurai_ide.core.file_handling import file_manager
 
 logger = NinjaLogger(__file__)
 
 
-class ErrorsChecker(QThread):
-
-    checkerCompleted = pyqtSignal()
-
-    def __init__(self, neditor):
-        super().__init__()
-        self._neditor = neditor
-        self._path = ''
-        self.checks = defaultdict(list)
-
-        self.checker_icon = None
-        self.checkerCompleted.connect(self.refresh_display)
-
-    def run_checks(self):
-        if not self.isRunning():
-            self._path = self._neditor.file_path
-            QTimer.singleShot(0, self.start)
+class ErrorsChecker(BaseChecker):
 
-    def reset(self):
-        self.checks.clear()
-
-    def run(self):
+    def check(self, snapshot):
+        checks = defaultdict(list)
         exts = settings.SYNTAX.get('python')['extension']
-        file_ext = file_manager.get_file_extension(self._path)
-        if file_ext in exts:
-            try:
-                self.reset()
-                source = self._neditor.text
-                text = "[Error]: %s"
-                # Compile into an AST and handle syntax errors
-                try:
-                    tree = compile(source, self._path, "exec", _ast.PyCF_ONLY_AST)
-                except SyntaxError as reason:
-                    if reason.text is None:
-                        logger.error("Syntax error")
-                    else:
-                        text = text % reason.args[0]
-                        range_ = helpers.get_range(
-                            self._neditor, reason.lineno - 1, reason.offset)
-                        self.checks[reason.lineno - 1].append((range_, text, ""))
-                else:
-                    # Okay, now check it
-                    lint_checker = checker.Checker(tree, self._path)
-                    lint_checker.messages.sort(key=lambda msg: msg.lineno)
-                    source_lines = source.split('\n')
-                    for message in lint_checker.messages:
-                        lineno = message.lineno - 1
-                        text = message.message % message.message_args
-                        range_ = helpers.get_range(
-                            self._neditor, lineno, message.col)
-                        self.checks[lineno].append(
-                            (range_, text, source_lines[lineno].strip()))
-            except Exception as reason:
-                logger.warning("Checker not finished: {}".format(reason))
-
-        self.checkerCompleted.emit()
-
-    def message(self, lineno):
-        if lineno in self.checks:
-            return self.checks[lineno]
-        return None
-
-    @property
-    def dirty(self):
-        return self.checks != {}
+        file_ext = file_manager.get_file_extension(snapshot.path)
+        if file_ext not in exts:
+            return checks
+        # Cached by content, the AST is shared with the other checkers
+        for lineno, col, message, line in lint.lint(snapshot.path,
+                                                    snapshot.text):
+            range_ = helpers.get_range(snapshot, lineno, col)
+            checks[lineno].append((range_, message, line))
+        return checks
 
     @property
     def dirty_text(self):
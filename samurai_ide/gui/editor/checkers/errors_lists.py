@@ -30,10 +30,12 @@ from PyQt5.QtCore import (
 )
 from PyQt5.QtQuickWidgets import QQuickWidget
 from samurai_ide.core import settings
+from samurai_ide.core.file_handling import file_manager
 from samurai_ide import resources
 from samurai_ide.gui.ide import IDE
 from samurai_ide.tools import ui_tools
 from samurai_ide import translations
+from samurai_ide.gui.editor.checkers.project_lint import ProjectLinter
 from samurai_ide.gui.explorer.explorer_container import ExplorerContainer
 
 
@@ -52,6 +54,8 @@ class ErrorsWidget(QDialog):
         self._list = ErrorsList()
         hbox.addWidget(self._list)
         box.addLayout(hbox)
+        self._project_linter = ProjectLinter(self)
+        self._project_linter.lintFinished.connect(self.refresh_project_list)
 
         IDE.register_service("tab_errors", self)
         ExplorerContainer.register_tab(translations.TR_TAB_ERRORS, self)
@@ -72,6 +76,20 @@ class ErrorsWidget(QDialog):
                 model.append([message, line_content, lineno, pos[0]])
         self._list.update_error_model(model)
 
+    def lint_project(self, path):
+        """Lint all the python files of the project in path"""
+        self._project_linter.lint(path)
+
+    def refresh_project_list(self, results):
+        model = []
+        for file_path in sorted(results):
+            for lineno, col, message, line_content in results[file_path]:
+                message = '%s: %s' % (
+                    file_manager.get_basename(file_path), message)
+                model.append(
+                    [message, line_content, lineno, col or 0, file_path])
+        self._list.update_project_model(model)
+
     def reject(self):
         if self.parent() is None:
             self.dockWidget.emit(self)
@@ -104,16 +122,23 @@ class ErrorsList(QWidget):
         vbox.addWidget(self.view)
 
         self._root.open.connect(self._open)
+        self._root.openFile.connect(self._open_file)
 
     def _open(self, row):
         self._main_container.editor_go_to_line(row)
 
+    def _open_file(self, path, row, column):
+        self._main_container.open_file(path, row, column)
+
     def update_pep8_model(self, model):
         self._root.set_pep8_model(model)
 
     def update_error_model(self, model):
         self._root.set_error_model(model)
 
+    def update_project_model(self, model):
+        self._root.set_project_model(model)
+
 
 class ModelWarningsErrors(QAbstractItemModel):
 
@@ -17,90 +17,102 @@
 
 from collections import defaultdict
 
-from PyQt5.QtCore import (
-    QThread,
-    QTimer,
-    # Qt,
-    pyqtSignal
-)
 from samurai_ide import resources
 from samurai_ide import translations
 from samurai_ide.core import settings
 from samurai_ide.core.file_handling import file_manager
 from samurai_ide.dependencies import notimportchecker as nic
+from samurai_ide.gui.ide import IDE
+from samurai_ide.tools import parse_cache
+from samurai_ide.tools.module_resolver import ModuleResolver
 from samurai_ide.gui.editor.checkers import (
     register_checker,
     remove_checker,
 )
+from samurai_ide.gui.editor.checkers.scheduler import BaseChecker
 from samurai_ide.gui.editor import helpers
 
 # TODO: limit results for performance
 
+# Shared by all the editors, it keeps one resolver process per interpreter
+resolver = ModuleResolver()
+_resolver_installed = False
 
-class NotImporterChecker(QThread):
-    checkerCompleted = pyqtSignal()
 
-    def __init__(self, editor):
-        super(NotImporterChecker, self).__init__()
-        self._editor = editor
-        self._path = ''
-        self._encoding = ''
-        self.checks = defaultdict(list)
+def _install_resolver():
+    """Stop the resolver processes when the IDE goes down"""
+    global _resolver_installed
+    ninjaide = IDE.get_service('ide')
+    if ninjaide is None or _resolver_installed:
+        return
+    ninjaide.goingDown.connect(resolver.shutdown)
+    _resolver_installed = True
 
-        self.checker_icon = None
 
-        # self.connect(ninjaide,
-        #             lambda: remove_pep8_checker())
-        self.checkerCompleted.connect(self.refresh_display)
+class NotImporterChecker(BaseChecker):
 
-    @property
-    def dirty(self):
-        return self.checks != {}
+    def __init__(self, editor):
+        super(NotImporterChecker, self).__init__(editor)
+        self._interpreter = settings.PYTHON_EXEC
+        self._sys_path = []
+        _install_resolver()
 
     @property
     def dirty_text(self):
         return translations.TR_NOT_IMPORT_CHECKER_TEXT + str(len(self.checks))
 
-    def run_checks(self):
-        if not self.isRunning():
-            self._path = self._editor.file_path
-            self._encoding = self._editor.encoding
-            QTimer.singleShot(10, self.start)
-
-    def reset(self):
-        self.checks.clear()
-
-    def run(self):
+    def prepare(self, snapshot):
+        self._load_interpreter(snapshot.path)
+
+    def _load_interpreter(self, path):
+        """Use the interpreter and PYTHONPATH of the project of the file"""
+        self._interpreter = settings.PYTHON_EXEC
+        self._sys_path = []
+        ninjaide = IDE.get_service('ide')
+        project = None
+        if ninjaide is not None:
+            project = ninjaide.get_project_for_file(path)
+        if project is not None:
+            # venv is the path of the python of the virtualenv
+            self._interpreter = project.venv or project.python_exec
+            self._sys_path = [path.strip()
+                              for path in project.python_path.splitlines()
+                              if path.strip()]
+
+    def _find_missing(self, modules, path):
+        return resolver.find_missing(
+            self._interpreter, modules, list(path) + self._sys_path)
+
+    def check(self, snapshot):
+        checks = defaultdict(list)
         exts = settings.SYNTAX.get('python')['extension']
-        file_ext = file_manager.get_file_extension(self._path)
-        not_imports = dict()
-        if file_ext in exts:
-            self.reset()
-            path = self._editor.file_path
-            checker = nic.Checker(path)
-            not_imports = checker.get_not_imports_on_file(
-                checker.get_imports())
-            if not_imports is None:
-                pass
+        file_ext = file_manager.get_file_extension(snapshot.path)
+        if file_ext not in exts:
+            return checks
+        # The unsaved content is checked, with the tree shared with the
+        # other checkers
+        result = parse_cache.parse(snapshot.path, snapshot.text)
+        if result.tree is None:
+            return checks
+        searcher = nic.SearchImport()
+        searcher.visit(result.tree)
+        checker = nic.Checker(snapshot.path)
+        not_imports = checker.get_not_imports_on_file(
+            searcher.get_imports(), resolver=self._find_missing)
+        if not_imports is None:
+            return checks
+        for key, values in not_imports.items():
+            if isinstance(values['mod_name'], dict):
+                for v in values['mod_name']:
+                    message = '[NOTIMP] {}: Dont exist'.format(
+                        v)
             else:
-                for key, values in not_imports.items():
-                    if isinstance(values['mod_name'], dict):
-                        for v in values['mod_name']:
-                            message = '[NOTIMP] {}: Dont exist'.format(
-                                v)
-                    else:
-                        message = '[NOTIMP] {}: Dont exist'.format(
-                            values['mod_name'])
-                    range_ = helpers.get_range(
-                        self._editor, values['lineno'] - 1)
-                    self.checks[values['lineno'] - 1].append(
-                        (range_, message, ""))
-        self.checkerCompleted.emit()
-
-    def message(self, index):
-        if index in self.checks:
-            return self.checks[index]
-        return None
+                message = '[NOTIMP] {}: Dont exist'.format(
+                    values['mod_name'])
+            range_ = helpers.get_range(snapshot, values['lineno'] - 1)
+            checks[values['lineno'] - 1].append(
+                (range_, message, ""))
+        return checks
 
     def refresh_display(self):
         """
@@ -15,11 +15,19 @@
 # You should have received a copy of the GNU General Public License
 # along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
 
-from collections import defaultdict
+"""PEP8 checker.
+
+The pycodestyle StyleGuide is built once per configuration. While the text
+is edited only the statements around the changed lines (top level ones,
+or those of a class) are checked again, with the statements before and
+after them as context, and merged with the previous results. The whole
+file is checked when it is opened or saved.
+"""
 
-from PyQt5.QtCore import QThread
-from PyQt5.QtCore import QTimer
-from PyQt5.QtCore import pyqtSignal
+import ast
+import bisect
+import threading
+from collections import defaultdict
 
 from samurai_ide import resources
 from samurai_ide import translations
@@ -29,76 +37,203 @@ from samurai_ide.gui.ide import IDE
 from samurai_ide.dependencies import pycodestyle
 from samurai_ide.gui.editor.checkers import register_checker
 from samurai_ide.gui.editor.checkers import remove_checker
+from samurai_ide.gui.editor.checkers.scheduler import BaseChecker
 from samurai_ide.gui.editor import helpers
+from samurai_ide.tools import parse_cache
 from samurai_ide.tools.logger import NinjaLogger
 
 logger = NinjaLogger(__name__)
 
+# Statements checked before and after the changed ones
+CONTEXT_STATEMENTS = 1
+# Checks that are only right when the whole file is checked
+_END_OF_FILE_CODES = ('W391',)
 
-class Pep8Checker(QThread):
-    checkerCompleted = pyqtSignal()
+_style_guides_lock = threading.Lock()
+# {options: pycodestyle.StyleGuide}
+_style_guides = {}
 
-    def __init__(self, editor):
-        super(Pep8Checker, self).__init__()
-        self._editor = editor
-        self._path = ''
-        self._encoding = ''
-        self.checks = defaultdict(list)
 
-        self.checker_icon = None
+def style_guide(**options):
+    """Return the StyleGuide shared by the checkers using options"""
 
-        self.checkerCompleted.connect(self.refresh_display)
+    key = tuple(sorted(options.items()))
+    with _style_guides_lock:
+        guide = _style_guides.get(key)
+        if guide is None:
+            guide = _style_guides[key] = pycodestyle.StyleGuide(
+                parse_argv=False,
+                config_file='',
+                checker_class=CustomChecker,
+                **options
+            )
+    return guide
 
-    @property
-    def dirty(self):
-        return self.checks != {}
+
+def changed_lines(old_lines, new_lines):
+    """Return (start, old_end, new_end), old_lines[start:old_end] was
+    replaced by new_lines[start:new_end]"""
+
+    start = 0
+    limit = min(len(old_lines), len(new_lines))
+    while start < limit and old_lines[start] == new_lines[start]:
+        start += 1
+    old_end, new_end = len(old_lines), len(new_lines)
+    while (old_end > start and new_end > start and
+           old_lines[old_end - 1] == new_lines[new_end - 1]):
+        old_end -= 1
+        new_end -= 1
+    return start, old_end, new_end
+
+
+def statement_starts(body):
+    """Return the first line (0 based) of each statement of body and the
+    first line of the last import, -1 without imports"""
+
+    starts = []
+    last_import = -1
+    for node in body:
+        lineno = node.lineno
+        for decorator in getattr(node, 'decorator_list', ()):
+            lineno = min(lineno, decorator.lineno)
+        starts.append(lineno - 1)
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            last_import = lineno - 1
+    return starts, last_import
+
+
+def changed_chunk(tree, start, new_end, line_count):
+    """Return (header, chunk_first, first, end) the lines to check for a
+    change of the lines start to new_end, or None to check the whole file.
+
+    The results of the lines first to end are replaced, the lines from
+    chunk_first are the context before them. When the change is inside a
+    class, only its statements are checked and header are the lines of
+    the class statement to put before them."""
+
+    header = (0, 0)
+    starts, last_import = statement_starts(tree.body)
+    index = bisect.bisect_right(starts, start) - 1
+    after = bisect.bisect_left(starts, max(new_end, start + 1))
+    if index >= 0 and after == index + 1 and \
+            isinstance(tree.body[index], ast.ClassDef):
+        # The statements of the class around the change, with one of
+        # them after it still inside of the class
+        node = tree.body[index]
+        inner, _ = statement_starts(node.body)
+        inner_index = bisect.bisect_right(inner, start) - 1
+        inner_after = bisect.bisect_left(inner, max(new_end, start + 1))
+        if inner_index >= 0 and \
+                inner_after + CONTEXT_STATEMENTS < len(inner):
+            header = (starts[index], inner[0])
+            starts, index, after = inner, inner_index, inner_after
+            last_import = -1
+    first = starts[index] if index >= 0 else 0
+    chunk_first = header[1]
+    if index > 0:
+        chunk_first = starts[max(index - CONTEXT_STATEMENTS, 0)]
+    if last_import >= first:
+        # The imports not on top (E402) depend on all that is above
+        return None
+    after += CONTEXT_STATEMENTS
+    end = starts[after] if after < len(starts) else line_count
+    return header, chunk_first, first, end
+
+
+class Pep8Checker(BaseChecker):
+
+    incremental = True
+
+    def __init__(self, editor):
+        super().__init__(editor)
+        self._lock = threading.Lock()
+        # (lines, {lineno: [(col, code, text)]}) of the last check
+        self._base = None
 
     @property
     def dirty_text(self):
         return translations.TR_PEP8_DIRTY_TEXT + str(len(self.checks))
 
-    def run_checks(self):
-        if not self.isRunning():
-            self._path = self._editor.file_path
-            self._encoding = self._editor.encoding
-            QTimer.singleShot(0, self.start)
+    def check(self, snapshot):
+        checks = defaultdict(list)
+        exts = settings.SYNTAX.get('python')['extension']
+        file_ext = file_manager.get_file_extension(snapshot.path)
+        if file_ext not in exts:
+            return checks
+        lines = snapshot.text.splitlines(True)
+        with self._lock:
+            base = self._base
+        results = None
+        if not snapshot.full and base is not None:
+            results = self._check_changes(snapshot, base, lines)
+        if results is None:
+            results = self._check_lines(snapshot.path, lines)
+        if snapshot.cancelled():
+            return checks
+        with self._lock:
+            self._base = (lines, results)
+        for lineno in sorted(results):
+            for col, code, text in results[lineno]:
+                message = '[PEP8]: %s' % text
+                range_ = helpers.get_range(snapshot, lineno, col)
+                checks[lineno].append(
+                    (range_, message, snapshot.line_text(lineno).strip()))
+        return checks
+
+    def _check_lines(self, path, lines, first=0, end=None,
+                     header=(0, 0)):
+        """Return {lineno: [(col, code, text)]} for the lines between
+        first and end, numbered from the start of the file. The header
+        lines are checked before them, their results are dropped"""
 
-    def reset(self):
-        self.checks.clear()
+        if end is None:
+            end = len(lines)
+        results = defaultdict(list)
+        header_lines = lines[header[0]:header[1]]
+        data = style_guide().input_file(
+            path, lines=header_lines + lines[first:end])
+        for lineno, col, code, text in data:
+            lineno -= len(header_lines) + 1
+            if lineno < 0:
+                continue
+            if code in _END_OF_FILE_CODES and end < len(lines):
+                continue
+            results[lineno + first].append((col, code, text))
+        return results
 
-    def run(self):
-        exts = settings.SYNTAX.get('python')['extension']
-        file_ext = file_manager.get_file_extension(self._path)
-        if file_ext in exts:
-            try:
-                self.reset()
-                source = self._editor.text
-                path = self._editor.file_path
-                pep8_style = pycodestyle.StyleGuide(
-                    parse_argv=False,
-                    config_file='',
-                    checker_class=CustomChecker
-                )
-                temp_data = pep8_style.input_file(
-                    path,
-                    lines=source.splitlines(True)
-                )
-
-                source_lines = source.split('\n')
-                # for lineno, offset, code, text, doc in temp_data:
-                for lineno, col, code, text in temp_data:
-                    message = '[PEP8]: %s' % text
-                    range_ = helpers.get_range(self._editor, lineno - 1, col)
-                    self.checks[lineno - 1].append(
-                        (range_, message, source_lines[lineno - 1].strip()))
-            except Exception as reason:
-                logger.warning("Checker not finished: {}".format(reason))
-        self.checkerCompleted.emit()
-
-    def message(self, line):
-        if line in self.checks:
-            return self.checks[line]
-        return None
+    def _check_changes(self, snapshot, base, lines):
+        """Check the statements around the changes since base, return None
+        when the whole file has to be checked"""
+
+        old_lines, old_results = base
+        start, old_end, new_end = changed_lines(old_lines, lines)
+        delta = len(lines) - len(old_lines)
+        if start == old_end and start == new_end:
+            return old_results
+        result = parse_cache.parse(snapshot.path, snapshot.text)
+        if result.tree is None:
+            return None
+        chunk = changed_chunk(result.tree, start, new_end, len(lines))
+        if chunk is None:
+            return None
+        header, chunk_first, first, end = chunk
+        checked = self._check_lines(
+            snapshot.path, lines, chunk_first, end, header)
+        results = defaultdict(list)
+        for lineno, messages in old_results.items():
+            if lineno < first:
+                results[lineno] = messages
+            elif lineno + delta >= end:
+                results[lineno + delta] = messages
+        for lineno, messages in checked.items():
+            if first <= lineno < end:
+                results[lineno] = messages
+        return results
+
+    def reset(self):
+        super().reset()
+        with self._lock:
+            self._base = None
 
     def refresh_display(self):
         error_list = IDE.get_service('tab_errors')
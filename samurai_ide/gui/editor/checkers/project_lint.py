@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Lint all the python files of a project.
+
+The files that didn't change since the last run (same mtime, size and
+inode) are not opened again, their messages are kept with the signature.
+The others are read and their lint results looked up by content in
+tools.lint.cache. Only the files never seen are sent to a pool of worker
+processes.
+"""
+
+import os
+import tokenize
+from concurrent.futures import as_completed
+
+from PyQt5.QtCore import QThread
+from PyQt5.QtCore import pyqtSignal
+
+from samurai_ide.core import settings
+from samurai_ide.tools import file_search
+from samurai_ide.tools import lint
+from samurai_ide.tools import parse_cache
+from samurai_ide.tools.locator import indexer
+from samurai_ide.tools.logger import NinjaLogger
+
+logger = NinjaLogger(__name__)
+
+# Number of files sent to a worker at once
+CHUNK_SIZE = 32
+
+
+class ProjectLinter(QThread):
+    """Lint the python files of a folder in a process pool.
+
+    SIGNALS:
+    @lintProgress(int, int)  files linted, files to lint
+    @lintFinished(PyQt_PyObject)  {file path: [(lineno, col, message,
+                                   line text)]}, only files with messages
+    """
+
+    lintProgress = pyqtSignal(int, int)
+    lintFinished = pyqtSignal('PyQt_PyObject')
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._path = None
+        self._cancel = False
+        # {file path: (signature, lint cache key, messages)} of the last
+        # run, independent of the size of lint.cache
+        self._signatures = {}
+
+    def lint(self, path):
+        self.cancel()
+        self.wait()
+        self._path = path
+        self._cancel = False
+        self.start()
+
+    def cancel(self):
+        self._cancel = True
+
+    def run(self):
+        results = {}
+        exts = settings.SYNTAX.get('python')['extension']
+        filters = ['*.{0}'.format(ext) for ext in exts]
+        to_lint = []
+        seen = set()
+        for file_path, stat in file_search.walk_files(self._path, filters):
+            if self._cancel:
+                return
+            seen.add(file_path)
+            signature = indexer.file_signature(stat)
+            known = self._signatures.get(file_path)
+            messages = None
+            if known is not None and known[0] == signature:
+                messages = known[2]
+            if messages is None:
+                messages = self._lookup(file_path, signature, to_lint)
+            if messages:
+                results[file_path] = messages
+        prefix = os.path.join(self._path, '')
+        for file_path in list(self._signatures):
+            if file_path.startswith(prefix) and file_path not in seen:
+                del self._signatures[file_path]
+        if to_lint:
+            self._lint_in_workers(to_lint, results)
+        if not self._cancel:
+            self.lintFinished.emit(results)
+
+    def _lookup(self, file_path, signature, to_lint):
+        """Return the cached messages of the content of file_path, or add
+        it to to_lint and return None"""
+        try:
+            # Decoded with the encoding declared in the file
+            with tokenize.open(file_path) as f:
+                source = f.read()
+        except (OSError, SyntaxError, UnicodeDecodeError) as reason:
+            logger.warning('Lint skipped %r: %r' % (file_path, reason))
+            return None
+        key = lint.cache_key(file_path, parse_cache.source_digest(source))
+        messages = lint.cache.get(key)
+        self._signatures[file_path] = (signature, key, messages)
+        if messages is None:
+            to_lint.append((file_path, source))
+        return messages
+
+    def _lint_in_workers(self, to_lint, results):
+        keys = {file_path: self._signatures[file_path][1]
+                for file_path, _ in to_lint}
+        done = 0
+        executor = indexer.create_executor(settings.LINT_WORKERS)
+        futures = []
+        try:
+            for i in range(0, len(to_lint), CHUNK_SIZE):
+                futures.append(executor.submit(lint.lint_files,
+                                               to_lint[i:i + CHUNK_SIZE]))
+            for future in as_completed(futures):
+                if self._cancel:
+                    break
+                for file_path, messages in future.result():
+                    done += 1
+                    if messages is None:
+                        logger.error('Lint failed for file: %r' % file_path)
+                        continue
+                    lint.cache.put(keys[file_path], messages)
+                    signature = self._signatures[file_path][0]
+                    self._signatures[file_path] = (
+                        signature, keys[file_path], messages)
+                    if messages:
+                        results[file_path] = messages
+                self.lintProgress.emit(done, len(to_lint))
+        finally:
+            indexer.stop_executor(executor, futures)
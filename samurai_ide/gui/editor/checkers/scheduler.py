@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Run the checkers of an editor on a shared pool of worker threads.
+
+The text is copied once per run into a Snapshot, the checkers never read
+the editor from the workers. Requests are debounced and a newer run
+cancels the runs of older revisions.
+
+Saving or opening a file runs all the checkers on the whole text. Edits
+only run the incremental checkers, with Snapshot.full False they may
+check the changed lines and reuse their previous results.
+"""
+
+import time
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject
+from PyQt5.QtCore import QTimer
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtCore import pyqtSlot
+
+from samurai_ide.tools.logger import NinjaLogger
+
+logger = NinjaLogger(__name__)
+
+# Milliseconds to wait for more requests before running the checkers
+DELAY = 200
+# Checkers running at the same time for all the editors
+MAX_WORKERS = 2
+
+_executor = None
+_latency_lock = threading.Lock()
+# {checker name: [runs, total seconds, max seconds, last seconds]}
+_latency = {}
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(MAX_WORKERS)
+    return _executor
+
+
+def record_latency(name, seconds):
+    with _latency_lock:
+        stats = _latency.setdefault(name, [0, 0.0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += seconds
+        stats[2] = max(stats[2], seconds)
+        stats[3] = seconds
+
+
+def latency_report():
+    """Return [(name, runs, mean, max, last)] sorted by the mean time,
+    times in seconds"""
+    with _latency_lock:
+        report = [(name, runs, total / runs, maximum, last)
+                  for name, (runs, total, maximum, last) in _latency.items()]
+    return sorted(report, key=lambda item: item[2], reverse=True)
+
+
+class Snapshot(object):
+    """The content of an editor at some revision, read only.
+
+    Provides line_text and line_indent like the editor, so it can be used
+    with helpers.get_range from the workers. full is False when the
+    checkers may only look at what changed since their last run."""
+
+    def __init__(self, path, text, encoding='utf-8', revision=0, full=True):
+        self.path = path
+        self.text = text
+        self.encoding = encoding
+        self.revision = revision
+        self.full = full
+        self.lines = text.split('\n')
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def line_text(self, line):
+        if 0 <= line < len(self.lines):
+            return self.lines[line]
+        return ''
+
+    def line_indent(self, line):
+        text = self.line_text(line)
+        return len(text) - len(text.lstrip())
+
+
+class BaseChecker(QObject):
+    """Base class of the checkers run by the CheckerScheduler.
+
+    check runs in a worker thread and must only use the snapshot, the
+    returned checks are set with apply in the GUI thread. The checkers
+    with incremental True also run while the text is edited."""
+
+    incremental = False
+    finished = pyqtSignal()
+
+    def __init__(self, editor):
+        super().__init__()
+        self._editor = editor
+        self.checks = defaultdict(list)
+        self.checker_icon = None
+
+    @property
+    def dirty(self):
+        return self.checks != {}
+
+    def prepare(self, snapshot):
+        """Called in the GUI thread before check, to read what the check
+        needs from the IDE"""
+
+    def check(self, snapshot):
+        """Return {lineno: [(range, message, line text)]} for snapshot"""
+        raise NotImplementedError
+
+    def apply(self, checks):
+        self.checks = checks
+        self.refresh_display()
+        self.finished.emit()
+
+    def reset(self):
+        self.checks.clear()
+
+    def message(self, lineno):
+        if lineno in self.checks:
+            return self.checks[lineno]
+        return None
+
+    def refresh_display(self):
+        pass
+
+
+class CheckerScheduler(QObject):
+    """Run the checkers of an NEditable.
+
+    SIGNALS:
+    @checkersFinished()  all the checkers finished for the last revision
+    """
+
+    checkersFinished = pyqtSignal()
+    _checkDone = pyqtSignal(int, 'PyQt_PyObject', 'PyQt_PyObject')
+
+    def __init__(self, neditable):
+        super().__init__()
+        self._neditable = neditable
+        self._generation = 0
+        self._snapshot = None
+        self._pending = 0
+        self._full = False
+        # Revision of the last run, edits without changes are ignored
+        self._revision = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(DELAY)
+        self._timer.timeout.connect(self._run)
+        self._checkDone.connect(self._on_check_done)
+
+    def schedule(self, full=True):
+        """Run the checkers once the requests stop for DELAY ms, with full
+        False only the incremental checkers run"""
+        self._full = self._full or full
+        self._timer.start()
+
+    @pyqtSlot()
+    def cancel(self):
+        self._timer.stop()
+        self._generation += 1
+        if self._snapshot is not None:
+            self._snapshot.cancel()
+            self._snapshot = None
+
+    def _checkers(self):
+        return [items[0] for items in self._neditable.registered_checkers]
+
+    def _run(self):
+        editor = self._neditable.editor
+        if editor is None:
+            return
+        # A run replacing an unfinished full run must be full too
+        full = self._full or (
+            self._snapshot is not None and self._snapshot.full)
+        revision = editor.document().revision()
+        if not full and revision == self._revision:
+            return
+        self._full = False
+        checkers = self._checkers()
+        if not full:
+            checkers = [checker for checker in checkers
+                        if isinstance(checker, BaseChecker) and
+                        checker.incremental]
+            if not checkers:
+                return
+        self.cancel()
+        self._revision = revision
+        snapshot = Snapshot(self._neditable.file_path, editor.text,
+                            editor.encoding, revision, full)
+        self._snapshot = snapshot
+        generation = self._generation
+        self._pending = 0
+        executor = _get_executor()
+        for checker in checkers:
+            self._pending += 1
+            if not isinstance(checker, BaseChecker):
+                # Old checkers run on their own, see _on_legacy_finished
+                checker.run_checks()
+                continue
+            checker.prepare(snapshot)
+            executor.submit(self._check, generation, checker, snapshot)
+
+    def _check(self, generation, checker, snapshot):
+        """Executed in a worker thread"""
+        checks = None
+        if not snapshot.cancelled():
+            start = time.monotonic()
+            try:
+                checks = checker.check(snapshot)
+            except Exception as reason:
+                logger.warning("Checker not finished: {}".format(reason))
+            elapsed = time.monotonic() - start
+            record_latency(checker.__class__.__name__, elapsed)
+            logger.debug("%s: %.1f ms for %s" % (
+                checker.__class__.__name__, elapsed * 1000, snapshot.path))
+        try:
+            self._checkDone.emit(generation, checker, checks)
+        except RuntimeError:
+            # The editor was closed
+            pass
+
+    @pyqtSlot(int, 'PyQt_PyObject', 'PyQt_PyObject')
+    def _on_check_done(self, generation, checker, checks):
+        if generation != self._generation:
+            # A newer revision is being checked
+            return
+        if checks is not None:
+            checker.apply(checks)
+        self._finish_one()
+
+    def on_legacy_finished(self):
+        """Slot for the finished signal of the old QThread checkers"""
+        if self._pending:
+            self._finish_one()
+
+    def _finish_one(self):
+        self._pending -= 1
+        if self._pending == 0:
+            self._snapshot = None
+            self.checkersFinished.emit()
@@ -17,7 +17,7 @@
 
 import re
 import sys
-import sre_constants
+import bisect
 from collections import OrderedDict
 
 from PyQt5.QtWidgets import QFrame
@@ -42,6 +42,7 @@ from samurai_ide.gui.editor import highlighter
 from samurai_ide.gui.editor import base_editor
 from samurai_ide.gui.editor import scrollbar
 from samurai_ide.gui.editor import extra_selection
+from samurai_ide.gui.editor import occurrences
 # Extensions
 from samurai_ide.gui.editor.extensions import symbol_highlighter
 from samurai_ide.gui.editor.extensions import line_highlighter
@@ -71,6 +72,8 @@ class NEditor(base_editor.BaseEditor):
     # FIXME: cambiar nombre
     cursor_position_changed = pyqtSignal(int, int)
     current_line_changed = pyqtSignal(int)
+    # Index of the cursor and number of matches of the find results
+    foundResultsChanged = pyqtSignal(int, int)
 
     _MAX_CHECKER_SELECTIONS = 150  # For good performance
 
@@ -124,7 +127,14 @@ class NEditor(base_editor.BaseEditor):
         self.autocomplete_quotes(settings.AUTOCOMPLETE_QUOTES)
         # Calltips
         # Highlight word under cursor
-        self.__word_occurrences = []
+        self._word_occurrences = occurrences.OccurrenceSearch(self)
+        self._word_occurrences.updated.connect(
+            self._update_occurrences_selections)
+        self._found_results = occurrences.OccurrenceSearch(self)
+        self._found_results.updated.connect(self._on_found_results_updated)
+        # Markers of the find results in the scrollbar
+        self._found_markers = 0
+        self.updateRequest.connect(self._on_update_request)
         self._highlight_word_timer = QTimer()
         self._highlight_word_timer.setSingleShot(True)
         self._highlight_word_timer.setInterval(1000)
@@ -259,9 +269,44 @@ class NEditor(base_editor.BaseEditor):
         self._text_change_widget.setVisible(value)
 
     def __clear_occurrences(self):
-        self.__word_occurrences.clear()
+        self._word_occurrences.clear()
         self._extra_selections.remove("occurrences")
 
+    def _on_update_request(self, rect, dy):
+        if dy:
+            # Only the visible occurrences have selections
+            self._update_occurrences_selections()
+            self._update_found_selections()
+
+    def _occurrences_selections(self, search, color, inverted=False):
+        """Return the selections of the visible matches of search"""
+
+        selections = []
+        if inverted:
+            foreground = utils.get_inverted_color(color)
+        start, end = search.visible_range()
+        for start_pos, end_pos in search.matches(start, end):
+            selection = extra_selection.ExtraSelection(
+                self.textCursor(),
+                start_pos=start_pos,
+                end_pos=end_pos
+            )
+            selection.set_background(color)
+            if inverted:
+                selection.set_foreground(foreground)
+            selections.append(selection)
+        return selections
+
+    def _update_occurrences_selections(self):
+        if not self._extra_selections.get("occurrences") and \
+                not len(self._word_occurrences):
+            return
+        # FIXME: from settings
+        color = resources.COLOR_SCHEME.get("editor.occurrence")
+        self._extra_selections.add(
+            "occurrences",
+            self._occurrences_selections(self._word_occurrences, color))
+
     def highlight_selected_word(self):
         """Highlight word under cursor"""
 
@@ -275,50 +320,56 @@ class NEditor(base_editor.BaseEditor):
         if not word:
             return
 
-        results = self._get_find_index_results(word, cs=False, wo=True)[1]
-        selections = []
-        append = selections.append
-        # On very big files where a lots of occurrences can be found,
-        # this freeze the editor during a few seconds. So, we can limit of 500
-        # and make sure the editor will always remain responsive
-        for start_pos, end_pos in results[:500]:
-            selection = extra_selection.ExtraSelection(
-                self.textCursor(),
-                start_pos=start_pos,
-                end_pos=end_pos
-            )
-            color = resources.COLOR_SCHEME.get("editor.occurrence")
-            selection.set_background(color)
-            append(selection)
-            # TODO: highlight results in scrollbar
-            # FIXME: from settings
-        self._extra_selections.add("occurrences", selections)
+        # Only the visible occurrences are highlighted, so the editor
+        # remains responsive on very big files
+        self._word_occurrences.search(word, whole_word=True)
+        self._update_occurrences_selections()
 
     def clear_found_results(self):
+        self._found_results.clear()
+        self._found_markers = 0
         self._scrollbar.remove_marker("find")
         self._extra_selections.remove("find")
 
-    def highlight_found_results(self, text, cs=False, wo=False):
-        """Highlight all found results from find/replace widget"""
+    def _update_found_selections(self):
+        if not self._extra_selections.get("find") and \
+                not len(self._found_results):
+            return
+        color = resources.COLOR_SCHEME.get("editor.search.result")
+        self._extra_selections.add(
+            "find", self._occurrences_selections(
+                self._found_results, color, inverted=True))
 
-        index, results = self._get_find_index_results(text, cs=cs, wo=wo)
-        selections = []
-        append = selections.append
+    def _on_found_results_updated(self):
         color = resources.COLOR_SCHEME.get("editor.search.result")
-        for start, end in results:
-            selection = extra_selection.ExtraSelection(
-                self.textCursor(),
-                start_pos=start,
-                end_pos=end
-            )
-            selection.set_background(color)
-            selection.set_foreground(utils.get_inverted_color(color))
-            append(selection)
-            line = selection.cursor.blockNumber()
-            self._scrollbar.add_marker("find", line, color)
-        self._extra_selections.add("find", selections)
+        document = self.document()
+        if len(self._found_results) < self._found_markers:
+            # Dropped after an edit
+            self._scrollbar.remove_marker("find")
+            self._found_markers = 0
+        matches = self._found_results.searched_matches(self._found_markers)
+        if matches:
+            self._scrollbar.add_markers(
+                "find", [document.findBlock(start).blockNumber()
+                         for start, _ in matches], color)
+        self._found_markers += len(matches)
+        self._update_found_selections()
+        self.foundResultsChanged.emit(
+            self._found_results.index(self.textCursor().position()),
+            len(self._found_results))
 
-        return index, len(results)
+    def highlight_found_results(self, text, cs=False, wo=False):
+        """Highlight all found results from find/replace widget.
+
+        Return the index of the cursor and the number of matches found
+        so far, foundResultsChanged is emitted when more are found"""
+
+        self._scrollbar.remove_marker("find")
+        self._found_markers = 0
+        self._found_results.search(text, cs, wo)
+        self._on_found_results_updated()
+        return (self._found_results.index(self.textCursor().position()),
+                len(self._found_results))
 
     def _highlight_checkers(self, neditable):
         """Add checker selections to the Editor"""
@@ -329,20 +380,28 @@ class NEditor(base_editor.BaseEditor):
         checkers = neditable.sorted_checkers
         selections = []
         append = selections.append  # Reduce name look-ups for better speed
+        document = self.document()
+        cursor = self.textCursor()
         for items in checkers:
             checker, color, _ = items
             lines = sorted(checker.checks.keys())
+            # Scrollbar markers
+            self._scrollbar.add_markers("checker", lines, color, priority=1)
             for line in lines[:self._MAX_CHECKER_SELECTIONS]:
-                cursor = self.textCursor()
-                # Scrollbar marker
-                self._scrollbar.add_marker("checker", line, color, priority=1)
+                block = document.findBlockByNumber(line)
+                if not block.isValid():
+                    # The checks are older than the text
+                    continue
+                position = block.position()
+                last = block.length() - 1
                 ms = checker.checks[line]
                 for (col_start, col_end), _, _ in ms:
+                    # Same columns as ExtraSelection(start_line=line, ...)
+                    # without moving a cursor down to the line
                     selection = extra_selection.ExtraSelection(
                         cursor,
-                        start_line=line,
-                        col_start=col_start,
-                        col_end=col_end
+                        start_pos=position + max(min(col_start - 1, last), 0),
+                        end_pos=position + max(min(col_end - 1, last), 0)
                     )
                     selection.set_underline(color)
                     append(selection)
@@ -372,8 +431,10 @@ class NEditor(base_editor.BaseEditor):
     def register_syntax_for(self, language="python", force=False):
         syntax = highlighter.build_highlighter(language)
         if syntax is not None:
-            self._highlighter = highlighter.SyntaxHighlighter(
-                self.document(),
+            if self._highlighter is not None:
+                self._highlighter.detach()
+            self._highlighter = highlighter.IncrementalHighlighter(
+                self,
                 syntax.partition_scanner,
                 syntax.scanners,
                 syntax.context
@@ -712,30 +773,13 @@ class NEditor(base_editor.BaseEditor):
 
     def _get_find_index_results(self, expr, cs, wo):
 
-        text = self.text
+        pattern = occurrences.compile_pattern(expr, cs, wo)
+        matches = [found.span() for found in pattern.finditer(self.text)]
         current_index = 0
-
-        if not cs:
-            text = text.lower()
-            expr = expr.lower()
-
-        expr = re.escape(expr)
-        if wo:
-            expr = r"\b" + re.escape(expr) + r"\b"
-
-        def find_all_iter(string, sub):
-            try:
-                reobj = re.compile(sub)
-            except sre_constants.error:
-                return
-            for match in reobj.finditer(string):
-                yield match.span()
-
-        matches = list(find_all_iter(text, expr))
-
-        if len(matches) > 0:
+        if matches:
             position = self.textCursor().position()
-            current_index = sum(1 for _ in re.finditer(expr, text[:position]))
+            current_index = bisect.bisect_right(
+                [end for _, end in matches], position)
         return current_index, matches
 
     def show_run_cursor(self):
@@ -21,39 +21,122 @@ from PyQt5.QtCore import Qt
 from samurai_ide.gui.editor.extensions import base
 
 
+def block_indentation(text):
+    """Return the length of the leading whitespace of text, for the lines
+    without text -1 - length (they also take the previous indentation)"""
+
+    indentation = len(text) - len(text.lstrip())
+    if indentation == len(text):
+        return -1 - indentation
+    return indentation
+
+
 class IndentationGuide(base.Extension):
-    """Indentation guides extension for Samurai-IDE Editor"""
+    """Indentation guides extension for Samurai-IDE Editor
+
+    The indentation of each block is cached and only computed again for
+    the blocks changed by an edit, the x position of the guides is cached
+    per font and indentation width."""
 
     def __init__(self):
         super().__init__()
         self.color = Qt.darkGray
+        # Indentation of each block, None when it must be computed
+        self._indents = []
+        # x of the guide at column i * indentation width
+        self._offsets = []
+        self._offsets_key = None
 
     def install(self):
-        self._indentation_width = self._neditor.indentation_width
-        self._neditor.updateRequest.connect(self._neditor.viewport().update)
+        doc = self._neditor.document()
+        self._indents = [None] * doc.blockCount()
+        doc.contentsChange.connect(self._on_contents_change)
         self._neditor.painted.connect(self._draw)
         self._neditor.viewport().update()
 
     def shutdown(self):
+        self._neditor.document().contentsChange.disconnect(
+            self._on_contents_change)
         self._neditor.painted.disconnect(self._draw)
-        self._neditor.updateRequest.connect(self._neditor.viewport().update)
+        self._indents = []
         self._neditor.viewport().update()
 
-    def _draw(self, event):
+    def _on_contents_change(self, position, removed, added):
         doc = self._neditor.document()
+        first = doc.findBlock(position).blockNumber()
+        last = doc.findBlock(position + added).blockNumber()
+        if last < 0:
+            last = doc.blockCount() - 1
+        removed_last = last - (doc.blockCount() - len(self._indents))
+        changed = [None] * (last - first + 1)
+        old = self._indents[first:removed_last + 1]
+        self._indents[first:removed_last + 1] = changed
+        if len(self._indents) != doc.blockCount():
+            # Out of sync (the document was replaced), start again
+            self._indents = [None] * doc.blockCount()
+        elif len(old) == len(changed):
+            block = doc.findBlockByNumber(first)
+            new = []
+            for _ in old:
+                new.append(block_indentation(block.text()))
+                block = block.next()
+            self._indents[first:last + 1] = new
+            if new == old:
+                # The guides of the next blank lines don't change, only
+                # the edited blocks need to be painted
+                return
+        # Blank lines after the change take the new indentation
+        self._neditor.viewport().update()
+
+    def _indentation(self, lineno, block):
+        indentation = self._indents[lineno]
+        if indentation is None:
+            indentation = self._indents[lineno] = \
+                block_indentation(block.text())
+        return indentation
+
+    def _guide_offsets(self, count):
+        """Return the x (without the content offset) of count guides"""
+
+        width = self._neditor.indentation_width
+        font = self._neditor.font()
+        key = (font.key(), width)
+        if key != self._offsets_key:
+            self._offsets_key = key
+            self._offsets = []
+        offsets = self._offsets
+        if len(offsets) < count:
+            metrics = self._neditor.fontMetrics()
+            margin = self._neditor.document().documentMargin()
+            for i in range(len(offsets) + 1, count + 1):
+                offsets.append(metrics.width(i * width * '9') + margin)
+        return offsets
+
+    def _draw(self, event):
+        if len(self._indents) != self._neditor.document().blockCount():
+            self._indents = [None] * self._neditor.document().blockCount()
+        width = self._neditor.indentation_width
+        rect = event.rect()
+        rect_top, rect_bottom = rect.top(), rect.bottom()
         painter = QPainter(self._neditor.viewport())
         color = QColor(self.color)
         color.setAlphaF(.3)
         painter.setPen(color)
-        offset = doc.documentMargin() + self._neditor.contentOffset().x()
+        x_offset = self._neditor.contentOffset().x()
         previous = 0
         for top, lineno, block in self._neditor.visible_blocks:
-            bottom = top + self._neditor.blockBoundingRect(block).height()
-            indentation = len(block.text()) - len(block.text().lstrip())
-            if not block.text().strip():
-                indentation = max(indentation, previous)
+            indentation = self._indentation(lineno, block)
+            if indentation < 0:
+                indentation = max(-1 - indentation, previous)
             previous = indentation
-            for i in range(self._indentation_width, indentation,
-                           self._indentation_width):
-                x = self._neditor.fontMetrics().width(i * '9') + offset
+            count = (indentation - 1) // width
+            if count <= 0 or top > rect_bottom:
+                continue
+            bottom = top + self._neditor.blockBoundingRect(block).height()
+            if bottom < rect_top:
+                continue
+            offsets = self._guide_offsets(count)
+            top, bottom = int(top), int(bottom)
+            for i in range(count):
+                x = int(offsets[i] + x_offset)
                 painter.drawLine(x, top, x, bottom)
@@ -19,6 +19,7 @@ from PyQt5.QtGui import QTextCursor
 from PyQt5.QtGui import QColor
 
 from samurai_ide import resources
+from samurai_ide.gui.editor import highlighter
 from samurai_ide.gui.editor.extensions import base
 from samurai_ide.gui.editor.extra_selection import ExtraSelection
 # TODO: change colors for all editor clones
@@ -75,28 +76,24 @@ class SymbolHighlighter(base.Extension):
         self._neditor.extra_selections.remove("matcher")
         cursor = self._neditor.textCursor()
         current_block = cursor.block()
-        if self._neditor.inside_string_or_comment(cursor):
-            return
         column_index = cursor.positionInBlock()
+        # Brackets in strings and comments are not in the block brackets
+        brackets = dict(
+            highlighter.block_brackets(current_block).positions)
 
-        if column_index < len(current_block.text()) and \
-                current_block.text()[column_index] in self.ALL_SYMBOLS:
-            char = current_block.text()[column_index]
-        elif column_index > 0 and current_block.text()[column_index - 1] in \
-                self.ALL_SYMBOLS:
-            char = current_block.text()[column_index - 1]
+        if column_index in brackets:
+            char = brackets[column_index]
+        elif column_index - 1 in brackets:
             column_index -= 1
+            char = brackets[column_index]
         else:
             return
         if char in self.OPEN_SYMBOLS:
-            generator = self.__iterate_code_forward(current_block,
-                                                    column_index + 1)
+            matched_block, matched_index = self.__find_forward(
+                current_block, column_index, char)
         else:
-            generator = self.__iterate_code_backward(current_block,
-                                                     column_index)
-
-        matched_block, matched_index = self.__find_matching_symbol(
-            char, generator)
+            matched_block, matched_index = self.__find_backward(
+                current_block, column_index, char)
 
         if matched_block is not None:
             selections = [
@@ -120,49 +117,61 @@ class SymbolHighlighter(base.Extension):
         selection.set_background(background)
         return selection
 
-    def __get_complementary_symbol(self, symbol):
-        complementary = self.SYMBOLS_MAP.get(symbol, None)
-        if complementary is None:
-            # If the complementary symbol is not found,
-            # look at the reverse of the dict
-            complementary = self.REVERSED_SYMBOL_MAP[symbol]
-        return complementary
+    def __find_forward(self, block, column, symbol):
+        """Return the block and column of the bracket closing symbol"""
 
-    def __find_matching_symbol(self, symbol, generator):
+        complementary = self.SYMBOLS_MAP[symbol]
         count = 1
-        complementary = self.__get_complementary_symbol(symbol)
-        for block, column, char in generator:
-            # Check if current position are inside a comment or string
-            # Because positionInBlock() = cursor.position() - block.position()
-            # and positionInBlock() = column, then "setPositionInBlock":
-            #     continue
-            if char == complementary:
-                count -= 1
-                if count == 0:
-                    return block, column
-            elif char == symbol:
-                count += 1
-        else:
-            return None, None
-
-    @staticmethod
-    def __iterate_code_forward(block, index):
-        for col, char in list(enumerate(block.text()))[index:]:
-            yield block, col, char
-        block = block.next()
-
-        while block.isValid():
-            for col, char in list(enumerate(block.text())):
-                yield block, col, char
+        positions = [position for position in
+                     highlighter.block_brackets(block).positions
+                     if position[0] > column]
+        while True:
+            for col, char in positions:
+                if char == complementary:
+                    count -= 1
+                    if count == 0:
+                        return block, col
+                elif char == symbol:
+                    count += 1
             block = block.next()
-
-    @staticmethod
-    def __iterate_code_backward(block, index):
-        for col, char in reversed(list(enumerate(block.text()[:index]))):
-            yield block, col, char
-        block = block.previous()
-
-        while block.isValid():
-            for col, char in reversed(list(enumerate(block.text()))):
-                yield block, col, char
+            # Skip the blocks where the count can't get to 0
+            while block.isValid():
+                brackets = highlighter.block_brackets(block)
+                net, low_prefix, _ = brackets.depths.get(symbol, (0, 0, 0))
+                if count + low_prefix <= 0:
+                    break
+                count += net
+                block = block.next()
+            if not block.isValid():
+                return None, None
+            positions = brackets.positions
+
+    def __find_backward(self, block, column, symbol):
+        """Return the block and column of the bracket opening symbol"""
+
+        complementary = self.REVERSED_SYMBOL_MAP[symbol]
+        count = 1
+        positions = [position for position in
+                     highlighter.block_brackets(block).positions
+                     if position[0] < column]
+        while True:
+            for col, char in reversed(positions):
+                if char == complementary:
+                    count -= 1
+                    if count == 0:
+                        return block, col
+                elif char == symbol:
+                    count += 1
             block = block.previous()
+            while block.isValid():
+                brackets = highlighter.block_brackets(block)
+                net, _, low_suffix = brackets.depths.get(
+                    complementary, (0, 0, 0))
+                if count + low_suffix <= 0:
+                    break
+                # The net sum counts the opening brackets
+                count -= net
+                block = block.previous()
+            if not block.isValid():
+                return None, None
+            positions = brackets.positions
@@ -55,9 +55,11 @@ def get_range(editor, line, col=-1):
     col_end = len(line_text)
     col_start = col if col > -1 else 0
     if col > -1:
-        match = pat_word.match(line_text[col:])
+        # No slicing, the checkers call it for every message
+        match = pat_word.match(line_text, col)
         if match:
-            col_end = col_start + match.end()
+            col_end = match.end()
+        col_end = max(col_end, col_start)
     else:
         col_start = editor.line_indent(lineno)
 
@@ -16,17 +16,25 @@
 # along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
 
 import re
+import time
 
+from PyQt5.QtCore import QObject
+from PyQt5.QtCore import QTimer
 from PyQt5.QtGui import QSyntaxHighlighter
 from PyQt5.QtGui import QColor
 from PyQt5.QtGui import QTextCharFormat
 from PyQt5.QtGui import QFont
 from PyQt5.QtGui import QBrush
 from PyQt5.QtGui import QTextFormat
+from PyQt5.QtGui import QTextLayout
 
 from samurai_ide.core import settings
 from samurai_ide import resources
 from samurai_ide.gui.ide import IDE
+from samurai_ide.gui.editor.base import BlockUserData
+
+# Seconds spent highlighting at once by IncrementalHighlighter
+SLICE_TIME = 0.02
 
 
 class TextCharFormat(QTextCharFormat):
@@ -152,15 +160,50 @@ class Token(object):
         if isinstance(pattern, list):
             pattern = "|".join(pattern)
         self.pattern = pattern
-        self.prefix = prefix
-        self.suffix = suffix
+        self.prefix = prefix or ""
+        self.suffix = suffix or ""
+
+
+_FLAGS = re.compile(r"\(\?([aiLmsux]+)\)")
+_WORDS = re.compile(r"\w+(\|\w+)*$")
+# Token boundaries meaning "a whole word"
+_WORD_PREFIXES = (r"\b", r"(^|[\x08\W])")
+_WORD_SUFFIXES = (r"\b", r"[\x08\W]")
+_search_word = re.compile(r"(?<!\w)\w+").search
+
+
+def _split_flags(pattern):
+    """Return (flags, pattern) for a pattern starting with (?flags)"""
+
+    found = _FLAGS.match(pattern)
+    if found is None:
+        return "", pattern
+    return found.group(1), pattern[found.end():]
+
+
+def _words(token):
+    """Return the words of a token matching only whole words or None"""
+
+    _, prefix = _split_flags(token.prefix)
+    _, pattern = _split_flags(token.pattern)
+    if (prefix in _WORD_PREFIXES and token.suffix in _WORD_SUFFIXES and
+            _WORDS.match(pattern)):
+        return pattern.split("|")
+    return None
 
 
 class Scanner(object):
-    __slots__ = ("tokens", "search")
+    """Find the tokens of a text.
+
+    The tokens made of plain words (keywords, builtins...) are looked up
+    in a table, the other ones are searched with a single regex."""
+
+    __slots__ = ("tokens", "search", "words")
 
     def __init__(self, tokens):
         self.tokens = []
+        # {word: token name}, the first token wins like in the regex
+        self.words = {}
         groups = []
         for t in tokens:
             if isinstance(t, (list, tuple)):
@@ -169,52 +212,143 @@ class Scanner(object):
                 t = Token(**t)
             else:
                 assert isinstance(t, Token), "Token expected, got %r" % t
+            self.tokens.append(t)
+            words = _words(t)
+            if words is not None:
+                for word in words:
+                    self.words.setdefault(word, t.name)
+                continue
             gdef = "?P<%s>" % t.name
-            if gdef in t.pattern:
-                p = t.pattern
-            else:
-                p = ("(%s%s)" % (gdef, t.pattern))
-            p = t.prefix + p + t.suffix
+            prefix_flags, prefix = _split_flags(t.prefix)
+            flags, pattern = _split_flags(t.pattern)
+            if gdef not in pattern:
+                pattern = "(%s%s)" % (gdef, pattern)
+            p = prefix + pattern + t.suffix
+            flags = prefix_flags + flags
+            if flags:
+                # Only allowed at the start of the whole regex otherwise
+                p = "(?%s:%s)" % (flags, p)
             groups.append(p)
-            self.tokens.append(t)
-        pat = "|".join(groups)
-        self.search = re.compile(pat).search
-
-    def scan(self, s):
-        search = self.search
-        last_pos = 0
-        # loop yields (token, start_pos, end_pos)
-        while True:
-            found = search(s, last_pos)
-            if found:
-                lg = found.lastgroup
-                start, last_pos = found.span(lg)
-                yield lg, start, last_pos
-            else:
-                break
+        self.search = None
+        if groups:
+            self.search = re.compile("|".join(groups)).search
 
+    def scan(self, s, pos=0, endpos=None):
+        """Yield (token, start, end) for the tokens of s[pos:endpos]"""
 
-class SyntaxHighlighter(QSyntaxHighlighter):
-
-    def __init__(self, parent, partition_scanner,
-                 scanner, formats, default_font=None):
-        """
-        :param parent: QDocument or QTextEdit/QPlainTextEdit instance
-        'partition_scanner:
-            PartitionScanner instance
-        :param scanner:
-            dictionary of token scanners for each partition
-            The key is the name of the partition,
-            the value is a Scanner instance
-            The default scanner has the key None
-        :formats:
-            list of tuples consisting of a name and a format definition
-            The name is the name of a partition or token
-        """
-        super(SyntaxHighlighter, self).__init__(parent)
-        if default_font:
-            parent.setDefaultFont(default_font)
-
+        if endpos is None:
+            endpos = len(s)
+        search = self.search
+        words = self.words
+        found = search(s, pos, endpos) if search is not None else None
+        word = _search_word(s, pos, endpos) if words else None
+        while found is not None or word is not None:
+            if word is not None and (found is None or
+                                     word.start() <= found.start(
+                                         found.lastgroup)):
+                token = words.get(word.group())
+                end = word.end()
+                if token is not None:
+                    yield token, word.start(), end
+                    if found is not None and found.start(
+                            found.lastgroup) < end:
+                        found = search(s, end, endpos)
+                word = _search_word(s, end, endpos)
+                continue
+            lg = found.lastgroup
+            start, pos = found.span(lg)
+            yield lg, start, pos
+            found = search(s, pos, endpos)
+            if word is not None and word.start() < pos:
+                word = _search_word(s, pos, endpos)
+
+
+def _build_formats(formats, font_family):
+    built = {}
+    for f in formats:
+        if isinstance(f, tuple):
+            fname, f = f
+        else:
+            assert isinstance(
+                f, (Format, dict)), "Format expected, got %r" % f
+        if isinstance(f, str):
+            f = (f,)  # only color specified
+        if isinstance(f, (tuple, list)):
+            f = Format(*((fname,) + f))
+        elif isinstance(f, dict):
+            f = Format(**dict(name=fname, **f))
+        else:
+            assert isinstance(f, Format), "Format expected, got %r" % f
+        f.tcf.setFontFamily(font_family)
+        built[f.name] = f.tcf
+    return built
+
+
+OPEN_BRACKETS = "([{"
+CLOSE_BRACKETS = ")]}"
+_search_brackets = re.compile(r"[()\[\]{}]").finditer
+
+
+class BlockBrackets(object):
+    """The brackets of a block outside the strings and comments.
+
+    positions is [(column, bracket)]. depths maps the opening brackets to
+    (net, lowest prefix, lowest suffix): the sum of the brackets of the
+    block, the lowest sum from the start (+1 opening, -1 closing) and the
+    lowest sum from the end (+1 closing, -1 opening). A matching bracket
+    can't be in a block where count + lowest sum stays over 0."""
+
+    __slots__ = ("positions", "depths")
+
+    def __init__(self, positions):
+        self.positions = positions
+        self.depths = {}
+        for opening, closing in zip(OPEN_BRACKETS, CLOSE_BRACKETS):
+            net = low_prefix = 0
+            for _, bracket in positions:
+                if bracket == opening:
+                    net += 1
+                elif bracket == closing:
+                    net -= 1
+                    low_prefix = min(low_prefix, net)
+            suffix = low_suffix = 0
+            for _, bracket in reversed(positions):
+                if bracket == closing:
+                    suffix += 1
+                elif bracket == opening:
+                    suffix -= 1
+                    low_suffix = min(low_suffix, suffix)
+            if net or low_prefix or low_suffix:
+                self.depths[opening] = (net, low_prefix, low_suffix)
+
+    @classmethod
+    def from_text(cls, text, ranges=None):
+        """Brackets of text, only in the (start, end) ranges if given"""
+
+        if ranges is None:
+            ranges = ((0, len(text)),)
+        return cls([(found.start(), found.group())
+                    for start, end in ranges
+                    for found in _search_brackets(text, start, end)])
+
+
+def block_brackets(block):
+    """Return the BlockBrackets of block, from the text if the block was
+    not highlighted"""
+
+    data = block.userData()
+    brackets = None
+    if isinstance(data, BlockUserData):
+        brackets = data.get("brackets")
+    if brackets is None:
+        brackets = BlockBrackets.from_text(block.text())
+    return brackets
+
+
+class BlockHighlighter(object):
+    """Compute the formats of a line, shared by the highlighters"""
+
+    def __init__(self, partition_scanner, scanner, formats, font_family):
         if isinstance(partition_scanner, (list, tuple)):
             partition_scanner = PartitionScanner(partition_scanner)
         else:
@@ -235,23 +369,7 @@ class SyntaxHighlighter(QSyntaxHighlighter):
                                                "got {!r}".format(
                                                    inside_scanner))
 
-        self.formats = {}
-        for f in formats:
-            if isinstance(f, tuple):
-                fname, f = f
-            else:
-                assert isinstance(
-                    f, (Format, dict)), "Format expected, got %r" % f
-            if isinstance(f, str):
-                f = (f,)  # only color specified
-            if isinstance(f, (tuple, list)):
-                f = Format(*((fname,) + f))
-            elif isinstance(f, dict):
-                f = Format(**dict(name=fname, **f))
-            else:
-                assert isinstance(f, Format), "Format expected, got %r" % f
-            f.tcf.setFontFamily(parent.defaultFont().family())
-            self.formats[f.name] = f.tcf
+        self.formats = _build_formats(formats, font_family)
 
         # reduce name look-ups for better speed
         scan_inside = {}
@@ -261,34 +379,258 @@ class SyntaxHighlighter(QSyntaxHighlighter):
         self.scan_partitions = partition_scanner.scan
         self.get_format = self.formats.get
 
-    def highlightBlock(self, text):
-        """automatically called by Qt"""
+    def highlight(self, text, previous_state, set_format, set_code=None):
+        """Call set_format(start, length, format) for the formats of
+        text, the ranges don't overlap. Return the state of the line.
+
+        set_code(start, end) is called for the ranges of code (out of the
+        partitions)"""
 
-        text = str(text) + "\n"
-        previous_state = self.previousBlockState()
         new_state = previous_state
         # speed-up name-lookups
         get_format = self.get_format
-        set_format = self.setFormat
         get_scanner = self.get_scanner
 
         for start, end, partition, new_state, is_inside in \
                 self.scan_partitions(previous_state, text):
             f = get_format(partition, None)
-            if f:
-                set_format(start, end - start, f)
-            if is_inside:
-                scan = get_scanner(partition)
-                if scan:
-                    for token, token_pos, token_end in scan(text[start:end]):
-                        f = get_format(token)
-                        if f:
-                            set_format(
-                                start + token_pos, token_end - token_pos, f)
+            if set_code is not None and partition is None and is_inside:
+                set_code(start, end)
+            scan = get_scanner(partition) if is_inside else None
+            if scan is None:
+                if f:
+                    set_format(start, end - start, f)
+                continue
+            pos = start
+            for token, token_pos, token_end in scan(text, start, end):
+                token_format = get_format(token)
+                if token_format:
+                    if f and token_pos > pos:
+                        set_format(pos, token_pos - pos, f)
+                    set_format(token_pos, token_end - token_pos,
+                               token_format)
+                    pos = token_end
+            if f and end > pos:
+                set_format(pos, end - pos, f)
+
+        return new_state
+
+
+class SyntaxHighlighter(QSyntaxHighlighter):
+
+    def __init__(self, parent, partition_scanner,
+                 scanner, formats, default_font=None):
+        """
+        :param parent: QDocument or QTextEdit/QPlainTextEdit instance
+        'partition_scanner:
+            PartitionScanner instance
+        :param scanner:
+            dictionary of token scanners for each partition
+            The key is the name of the partition,
+            the value is a Scanner instance
+            The default scanner has the key None
+        :formats:
+            list of tuples consisting of a name and a format definition
+            The name is the name of a partition or token
+        """
+        super(SyntaxHighlighter, self).__init__(parent)
+        if default_font:
+            parent.setDefaultFont(default_font)
+
+        self._block_highlighter = BlockHighlighter(
+            partition_scanner, scanner, formats,
+            parent.defaultFont().family())
+        self.partition_scanner = self._block_highlighter.partition_scanner
+        self.scanner = self._block_highlighter.scanner
+        self.formats = self._block_highlighter.formats
 
+    def highlightBlock(self, text):
+        """automatically called by Qt"""
+
+        new_state = self._block_highlighter.highlight(
+            str(text) + "\n", self.previousBlockState(), self.setFormat)
         self.setCurrentBlockState(new_state)
 
 
+class IncrementalHighlighter(QObject):
+    """Syntax highlighter of an editor that highlights the visible blocks
+    first.
+
+    The rest of the document is highlighted in slices of SLICE_TIME
+    seconds when the event loop is idle. The blocks are highlighted from
+    the start of the document, a visible block that wasn't reached yet is
+    highlighted with the state of the previous visible block and again
+    when it's reached. Same parameters as SyntaxHighlighter, except that
+    it needs the editor."""
+
+    def __init__(self, editor, partition_scanner, scanner, formats):
+        super().__init__(editor)
+        self._editor = editor
+        self._document = editor.document()
+        self._block_highlighter = BlockHighlighter(
+            partition_scanner, scanner, formats,
+            self._document.defaultFont().family())
+        self.partition_scanner = self._block_highlighter.partition_scanner
+        self.scanner = self._block_highlighter.scanner
+        self.formats = self._block_highlighter.formats
+        # The blocks before this one are highlighted with the right state
+        self._frontier = 0
+        self._block_count = self._document.blockCount()
+        # Numbers of the blocks after the frontier highlighted because
+        # they were visible
+        self._provisional = set()
+        # Set while the layout of a block is updated
+        self._applying = False
+        self._timer = QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._highlight_slice)
+        self._document.contentsChange.connect(self._on_contents_change)
+        editor.updateRequest.connect(self._on_update_request)
+        self.rehighlight()
+
+    @property
+    def done(self):
+        """True when every block is highlighted"""
+        return self._frontier >= self._document.blockCount()
+
+    def rehighlight(self):
+        self._frontier = 0
+        self._provisional.clear()
+        self.highlight_viewport()
+        self._timer.start()
+
+    def detach(self):
+        """Stop highlighting the editor"""
+
+        self._timer.stop()
+        self._document.contentsChange.disconnect(self._on_contents_change)
+        self._editor.updateRequest.disconnect(self._on_update_request)
+
+    def _highlight_block(self, block, previous_state):
+        """Set the formats of block, return its state"""
+
+        text = block.text()
+        length = len(text)
+        ranges = []
+        code = []
+
+        def set_format(start, count, text_format):
+            if start < length:
+                format_range = QTextLayout.FormatRange()
+                format_range.start = start
+                format_range.length = min(count, length - start)
+                format_range.format = text_format
+                ranges.append(format_range)
+
+        state = self._block_highlighter.highlight(
+            text + "\n", previous_state, set_format,
+            lambda start, end: code.append((start, end)))
+        data = block.userData()
+        if data is None:
+            data = BlockUserData()
+            block.setUserData(data)
+        data["brackets"] = BlockBrackets.from_text(text, code)
+        layout = block.layout()
+        if ranges or layout.formats():
+            layout.setFormats(ranges)
+            self._applying = True
+            try:
+                self._document.markContentsDirty(block.position(), length)
+            finally:
+                self._applying = False
+        block.setUserState(state)
+        return state
+
+    def _previous_state(self, block):
+        previous = block.previous()
+        if not previous.isValid():
+            return -1
+        number = previous.blockNumber()
+        if number < self._frontier or number in self._provisional:
+            return previous.userState()
+        return -1
+
+    def highlight_viewport(self):
+        """Highlight the visible blocks that weren't reached yet"""
+
+        editor = self._editor
+        block = editor.firstVisibleBlock()
+        bottom = editor.viewport().height()
+        offset = editor.contentOffset()
+        state = None
+        while block.isValid():
+            if editor.blockBoundingGeometry(block).translated(
+                    offset).top() > bottom:
+                break
+            number = block.blockNumber()
+            if number < self._frontier or number in self._provisional:
+                state = block.userState()
+            else:
+                if state is None:
+                    state = self._previous_state(block)
+                state = self._highlight_block(block, state)
+                self._provisional.add(number)
+            block = block.next()
+
+    def _highlight_slice(self):
+        block = self._document.findBlockByNumber(self._frontier)
+        if block.isValid():
+            state = self._previous_state(block)
+            deadline = time.monotonic() + SLICE_TIME
+            while block.isValid():
+                state = self._highlight_block(block, state)
+                self._frontier += 1
+                block = block.next()
+                if time.monotonic() > deadline:
+                    break
+        if not block.isValid():
+            self._timer.stop()
+            self._provisional.clear()
+
+    def _on_update_request(self, rect, dy):
+        if not self._applying and not self.done:
+            self.highlight_viewport()
+
+    def _on_contents_change(self, position, removed, added):
+        if self._applying:
+            return
+        document = self._document
+        count = document.blockCount()
+        frontier = self._frontier
+        if self._block_count != count:
+            # The block numbers changed
+            self._provisional.clear()
+        block = document.findBlock(position)
+        first = block.blockNumber()
+        if first < frontier:
+            # Highlight the changed blocks now and the next ones while
+            # their state changes, like QSyntaxHighlighter
+            old_frontier = max(frontier + count - self._block_count, first)
+            last = document.findBlock(position + added).blockNumber()
+            state = self._previous_state(block)
+            deadline = time.monotonic() + SLICE_TIME
+            self._frontier = count
+            while block.isValid():
+                number = block.blockNumber()
+                old_state = block.userState()
+                state = self._highlight_block(block, state)
+                block = block.next()
+                if number < last:
+                    continue
+                if state == old_state or number + 1 >= old_frontier:
+                    self._frontier = max(old_frontier, number + 1)
+                    break
+                if time.monotonic() > deadline:
+                    self._frontier = number + 1
+                    break
+        else:
+            self._provisional.discard(first)
+        self._block_count = count
+        self.highlight_viewport()
+        if not self.done:
+            self._timer.start()
+
+
 class Syntax(object):
     __slots__ = ("partition_scanner", "scanners", "context")
 
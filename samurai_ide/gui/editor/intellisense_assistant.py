@@ -15,6 +15,8 @@
 # You should have received a copy of the GNU General Public License
 # along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
 
+import functools
+
 from PyQt5.QtCore import QObject
 from PyQt5.QtCore import Qt
 
@@ -34,6 +36,9 @@ class IntelliSenseAssistant(QObject):
         # Proposal widget
         self._proposal_widget = None
         self.__kind = "completions"
+        self.__waiting_result = False
+        # {request id: (item, completion)} details asked for the proposals
+        self.__details = {}
 
         self.__handlers = {
             "completions": self._handle_completions,
@@ -49,6 +54,9 @@ class IntelliSenseAssistant(QObject):
         self._editor.postKeyPressed.connect(self._on_post_key_pressed)
         self._editor.keyReleased.connect(self._on_key_released)
         self._editor.destroyed.connect(self.deleteLater)
+        # Queued, a provider can answer before the request id is known
+        self._intellisense.detailAvailable.connect(
+            self._on_detail_available, Qt.QueuedConnection)
 
     def _on_key_released(self, event):
         key = event.key()
@@ -80,13 +88,18 @@ class IntelliSenseAssistant(QObject):
 
     def invoke(self, kind):
         self.__kind = kind
-        self._intellisense.resultAvailable.connect(self._on_result_available)
+        if not self.__waiting_result:
+            # Only the result of the last request is emitted
+            self.__waiting_result = True
+            self._intellisense.resultAvailable.connect(
+                self._on_result_available)
         if kind == "completions":
             if self._proposal_widget is not None:
                 self._proposal_widget.abort()
         self._intellisense.process(kind, self._editor)
 
     def _on_result_available(self, result):
+        self.__waiting_result = False
         self._intellisense.resultAvailable.disconnect(
             self._on_result_available)
         try:
@@ -126,11 +139,33 @@ class IntelliSenseAssistant(QObject):
             item = proposal_widget.ProposalItem(completion["text"])
             completion_type = completion["type"]
             item.type = completion_type
-            item.detail = completion["detail"]
+            item.set_detail_resolver(
+                functools.partial(self._request_detail, item, completion))
             item.set_icon(completion_type)
             append(item)
         self._create_view(_completions)
 
+    def _request_detail(self, item, completion):
+        """Ask for the detail of item, it's set when it's available"""
+
+        request_id = self._intellisense.request_detail(
+            self._provider, completion)
+        self.__details[request_id] = (item, completion)
+
+    def _on_detail_available(self, request_id, detail):
+        # Replies for another editor or for closed proposals are dropped
+        item, completion = self.__details.pop(request_id, (None, None))
+        if item is None:
+            return
+        if detail is None:
+            # Failed or cancelled, asked again the next time it's shown
+            item.set_detail_resolver(
+                functools.partial(self._request_detail, item, completion))
+            return
+        item.detail = detail
+        if self._proposal_widget is not None:
+            self._proposal_widget.update_item(item)
+
     def _handle_definitions(self, defs):
         if defs:
             defs = defs[0]
@@ -163,6 +198,7 @@ class IntelliSenseAssistant(QObject):
     def finalize(self):
         del self._proposal_widget
         self._proposal_widget = None
+        self.__details.clear()
 
     def _process_proposal_item(self, item):
         prefix = self._editor.word_under_cursor().selectedText()
@@ -21,6 +21,7 @@ from PyQt5.QtCore import pyqtSignal
 
 from samurai_ide.core.file_handling import file_manager
 from samurai_ide.gui.editor import checkers
+from samurai_ide.gui.editor.checkers import scheduler
 from samurai_ide.gui.editor import helpers
 from samurai_ide.core import settings
 
@@ -56,7 +57,10 @@ class NEditable(QObject):
         self._swap_file = nswapfile.NSwapFile(self)
         # Checkers:
         self.registered_checkers = []
-        self._checkers_executed = 0
+        self._checker_scheduler = scheduler.CheckerScheduler(self)
+        self._checker_scheduler.checkersFinished.connect(
+            lambda: self.checkersUpdated.emit(self))
+        self.fileClosing.connect(self._checker_scheduler.cancel)
 
         # Connect signals
         if self._nfile:
@@ -119,10 +123,15 @@ class NEditable(QObject):
         # New file then try to add a coding line
         if not content:
             helpers.insert_coding_line(self.__editor)
+        # The incremental checkers follow the edits
+        self.__editor.textChanged.connect(self._on_text_edited)
 
         self.fileLoaded.emit(self)
         self.fileLoaded[str].emit(self.file_path)
 
+    def _on_text_edited(self):
+        self._checker_scheduler.schedule(full=False)
+
     def reload_file(self):
         if self._nfile:
             content = self._nfile.read()
@@ -211,19 +220,14 @@ class NEditable(QObject):
             Checker, color, priority = values
             check = Checker(self.__editor)
             self.registered_checkers[i] = (check, color, priority)
-            check.finished.connect(self.show_checkers_notifications)
+            if not isinstance(check, scheduler.BaseChecker):
+                check.finished.connect(
+                    self._checker_scheduler.on_legacy_finished)
 
     def run_checkers(self, content, path=None, encoding=None):
-        for items in self.registered_checkers:
-            checker = items[0]
-            checker.run_checks()
-
-    def show_checkers_notifications(self):
-        """Show the notifications obtained for the proper checker."""
-        self._checkers_executed += 1
-        if self._checkers_executed == len(self.registered_checkers):
-            self._checkers_executed = 0
-            self.checkersUpdated.emit(self)
+        """Run the checkers on the current text of the editor, bursts of
+        requests are coalesced and an older run still going is cancelled"""
+        self._checker_scheduler.schedule()
 
     def update_checkers_display(self):
         for items in self.registered_checkers:
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Find the occurrences of a text in an editor.
+
+The visible blocks are searched at once and the rest of the document in
+chunks when the event loop is idle. The matches are kept sorted, so the
+index of the cursor and the matches of a range are found with bisect.
+"""
+
+import re
+import bisect
+
+from PyQt5.QtCore import QObject
+from PyQt5.QtCore import QPoint
+from PyQt5.QtCore import QTimer
+from PyQt5.QtCore import pyqtSignal
+
+# Characters searched at once in the background
+CHUNK_SIZE = 64 * 1024
+
+
+def compile_pattern(text, case_sensitive=False, whole_word=False):
+    expr = re.escape(text)
+    if whole_word:
+        expr = r"\b" + expr + r"\b"
+    flags = 0 if case_sensitive else re.IGNORECASE
+    return re.compile(expr, flags)
+
+
+def overlaps(text):
+    """True if two matches of text can overlap (a prefix of text is also
+    a suffix), finditer doesn't return all of them in that case"""
+    return any(text[:size] == text[-size:] for size in range(1, len(text)))
+
+
+class OccurrenceSearch(QObject):
+    """Occurrences of a text in an editor.
+
+    The results are dropped when the document changes.
+
+    SIGNALS:
+    @updated()  more matches were found
+    """
+
+    updated = pyqtSignal()
+
+    def __init__(self, editor):
+        super().__init__(editor)
+        self._editor = editor
+        self._query = None
+        self._pattern = None
+        self._text = ""
+        self._revision = -1
+        # Matches found by the background search, sorted
+        self._starts = []
+        self._ends = []
+        # The background search covered the text up to here
+        self._searched = 0
+        # Matches of the visible range after _searched
+        self._visible = []
+        self._timer = QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._search_chunk)
+        editor.textChanged.connect(self._on_text_changed)
+
+    @property
+    def done(self):
+        return self._searched >= len(self._text)
+
+    def __len__(self):
+        return len(self._starts) + len(self._visible)
+
+    def clear(self):
+        self._timer.stop()
+        self._query = None
+        self._pattern = None
+        self._text = ""
+        self._revision = -1
+        self._starts, self._ends = [], []
+        self._searched = 0
+        self._visible = []
+
+    def _grows(self, text, case_sensitive, whole_word):
+        """True if the previous matches contain the matches of text"""
+
+        if self._query is None or whole_word:
+            # A whole word doesn't match where a longer one does
+            return False
+        previous, previous_cs, previous_wo = self._query
+        if (previous_cs, previous_wo) != (case_sensitive, whole_word):
+            return False
+        if not case_sensitive:
+            text, previous = text.lower(), previous.lower()
+        # The skipped overlapping matches could start a match of text
+        return text.startswith(previous) and not overlaps(previous)
+
+    def search(self, text, case_sensitive=False, whole_word=False):
+        """Search text, the matches of the visible range are found before
+        returning and the other ones in the background"""
+
+        revision = self._editor.document().revision()
+        if not text:
+            self.clear()
+            return
+        pattern = compile_pattern(text, case_sensitive, whole_word)
+        if (revision == self._revision and
+                self._grows(text, case_sensitive, whole_word)):
+            # Only check where the shorter text was found
+            self._starts, self._ends = self._filter(
+                pattern, self._starts)
+        else:
+            self._timer.stop()
+            self._text = self._editor.toPlainText()
+            self._revision = revision
+            self._starts, self._ends = [], []
+            self._searched = 0
+        self._query = (text, case_sensitive, whole_word)
+        self._pattern = pattern
+        self._search_visible()
+        if not self.done:
+            self._timer.start()
+
+    def _filter(self, pattern, starts):
+        match = pattern.match
+        text = self._text
+        new_starts, new_ends = [], []
+        for start in starts:
+            if new_ends and start < new_ends[-1]:
+                # Like finditer, the matches don't overlap
+                continue
+            found = match(text, start)
+            if found is not None:
+                new_starts.append(start)
+                new_ends.append(found.end())
+        return new_starts, new_ends
+
+    def visible_range(self):
+        """Return the (start, end) positions of the visible blocks"""
+
+        editor = self._editor
+        first = editor.firstVisibleBlock()
+        last = editor.cursorForPosition(
+            QPoint(0, editor.viewport().height())).block()
+        return first.position(), last.position() + last.length()
+
+    def _search_visible(self):
+        start, end = self.visible_range()
+        start = max(start, self._searched)
+        self._visible = [found.span() for found in
+                         self._pattern.finditer(self._text, start, end)]
+
+    def _search_chunk(self):
+        text = self._text
+        start = self._searched
+        end = min(start + CHUNK_SIZE, len(text))
+        searched = end
+        # Enough to find a match starting before end and to check the
+        # word boundary after it, without scanning the rest of the text
+        window = min(end + len(self._query[0]), len(text))
+        for found in self._pattern.finditer(text, start, window):
+            match_start, match_end = found.span()
+            if match_start >= end:
+                break
+            self._starts.append(match_start)
+            self._ends.append(match_end)
+            searched = max(end, match_end)
+        self._searched = searched
+        # The background search found these ones too
+        self._visible = [match for match in self._visible
+                         if match[0] >= searched]
+        if self.done:
+            self._timer.stop()
+        self.updated.emit()
+
+    def matches(self, start=0, end=None):
+        """Return the (start, end) of the matches found between the start
+        and end positions"""
+
+        if end is None:
+            end = len(self._text)
+        first = bisect.bisect_right(self._ends, start)
+        last = bisect.bisect_left(self._starts, end)
+        matches = list(zip(self._starts[first:last], self._ends[first:last]))
+        matches.extend(match for match in self._visible
+                       if match[1] > start and match[0] < end)
+        return matches
+
+    def searched_matches(self, first=0):
+        """Return the matches found by the background search, from the
+        first one"""
+
+        return list(zip(self._starts[first:], self._ends[first:]))
+
+    def index(self, position):
+        """Return the number of matches found before position"""
+
+        index = bisect.bisect_right(self._ends, position)
+        index += sum(1 for _, end in self._visible if end <= position)
+        return index
+
+    def _on_text_changed(self):
+        if (self._query is not None and self._revision != -1 and
+                self._editor.document().revision() != self._revision):
+            self._timer.stop()
+            # The positions were of the old text, search again the next
+            # time and let the editor remove the selections
+            self._revision = -1
+            self._text = ""
+            self._starts, self._ends = [], []
+            self._searched = 0
+            self._visible = []
+            self.updated.emit()
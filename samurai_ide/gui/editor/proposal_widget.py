@@ -49,14 +49,34 @@ class ProposalItem(object):
     The ProposalItem class acts as an interface for representing an assist
     proposal item.
     """
-    __slots__ = ("text", "type", "detail", "__icon")
+    __slots__ = ("text", "type", "__detail", "__detail_resolver", "__icon")
 
     def __init__(self, text):
         self.text = text
         self.type = None
-        self.detail = None
+        self.__detail = None
+        self.__detail_resolver = None
         self.__icon = None
 
+    @property
+    def detail(self):
+        if self.__detail_resolver is not None:
+            resolver, self.__detail_resolver = self.__detail_resolver, None
+            self.__detail = resolver()
+        return self.__detail
+
+    @detail.setter
+    def detail(self, detail):
+        self.__detail = detail
+        self.__detail_resolver = None
+
+    def set_detail_resolver(self, resolver):
+        """The detail will be the result of resolver(), called the first
+        time the detail is shown, a resolver that returns None can set
+        the detail later"""
+
+        self.__detail_resolver = resolver
+
     @property
     def lower_text(self):
         return self.text.lower()
@@ -129,6 +149,15 @@ class ProposalModel(QAbstractListModel):
     def item(self, index):
         return self.__current_proposals[index]
 
+    def update_item(self, item):
+        """The detail of item changed"""
+
+        for row in range(self.rowCount()):
+            if self.__current_proposals[row] is item:
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [Qt.WhatsThisRole])
+                return
+
     def has_proposals(self):
         return len(self.__current_proposals) > 0
 
@@ -246,7 +275,7 @@ class InfoFrame(QFrame):
         self._label = QLabel()
         self._label.setStyleSheet("border: none")
         font = parent.font()
-        font.setPointSize(font.pointSize() * 0.9)
+        font.setPointSize(int(font.pointSize() * 0.9))
         self._label.setFont(font)
         self._label.setSizePolicy(
             QSizePolicy.Fixed, self._label.sizePolicy().verticalPolicy())
@@ -345,6 +374,16 @@ class ProposalWidget(QFrame):
         self._proposal_view.setModel(self._model)
         self._proposal_view.selectionModel().currentChanged.connect(
             self._info_timer.start)
+        self._model.dataChanged.connect(self._on_data_changed)
+
+    def _on_data_changed(self, top_left, bottom_right):
+        current = self._proposal_view.currentIndex()
+        if top_left.row() <= current.row() <= bottom_right.row():
+            self.show_info()
+
+    def update_item(self, item):
+        if self._model is not None:
+            self._model.update_item(item)
 
     def show_proposal(self, prefix=None):
         self._proposal_view.setFont(self._editor.font())
@@ -26,6 +26,7 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtGui import (
     QPainter,
+    QPixmap,
     QColor
 )
 
@@ -38,65 +39,118 @@ Marker = namedtuple('Marker', 'position color priority')
 
 
 class ScrollBarOverlay(QWidget):
+    """Paint the markers over the scrollbar.
+
+    The markers of each category are binned into pixel rows, a category
+    is binned again only when its markers change (or the geometry of the
+    scrollbar does). The rows are painted to a pixmap, paintEvent only
+    draws that pixmap."""
 
     class Position:
         LEFT = 0
         CENTER = 1
         RIGHT = 2
 
+    # Height of a marker in pixels
+    MARKER_HEIGHT = 4
+
     def __init__(self, nscrollbar):
         super().__init__(nscrollbar)
         self._nscrollbar = nscrollbar
         self.__schedule_updated = False
         self.markers = defaultdict(list)  # {'id': list of markers}
-        self.cache = {}  # {'position': marker}
+        # {'id': {pixel row: marker}}
+        self._bins = {}
+        self._dirty = set()
+        self._geometry = None
+        self._pixmap = None
+        self.cache = {}  # {pixel row: marker}
         self.range_offset = 0.0
         self.visible_range = 0.0
 
     def paintEvent(self, event):
         QWidget.paintEvent(self, event)
         self.update_cache()
-        if not self.cache:
+        if self._pixmap is None:
             return
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._pixmap)
 
+    def _current_geometry(self):
         rect = self._nscrollbar.overlay_rect()
         sb_range = self._nscrollbar.get_scrollbar_range()
-        sb_range = max(self.visible_range, sb_range)
-        result_width = rect.width() / 3
-        result_height = min(rect.height() / sb_range + 1, 4)
-        x = rect.center().x() - 1
-        offset = rect.height() / sb_range * self.range_offset
-        vertical_margin = ((rect.height() / sb_range) - result_height) / 2
-
-        painter = QPainter(self)
-
-        for lineno in self.cache.keys():
-            marker = self.cache[lineno]
-            top = rect.top() + offset + vertical_margin + \
-                marker.position / sb_range * rect.height()
-            painter.fillRect(
-                x,
-                top,
-                result_width,
-                4,
-                QColor(marker.color))
+        sb_range = max(self.visible_range, sb_range, 1)
+        return (rect.top(), rect.height(), rect.width(), rect.center().x(),
+                sb_range, self.range_offset, self.width(), self.height())
+
+    def _bin(self, markers):
+        """Return {pixel row: marker} of markers, the highest priority
+        (or the last one) wins"""
+
+        top, height, _, _, sb_range, range_offset = self._geometry[:6]
+        scale = height / sb_range
+        vertical_margin = (scale - min(scale + 1, self.MARKER_HEIGHT)) / 2
+        start = top + scale * range_offset + vertical_margin
+        rows = {}
+        for marker in markers:
+            row = int(start + marker.position * scale)
+            old = rows.get(row)
+            if old is not None and old.priority > marker.priority:
+                continue
+            rows[row] = marker
+        return rows
 
     def update_cache(self):
-        if not self.__schedule_updated:
+        geometry = self._current_geometry()
+        if geometry != self._geometry:
+            self._geometry = geometry
+            self._dirty.update(self.markers.keys())
+            self._dirty.update(self._bins.keys())
+        elif not self._dirty:
             return
-        self.cache.clear()
-        categories = self.markers.keys()
-        for category in categories:
-            markers = self.markers[category]
-            for marker in markers:
-                old = self.cache.get(marker.position)
-                if old is not None and old.position == marker.position:
-                    if old.priority > marker.priority:
-                        self.cache[old.position] = old
-                        continue
-                self.cache[marker.position] = marker
+        for category in self._dirty:
+            markers = self.markers.get(category)
+            if markers:
+                self._bins[category] = self._bin(markers)
+            else:
+                self._bins.pop(category, None)
+        self._dirty.clear()
         self.__schedule_updated = False
 
+        self.cache = {}
+        for category in self.markers.keys():
+            for row, marker in self._bins.get(category, {}).items():
+                old = self.cache.get(row)
+                if old is not None and old.priority > marker.priority:
+                    continue
+                self.cache[row] = marker
+        self._render()
+
+    def _render(self):
+        if not self.cache or self.width() <= 0 or self.height() <= 0:
+            self._pixmap = None
+            return
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(self.size() * ratio)
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+        _, _, width, center, _, _ = self._geometry[:6]
+        x = center - 1
+        result_width = int(width / 3)
+        colors = {}
+        painter = QPainter(pixmap)
+        for row, marker in self.cache.items():
+            color = colors.get(marker.color)
+            if color is None:
+                color = colors[marker.color] = QColor(marker.color)
+            painter.fillRect(x, row, result_width, self.MARKER_HEIGHT, color)
+        painter.end()
+        self._pixmap = pixmap
+
+    def mark_dirty(self, category):
+        self._dirty.add(category)
+        self.schedule_update()
+
     def schedule_update(self):
         if self.__schedule_updated:
             return
@@ -163,15 +217,25 @@ class NScrollBar(QScrollBar):
     def remove_marker(self, category):
         if category in self._overlay.markers:
             del self._overlay.markers[category]
-            self._overlay.schedule_update()
+            self._overlay.mark_dirty(category)
 
     def add_marker(self, category, lineno, color, priority=0):
         marker = Marker(lineno, color, priority)
         self._overlay.markers[category].append(marker)
-        self._overlay.schedule_update()
+        self._overlay.mark_dirty(category)
+
+    def add_markers(self, category, linenos, color, priority=0):
+        """Add a marker for each line of linenos"""
+
+        self._overlay.markers[category].extend(
+            Marker(lineno, color, priority) for lineno in linenos)
+        self._overlay.mark_dirty(category)
 
     def link(self, scrollbar):
-        self._overlay.markers.update(scrollbar.markers().copy())
+        markers = scrollbar.markers()
+        for category, category_markers in markers.items():
+            self._overlay.markers[category] = list(category_markers)
+            self._overlay.mark_dirty(category)
 
     def markers(self):
         return self._overlay.markers
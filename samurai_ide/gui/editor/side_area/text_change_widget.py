@@ -15,21 +15,30 @@
 # You should have received a copy of the GNU General Public License
 # along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
 
-import difflib
 from PyQt5.QtGui import (
     QPainter,
     QColor
 )
 from PyQt5.QtCore import (
     pyqtSlot,
-    QSize,
-    QTimer
+    QSize
 )
 from samurai_ide.gui.editor.side_area import SideWidget
 from samurai_ide import resources
 
+# State of each line, one byte per line
+UNCHANGED = 0
+UNSAVED = 1
+SAVED = 2
+
+_ON_SAVE = bytes.maketrans(bytes([UNSAVED]), bytes([SAVED]))
+
 
 class TextChangeWidget(SideWidget):
+    """Mark the lines modified since the file was opened.
+
+    The state of the lines is updated from the (position, removed, added)
+    of each change of the document, without comparing the whole text."""
 
     @property
     def unsaved_color(self):
@@ -51,67 +60,78 @@ class TextChangeWidget(SideWidget):
             color = QColor(color)
         self.__saved_color = color
 
-    @property
-    def delay(self):
-        return self.__delay
-
-    @delay.setter
-    def delay(self, ms):
-        if ms != self.__delay:
-            self.__delay = ms
-            self._timer.setInterval(self.__delay)
-
     def __init__(self):
         SideWidget.__init__(self)
-        self.__unsaved_markers = []
-        self.__saved_markers = []
-        self.__saved = False
+        self.__states = bytearray()
+        # States and undo steps of the last save, to restore them when
+        # the changes are undone until that point
+        self.__saved_states = bytearray()
+        self.__saved_steps = 0
         # Default properties
         self.__unsaved_color = QColor(
             resources.COLOR_SCHEME.get("editor.markarea.modified"))
         self.__saved_color = QColor(
             resources.COLOR_SCHEME.get("editor.markarea.saved"))
-        self.__delay = 300
-        # Delay Timer
-        self._timer = QTimer(self)
-        self._timer.setInterval(self.__delay)
-        self._timer.setSingleShot(True)
-        self._timer.timeout.connect(self.__on_text_changed)
 
     def register(self, neditor):
         SideWidget.register(self, neditor)
-        self.__text = neditor.toPlainText()
-        self.__last_saved_text = neditor.toPlainText()
-        # Connect textChanged signal to the timer
-        # the __on_text_chaned slot is executed each '__delay' milliseconds
-        neditor.textChanged.connect(self._timer.start)
+        document = neditor.document()
+        self.__states = bytearray(document.blockCount())
+        self.__saved_states = bytearray(self.__states)
+        self.__saved_steps = document.availableUndoSteps()
+        document.contentsChange.connect(self.__on_contents_change)
+        document.modificationChanged.connect(self.__on_modification_changed)
         neditor.updateRequest.connect(self.update)
         neditor.neditable.fileSaved.connect(self.__on_file_saved)
 
-    @pyqtSlot()
-    def __on_file_saved(self):
-        self.__saved = True
-        self.__last_saved_text = self._neditor.toPlainText()
-        self.__saved_markers += list(self.__unsaved_markers)
+    def line_state(self, lineno):
+        """Return UNCHANGED, UNSAVED or SAVED for the line"""
+        if lineno < len(self.__states):
+            return self.__states[lineno]
+        return UNCHANGED
 
-    @pyqtSlot()
-    def __on_text_changed(self):
-        if self.__saved:
-            self.__saved = False
+    @pyqtSlot(int, int, int)
+    def __on_contents_change(self, position, removed, added):
+        document = self._neditor.document()
+        line_count = document.blockCount()
+        if not document.isUndoAvailable():
+            # The whole text was replaced (file loaded or reloaded)
+            self.__states = bytearray(line_count)
             return
-        self.__unsaved_markers.clear()
-        old_text = self.__last_saved_text
-        actual_text = self._neditor.toPlainText()
-        matcher = difflib.SequenceMatcher(None,
-                                          old_text.splitlines(),
-                                          actual_text.splitlines())
-        for tag, _, _, j1, j2 in matcher.get_opcodes():
-            if tag in ('insert', 'replace'):
-                for lineno in range(j1, j2):
-                    if lineno not in self.__unsaved_markers:
-                        self.__unsaved_markers.append(lineno)
-                    if lineno in self.__saved_markers:
-                        self.__saved_markers.remove(lineno)
+        first_block = document.findBlock(position)
+        first = first_block.blockNumber()
+        last_block = document.findBlock(position + added)
+        last = last_block.blockNumber()
+        if last < first:
+            # The change reaches the end of the document
+            last = line_count - 1
+        elif added and last > first and \
+                first_block.position() == position and \
+                last_block.position() == position + added:
+            # Whole lines inserted, the line after them keeps its text
+            last -= 1
+        # The lines first..last replace the old lines first..old_last
+        old_last = last - (line_count - len(self.__states))
+        self.__states[first:old_last + 1] = \
+            bytes([UNSAVED]) * (last - first + 1)
+
+    @pyqtSlot(bool)
+    def __on_modification_changed(self, modified):
+        document = self._neditor.document()
+        # Saving also sets the document as not modified, but then the
+        # undo steps are not the ones of the last save
+        if not modified and document.isRedoAvailable() and \
+                document.availableUndoSteps() == self.__saved_steps and \
+                len(self.__saved_states) == document.blockCount():
+            self.__states = bytearray(self.__saved_states)
+            self.update()
+
+    @pyqtSlot()
+    def __on_file_saved(self):
+        self.__states = self.__states.translate(_ON_SAVE)
+        self.__saved_states = bytearray(self.__states)
+        self.__saved_steps = self._neditor.document().availableUndoSteps()
+        self.update()
 
     def sizeHint(self):
         return QSize(2, 0)
@@ -121,12 +141,9 @@ class TextChangeWidget(SideWidget):
         painter = QPainter(self)
         height = self._neditor.fontMetrics().height()
         width = self.sizeHint().width()
+        colors = {UNSAVED: self.__unsaved_color,
+                  SAVED: self.__saved_color}
         for top, block_number, _ in self._neditor.visible_blocks:
-            for lineno in self.__unsaved_markers:
-                if block_number == lineno:
-                    painter.fillRect(0, top, width,
-                                     height + 1, self.__unsaved_color)
-            for lineno in self.__saved_markers:
-                if block_number == lineno:
-                    painter.fillRect(0, top, width,
-                                     height + 1, self.__saved_color)
+            state = self.line_state(block_number)
+            if state != UNCHANGED:
+                painter.fillRect(0, top, width, height + 1, colors[state])
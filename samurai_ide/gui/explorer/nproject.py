@@ -45,6 +45,7 @@ class NProject(QObject):
         self.python_path = project.get('PYTHONPATH', '')
         self.additional_builtins = project.get('additional_builtins', [])
         self.program_params = project.get('programParams', '')
+        self.run_targets = project.get('runTargets', [])
         self.venv = project.get('venv', '')
         self.related_projects = project.get('relatedProjects', [])
         self.added_to_console = False
@@ -85,6 +86,7 @@ class NProject(QObject):
         project['postExecScript'] = self.post_exec_script
         project['venv'] = self.venv
         project['programParams'] = self.program_params
+        project['runTargets'] = self.run_targets
         project['relatedProjects'] = self.related_projects
         if file_manager.file_exists(self.path, self._name + '.nja'):
             file_manager.delete_file(self.path, self._name + '.nja')
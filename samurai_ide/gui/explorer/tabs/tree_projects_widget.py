@@ -408,6 +408,8 @@ class ProjectTreeColumn(QDialog):
         action_create_init = menu.addAction(translations.TR_CREATE_INIT)
         menu.addSeparator()
         action_run_project = menu.addAction(translations.TR_RUN_PROJECT)
+        action_run_targets = menu.addAction(translations.TR_RUN_TARGETS)
+        action_lint_project = menu.addAction(translations.TR_LINT_PROJECT)
         action_properties = menu.addAction(translations.TR_PROJECT_PROPERTIES)
         action_show_file_size = menu.addAction(translations.TR_SHOW_FILESIZE)
         menu.addSeparator()
@@ -421,6 +423,10 @@ class ProjectTreeColumn(QDialog):
         action_create_init.triggered.connect(self.current_tree._create_init)
         action_run_project.triggered.connect(
             self.current_tree._execute_project)
+        action_run_targets.triggered.connect(
+            self.current_tree._run_targets)
+        action_lint_project.triggered.connect(
+            self.current_tree._lint_project)
         action_properties.triggered.connect(
             self.current_tree.open_project_properties)
         action_close.triggered.connect(self.current_tree._close_project)
@@ -778,6 +784,16 @@ class TreeProjectsWidget(QTreeView):
         if tools_dock:
             tools_dock.execute_project()
 
+    def _run_targets(self):
+        tools_dock = IDE.get_service('tools_dock')
+        if tools_dock:
+            tools_dock.execute_targets()
+
+    def _lint_project(self):
+        errors_list = IDE.get_service('tab_errors')
+        if errors_list:
+            errors_list.lint_project(self.project.path)
+
     def keyPressEvent(self, event):
         super(TreeProjectsWidget, self).keyPressEvent(event)
         if event.key() in (Qt.Key_Enter, Qt.Key_Return):
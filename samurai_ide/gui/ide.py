@@ -38,6 +38,7 @@ from samurai_ide.core import settings
 from samurai_ide.core import nsettings
 from samurai_ide.core import ipc
 from samurai_ide.core import interpreter_service
+from samurai_ide.core import parse_service
 
 from samurai_ide.gui import actions
 from samurai_ide.gui import notification
@@ -101,6 +102,9 @@ class IDE(QMainWindow):
         self.filesystem = nfilesystem.NVirtualFileSystem()
         # Interpreter service
         self.interpreter = interpreter_service.InterpreterService()
+        # Parse service, shared AST and symbols of the editors
+        self.parse_service = parse_service.ParseService(self)
+        self.goingDown.connect(self.parse_service.shutdown)
         # Sessions handler
         self._session_manager = session_manager.SessionsManager(self)
         IDE.register_service("session_manager", self._session_manager)
@@ -138,6 +142,7 @@ class IDE(QMainWindow):
         ui_tools.install_shortcuts(self, actions.ACTIONS_GENERAL, self)
         self.register_service("ide", self)
         self.register_service("interpreter", self.interpreter)
+        self.register_service("parse_service", self.parse_service)
         self.register_service("filesystem", self.filesystem)
         self.toolbar = IDE.get_service("toolbar")
         # Register signals connections
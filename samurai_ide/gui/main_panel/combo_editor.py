@@ -79,6 +79,9 @@ class ComboEditor(QWidget):
         vbox.addLayout(self.stacked)
 
         self._main_container = IDE.get_service('main_container')
+        parse_service = IDE.get_service('parse_service')
+        if parse_service is not None:
+            parse_service.parsed.connect(self._on_parsed)
 
         if not self.__original:
             self._main_container.fileOpened['QString'].connect(
@@ -385,6 +388,12 @@ class ComboEditor(QWidget):
         self._main_container.current_editor_changed(neditable.file_path)
 
     def _load_symbols(self, neditable):
+        # Python files are parsed by the shared parse service, off the
+        # GUI thread, see _on_parsed
+        parse_service = IDE.get_service('parse_service')
+        if neditable.language() == 'python' and parse_service is not None:
+            parse_service.request(neditable.file_path, neditable.editor.text)
+            return
         # Get symbols handler by language
         symbols_handler = handlers.get_symbols_handler(neditable.language())
         if symbols_handler is None:
@@ -393,6 +402,17 @@ class ComboEditor(QWidget):
         source = source.encode(neditable.editor.encoding)
         symbols, symbols_simplified = symbols_handler.obtain_symbols(
             source, simple=True)
+        self._show_symbols(neditable, symbols, symbols_simplified)
+
+    def _on_parsed(self, path, result):
+        editor = self.current_editor()
+        if editor is None or not hasattr(editor, 'neditable') or \
+                editor.neditable.file_path != path:
+            return
+        self._show_symbols(editor.neditable, result.symbols,
+                           result.symbols_simplified)
+
+    def _show_symbols(self, neditable, symbols, symbols_simplified):
         self._symbols_index = sorted(symbols_simplified.keys())
         symbols_simplified = sorted(
             list(symbols_simplified.items()), key=lambda x: x[0])
@@ -55,6 +55,7 @@ class _MainContainer(QWidget):
     fileOpened = pyqtSignal(str)
     beforeFileSaved = pyqtSignal(str)
     fileSaved = pyqtSignal(str)
+    afterFileSaved = pyqtSignal(str)
     runFile = pyqtSignal(str)
     showFileInExplorer = pyqtSignal(str)
     addToProject = pyqtSignal(str)
@@ -467,6 +468,8 @@ class _MainContainer(QWidget):
         neditor.addBackItemNavigation.connect(self.add_back_item_navigation)
         editable.fileSaved.connect(
             lambda neditable: self._explore_file_code(neditable.file_path))
+        editable.fileSaved.connect(
+            lambda neditable: self.afterFileSaved.emit(neditable.file_path))
         return neditor
 
     def add_back_item_navigation(self):
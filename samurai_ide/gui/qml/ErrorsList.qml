@@ -7,14 +7,20 @@ Rectangle {
     focus: true
 
     signal open(int row)
+    signal openFile(string path, int row, int column)
 
     property var pep8Model: []
     property var errorModel: []
+    property var projectModel: []
 
     function open_item() {
         var item;
         item = listFiles.model.get(listFiles.currentIndex);
-        root.open(item.row);
+        if (item.path) {
+            root.openFile(item.path, item.row, item.column);
+        } else {
+            root.open(item.row);
+        }
     }
 
     function set_pep8_model(model) {
@@ -29,6 +35,12 @@ Rectangle {
         refresh_model();
     }
 
+    function set_project_model(model) {
+        listFiles.currentIndex = 0;
+        projectModel = model;
+        refresh_model();
+    }
+
     function refresh_model() {
         clear_model();
         for(var i = 0; i < pep8Model.length; i++) {
@@ -37,6 +49,7 @@ Rectangle {
                 "codeLine": pep8Model[i][1],
                 "row": pep8Model[i][2],
                 "column": pep8Model[i][3],
+                "path": "",
                 "bug": false,
                 "expanded": false});
         }
@@ -47,6 +60,18 @@ Rectangle {
                 "codeLine": errorModel[i][1],
                 "row": errorModel[i][2],
                 "column": errorModel[i][3],
+                "path": "",
+                "bug": true,
+                "expanded": false});
+        }
+
+        for(i = 0; i < projectModel.length; i++) {
+            listFiles.model.append(
+                {"name": projectModel[i][0],
+                "codeLine": projectModel[i][1],
+                "row": projectModel[i][2],
+                "column": projectModel[i][3],
+                "path": projectModel[i][4],
                 "bug": true,
                 "expanded": false});
         }
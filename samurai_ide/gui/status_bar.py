@@ -170,6 +170,8 @@ class SearchWidget(QWidget):
         self._btn_find_next.clicked.connect(self.find_next)
         self._btn_highlight.toggled.connect(self._toggle_highlighting)
         self._btn_find_previous.clicked.connect(self.find_previous)
+        # Editor whose find results are counted
+        self._counted_editor = None
 
         IDE.register_service("status_search", self)
 
@@ -212,6 +214,7 @@ class SearchWidget(QWidget):
             return
         cs, wo, highlight = self.search_flags
         index, matches = 0, 0
+        self._count_found_results(editor)
         found = editor.find_match(self.search_text, cs, wo, backward, forward)
         if found:
             if rehighlight:
@@ -230,6 +233,25 @@ class SearchWidget(QWidget):
         self._line_search.counter.update_count(
             index, matches, len(self.search_text) > 0)
 
+    def _count_found_results(self, editor):
+        """Update the counter when the editor finds more results"""
+
+        if editor is self._counted_editor:
+            return
+        if self._counted_editor is not None:
+            try:
+                self._counted_editor.foundResultsChanged.disconnect(
+                    self._on_found_results_changed)
+            except (RuntimeError, TypeError):
+                # The editor was closed
+                pass
+        self._counted_editor = editor
+        editor.foundResultsChanged.connect(self._on_found_results_changed)
+
+    def _on_found_results_changed(self, index, matches):
+        self._line_search.counter.update_count(
+            index, matches, len(self.search_text) > 0)
+
 
 class ReplaceWidget(QWidget):
     """Replace widget to find and replace occurrences of words in editor"""
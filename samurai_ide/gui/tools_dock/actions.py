@@ -26,6 +26,22 @@ ACTIONS = (
         },
         "connect": "execute_selection"
     },
+    {
+        "action": {
+            "text": translations.TR_RUN_WITH_PROFILER,
+            "section": (translations.TR_MENU_PROJECT, None),
+            "weight": 115
+        },
+        "connect": "profile_file"
+    },
+    {
+        "action": {
+            "text": translations.TR_RUN_WITH_MEMORY_PROFILER,
+            "section": (translations.TR_MENU_PROJECT, None),
+            "weight": 115
+        },
+        "connect": "profile_file_memory"
+    },
     {
         "shortcut": "run-project",
         "action": {
@@ -15,24 +15,36 @@
 # You should have received a copy of the GNU General Public License
 # along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
 
+import os
+import json
+import signal
+import itertools
+
 from PyQt5.QtWidgets import QWidget
 from PyQt5.QtWidgets import QMenu
 
 from PyQt5.QtGui import QTextCursor
+from PyQt5.QtGui import QTextCharFormat
 from PyQt5.QtGui import QColor
 from PyQt5.QtGui import QFontMetrics
 from PyQt5.QtGui import QPainter
 from PyQt5.QtGui import QKeyEvent
+from PyQt5.QtGui import QKeySequence
 
 from PyQt5.QtCore import Qt
 from PyQt5.QtCore import QSize
 from PyQt5.QtCore import QEvent
+from PyQt5.QtCore import QObject
+from PyQt5.QtCore import QProcess
+from PyQt5.QtCore import QTimer
+from PyQt5.QtCore import pyqtSignal
 
 from samurai_ide import translations
 from samurai_ide import resources
-from samurai_ide.tools import console
+from samurai_ide.tools import console_kernel
 from samurai_ide.tools.logger import NinjaLogger
 from samurai_ide.core import settings
+from samurai_ide.gui.ide import IDE
 from samurai_ide.gui.editor import highlighter
 from samurai_ide.gui.editor import indenter
 from samurai_ide.gui.editor import base_editor
@@ -40,9 +52,144 @@ from samurai_ide.gui.tools_dock.tools_dock import _ToolsDock
 
 logger = NinjaLogger(__name__)
 
+_KERNEL_SCRIPT = os.path.abspath(console_kernel.__file__)
+# Milliseconds the output of the console is buffered before being shown
+FLUSH_INTERVAL = 50
+# Characters of output kept between two flushes, the oldest are dropped
+MAX_PENDING = 256 * 1024
+
 # FIXME: editor background color from theme
 
 
+class ConsoleKernel(QObject):
+    """Client of a tools/console_kernel.py process running the code of the
+    console, with the interpreter of the current project or the one of the
+    preferences. It's started by the first push.
+
+    SIGNALS:
+    @outputReceived(QString, QString)  stream ('stdout' or 'stderr'), text
+    @pushFinished(bool)  a line was run, True if it needs more lines
+    @kernelStarted(QString)  python version of the kernel
+    @kernelFinished()  the process exited or couldn't start
+    """
+
+    outputReceived = pyqtSignal('QString', 'QString')
+    pushFinished = pyqtSignal(bool)
+    kernelStarted = pyqtSignal('QString')
+    kernelFinished = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._process = None
+        self._buffer = b''
+        self._ids = itertools.count(1)
+        # Lines pushed and not answered yet
+        self._waiting = 0
+
+    @property
+    def busy(self):
+        return self._waiting > 0
+
+    @property
+    def running(self):
+        return self._process is not None
+
+    def _environment(self):
+        """Return the interpreter and the working directory"""
+        projects_explorer = IDE.get_service('projects_explorer')
+        project = None
+        if projects_explorer is not None:
+            project = projects_explorer.current_project
+        if project:
+            return project.venv or project.python_exec, project.path
+        return settings.PYTHON_EXEC, None
+
+    def start(self):
+        interpreter, working_dir = self._environment()
+        process = QProcess(self)
+        process.setProgram(interpreter)
+        process.setArguments(['-u', _KERNEL_SCRIPT])
+        if working_dir:
+            process.setWorkingDirectory(working_dir)
+        process.readyReadStandardOutput.connect(self._read)
+        process.readyReadStandardError.connect(self._read_error)
+        process.finished.connect(self._on_finished)
+        process.errorOccurred.connect(self._on_error)
+        self._process = process
+        self._buffer = b''
+        process.start()
+
+    def push(self, line):
+        if self._process is None:
+            self.start()
+        self._waiting += 1
+        request = {'id': next(self._ids), 'method': 'push',
+                   'params': {'line': line}}
+        self._process.write((json.dumps(request) + '\n').encode())
+
+    def interrupt(self):
+        """Raise KeyboardInterrupt in the running code"""
+        if self._process is None:
+            return
+        if os.name == 'posix':
+            os.kill(self._process.processId(), signal.SIGINT)
+        else:
+            # No SIGINT for the processes of other consoles
+            self.restart()
+
+    def restart(self):
+        self.shutdown()
+        self.start()
+
+    def shutdown(self):
+        process, self._process = self._process, None
+        self._waiting = 0
+        if process is not None:
+            process.kill()
+            process.waitForFinished(1000)
+            process.deleteLater()
+
+    def _read(self):
+        if self.sender() is not self._process:
+            return
+        data = self._buffer + self._process.readAllStandardOutput().data()
+        lines = data.split(b'\n')
+        self._buffer = lines.pop()
+        for line in lines:
+            try:
+                message = json.loads(line.decode('utf-8', 'replace'))
+            except ValueError:
+                continue
+            if 'stream' in message:
+                self.outputReceived.emit(message['stream'], message['text'])
+            elif 'result' in message:
+                self._waiting = max(0, self._waiting - 1)
+                self.pushFinished.emit(message['result']['more'])
+            elif message.get('ready'):
+                self.kernelStarted.emit(message['version'])
+
+    def _read_error(self):
+        # Errors of the kernel itself, like a broken interpreter
+        if self.sender() is self._process:
+            data = self._process.readAllStandardError().data()
+            self.outputReceived.emit('stderr', data.decode('utf-8', 'replace'))
+
+    def _on_error(self, error):
+        if self.sender() is self._process and error == QProcess.FailedToStart:
+            self.outputReceived.emit(
+                'stderr', self._process.errorString() + '\n')
+            self._on_finished()
+
+    def _on_finished(self, *args):
+        if self.sender() is not self._process:
+            # Killed by shutdown
+            return
+        self._process.deleteLater()
+        self._process = None
+        self._waiting = 0
+        self.kernelFinished.emit()
+
+
 class Highlighter(highlighter.SyntaxHighlighter):
     """Extends syntax highlighter to only highlight code after prompt"""
 
@@ -119,7 +266,11 @@ class ConsoleSideBar(QWidget):
 
 
 class ConsoleWidget(base_editor.BaseEditor):
-    """Extends QPlainTextEdit to emulate a python interpreter"""
+    """Extends QPlainTextEdit to emulate a python interpreter.
+
+    The code runs in a ConsoleKernel process, the IDE keeps working while
+    it runs. Its output is inserted every FLUSH_INTERVAL ms and only the
+    last settings.CONSOLE_MAX_LINES lines are kept."""
 
     def __init__(self, parent=None):
         super().__init__()
@@ -127,13 +278,28 @@ class ConsoleWidget(base_editor.BaseEditor):
         self.setCursorWidth(10)
         self.setFrameShape(0)
         self.moveCursor(QTextCursor.EndOfLine)
-        self.__incomplete = False
         # History
         self._history_index = 0
         self._history = []
         self._current_command = ''
         # Console
-        self._console = console.Console()
+        self._kernel = ConsoleKernel(self)
+        self._kernel.outputReceived.connect(self._on_output)
+        self._kernel.pushFinished.connect(self._on_push_finished)
+        self._kernel.kernelStarted.connect(self._on_kernel_started)
+        self._kernel.kernelFinished.connect(self._on_kernel_finished)
+        self.setMaximumBlockCount(settings.CONSOLE_MAX_LINES)
+        # [[stream, [text]]] waiting for the next flush
+        self._pending = []
+        self._pending_size = 0
+        # The output of the last command has a block
+        self._output_started = False
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(FLUSH_INTERVAL)
+        self._flush_timer.timeout.connect(self.flush_output)
+        self._error_format = QTextCharFormat()
+        self._error_format.setForeground(QColor('#ff6c6c'))
         self.setFont(settings.FONT)
         # Set highlighter and indenter for Python
         syntax = highlighter.build_highlighter(language='python')
@@ -170,7 +336,12 @@ class ConsoleWidget(base_editor.BaseEditor):
         paste_action = menu.addAction(translations.TR_PASTE)
         menu.addSeparator()
         clear_action = menu.addAction(translations.TR_CLEAR)
+        interrupt_action = menu.addAction(translations.TR_INTERRUPT)
+        interrupt_action.setEnabled(self._kernel.busy)
+        restart_action = menu.addAction(translations.TR_RESTART_CONSOLE)
 
+        interrupt_action.triggered.connect(self._kernel.interrupt)
+        restart_action.triggered.connect(self.restart)
         cut_action.triggered.connect(self._cut)
         copy_action.triggered.connect(self.copy)
         paste_action.triggered.connect(self._paste)
@@ -188,6 +359,18 @@ class ConsoleWidget(base_editor.BaseEditor):
 
     def install_widget(self):
         logger.debug("Installing {}".format(self.__class__.__name__))
+        ninjaide = IDE.get_service("ide")
+        if ninjaide is not None:
+            ninjaide.goingDown.connect(self._kernel.shutdown)
+
+    def restart(self):
+        """Start a new console process, with the interpreter of the
+        current project"""
+        running = self._kernel.running
+        self._kernel.restart()
+        if running:
+            self._on_output('stderr', translations.TR_CONSOLE_RESTARTED + '\n')
+            self._on_push_finished(False)
 
     def __manage_left(self, event):
         return self._cursor_position == 0
@@ -269,38 +452,107 @@ class ConsoleWidget(base_editor.BaseEditor):
     def __manage_enter(self, event):
         """After enter or return pressed"""
 
-        self._write_command()
-        if not self.__incomplete:
-            self.textCursor().insertBlock()
-        self.moveCursor(QTextCursor.End)
+        if not self._kernel.busy:
+            self._write_command()
         return True
 
     def _write_command(self):
+        """Send the command of the last line, the next prompt is added
+        when the console answers, see _on_push_finished"""
+        self.moveCursor(QTextCursor.End)
         command = self.textCursor().block().text()
         self._add_in_history(command)
-        incomplete = self._console.push(command)
-        if not incomplete:
-            self.__incomplete = False
-            output = self._console.output.splitlines()
-            cursor = self.textCursor()
-            block = cursor.block()
-            if output:
-                for line in output:
-                    cursor.insertText("\n" + line)
-                block = block.next()
-                while block.isValid():
-                    self.user_data(block)["prompt"] = ConsoleSideBar.PROMPT_OUT
-                    block = block.next()
+        if not command.strip():
+            # Only the indentation added by the indenter, ends the block
+            command = ''
+        self._output_started = False
+        self._kernel.push(command)
+
+    def _on_output(self, stream, text):
+        if self._pending and self._pending[-1][0] == stream:
+            self._pending[-1][1].append(text)
         else:
-            cursor = self.textCursor()
-            if not self.__incomplete:
-                self.__incomplete = True
+            self._pending.append([stream, [text]])
+        self._pending_size += len(text)
+        while self._pending_size > MAX_PENDING:
+            # Drop the oldest output, it wouldn't be kept on screen
+            texts = self._pending[0][1]
+            extra = self._pending_size - MAX_PENDING
+            if len(texts[0]) > extra:
+                texts[0] = texts[0][extra:]
+                self._pending_size -= extra
+            else:
+                self._pending_size -= len(texts.pop(0))
+                if not texts:
+                    self._pending.pop(0)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush_output(self):
+        """Insert the pending output after the last command"""
+        self._flush_timer.stop()
+        pending, self._pending = self._pending, []
+        self._pending_size = 0
+        if not pending:
+            return
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.beginEditBlock()
+        if not self._output_started:
+            cursor.insertBlock()
+            self._output_started = True
+        lines = 0
+        for stream, texts in pending:
+            text_format = QTextCharFormat()
+            if stream == 'stderr':
+                text_format = self._error_format
+            text = ''.join(texts)
+            lines += text.count('\n')
+            cursor.insertText(text, text_format)
+        cursor.endEditBlock()
+        # From the last block, the first ones may have been removed
+        block = cursor.block()
+        for _ in range(lines + 1):
+            if not block.isValid():
+                break
+            self.user_data(block)["prompt"] = ConsoleSideBar.PROMPT_OUT
+            block = block.previous()
+        self.moveCursor(QTextCursor.End)
+
+    def _on_push_finished(self, more):
+        """Add the prompt for the next line"""
+        self.flush_output()
+        self.moveCursor(QTextCursor.End)
+        cursor = self.textCursor()
+        if more:
             if not self._indenter.indent_block(self.textCursor()):
                 cursor.insertBlock()
             self.user_data(cursor.block())["prompt"] = \
                 ConsoleSideBar.PROMPT_INCOMPLETE
+        else:
+            if not self._output_started or cursor.block().text():
+                cursor.insertBlock()
+            self.user_data(cursor.block())["prompt"] = None
+        self._output_started = False
+        self.setTextCursor(cursor)
+        self.viewport().update()
+
+    def _on_kernel_started(self, version):
+        logger.debug("Console started with python {}".format(version))
+
+    def _on_kernel_finished(self):
+        self._on_output('stderr', translations.TR_CONSOLE_EXITED + '\n')
+        self._on_push_finished(False)
 
     def keyPressEvent(self, event):
+        if self._kernel.busy:
+            if event.matches(QKeySequence.Copy) and \
+                    not self.textCursor().hasSelection():
+                self._kernel.interrupt()
+                return
+            if event.text() or event.key() in (Qt.Key_Up, Qt.Key_Down):
+                # Wait for the running command
+                return
         self._check_event_on_selection(event)
         if self._key_operations.get(event.key(), lambda e: False)(event):
             return
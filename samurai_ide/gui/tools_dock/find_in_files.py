@@ -15,9 +15,9 @@
 # You should have received a copy of the GNU General Public License
 # along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
 
-import queue
 import re
 import os
+import threading
 
 from PyQt5.QtWidgets import (
     QWidget,
@@ -38,87 +38,204 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import (
     QObject,
-    QDir,
     QAbstractItemModel,
-    QFile,
-    QTextStream,
     pyqtSignal,
     pyqtSlot,
-    QRegExp,
     Qt,
     QRect,
     QThread,
+    QTimer,
+    QFileSystemWatcher,
     QModelIndex
 )
 from PyQt5.QtGui import QPalette, QColor
 from samurai_ide.gui.ide import IDE
 from samurai_ide.tools import ui_tools
+from samurai_ide.tools import file_search
+from samurai_ide.tools import search_index
+from samurai_ide.tools.logger import NinjaLogger
 from samurai_ide.core import settings
 from samurai_ide import translations
 from samurai_ide.gui.tools_dock.tools_dock import _ToolsDock
 
+logger = NinjaLogger(__name__)
+
+# Milliseconds between two checks of the indexed files, the watcher doesn't
+# see the files rewritten in place
+VERIFY_INTERVAL = 30000
+
 
 class FindInFilesWorker(QObject):
+    """Run the searches of the FindInFilesWidget inside its own thread.
 
-    finished = pyqtSignal()
-    resultAvailable = pyqtSignal('PyQt_PyObject')
-
-    def find_in_files(self, dir_name, filters, regexp, recursive):
-        """Trigger the find in files thread and return the lines found"""
-
-        self._cancel = False
-        self.recursive = recursive
-        self.search_pattern = regexp
-        self.filters = filters
-        self.queue = queue.Queue()
-        self.queue.put(dir_name)
-        self.root_dir = dir_name
-        # Start!
-        self.start_worker()
-
-    def start_worker(self):
-        file_filter = QDir.Files | QDir.NoDotAndDotDot | QDir.Readable
-        dir_filter = QDir.Dirs | QDir.NoDotAndDotDot | QDir.Readable
-        while not self._cancel and not self.queue.empty():
-            current_dir = QDir(self.queue.get())
-            # Skip not readable dirs!
-            if not current_dir.isReadable():
-                continue
-            # Collect all sub dirs!
-            if self.recursive:
-                current_sub_dirs = current_dir.entryInfoList(dir_filter)
-                for one_dir in current_sub_dirs:
-                    self.queue.put(one_dir.absoluteFilePath())
-            # All files in sub_dir first apply the filters
-            current_files = current_dir.entryInfoList(
-                self.filters, file_filter)
-            # Process all files in current dir
-            for one_file in current_files:
-                self._grep_file(
-                    one_file.absoluteFilePath(), one_file.fileName())
-
-        self.finished.emit()
-
-    def _grep_file(self, file_path, file_name):
-        """Search for each line inside the file"""
-        file_obj = QFile(file_path)
-        if not file_obj.open(QFile.ReadOnly):
+    Every signal carries the id of the search so that the results of a
+    cancelled search can be discarded."""
+
+    finished = pyqtSignal(int, 'PyQt_PyObject')
+    resultAvailable = pyqtSignal(int, 'PyQt_PyObject')
+    progress = pyqtSignal(int, 'PyQt_PyObject')
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._engine = file_search.SearchEngine(
+            workers=settings.FIND_IN_FILES_WORKERS,
+            use_processes=settings.FIND_IN_FILES_USE_PROCESSES)
+        # Read only connections to the indexes, one per project
+        self._indexes = {}
+
+    def _candidates(self, dir_name, regexp):
+        index = self._indexes.get(dir_name)
+        if index is None:
+            index = search_index.TrigramIndex(dir_name)
+            self._indexes[dir_name] = index
+        candidates = index.candidates(regexp)
+        if candidates is None:
+            candidates = index.files()
+        return candidates
+
+    @pyqtSlot(int, 'QString', 'PyQt_PyObject', 'PyQt_PyObject', bool, bool)
+    def find_in_files(self, search_id, dir_name, filters, regexp, recursive,
+                      use_index):
+        """Search regexp in the files of dir_name, the results are emitted
+        in batches of (file_path, lines)"""
+
+        file_paths = None
+        if use_index and recursive:
+            try:
+                file_paths = self._candidates(dir_name, regexp)
+            except Exception as reason:
+                logger.error("Search index not available: %r", reason)
+        stats = self._engine.search(
+            dir_name, filters, regexp, recursive,
+            on_results=lambda batch: self.resultAvailable.emit(
+                search_id, batch),
+            on_progress=lambda stats: self.progress.emit(search_id, stats),
+            file_paths=file_paths)
+        self.finished.emit(search_id, stats)
+
+    def cancel(self):
+        """Thread safe, stop the running search as soon as possible"""
+        self._engine.cancel()
+
+    def shutdown(self):
+        self._engine.shutdown()
+        for index in self._indexes.values():
+            index.close()
+        self._indexes.clear()
+
+
+class SearchIndexWorker(QObject):
+    """Keep the trigram indexes of the open projects up to date.
+
+    Lives in its own thread, the indexes are refreshed when a project is
+    opened, when a file is saved, when the filesystem watcher reports
+    changes in a folder and every VERIFY_INTERVAL for the files changed in
+    place. The searches only read the last refreshed state."""
+
+    indexReady = pyqtSignal('QString')
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._indexes = {}
+        self._watcher = None
+        self._timer = None
+        self._verify_timer = None
+        self._changed_folders = set()
+        self._cancel = threading.Event()
+
+    def _index_for(self, path):
+        for root, index in self._indexes.items():
+            if path == root or path.startswith(os.path.join(root, '')):
+                return index
+
+    def _watch(self, folders):
+        if self._watcher is None:
+            self._watcher = QFileSystemWatcher(self)
+            self._watcher.directoryChanged.connect(self._on_folder_changed)
+            self._timer = QTimer(self)
+            self._timer.setSingleShot(True)
+            self._timer.timeout.connect(self._update_changed_folders)
+            self._verify_timer = QTimer(self)
+            self._verify_timer.timeout.connect(self._update_changed_files)
+            self._verify_timer.start(VERIFY_INTERVAL)
+        watched = set(self._watcher.directories())
+        folders = [folder for folder in folders if folder not in watched]
+        if folders:
+            self._watcher.addPaths(folders)
+
+    @pyqtSlot('QString', 'PyQt_PyObject')
+    def open_index(self, project_path, filters):
+        if project_path in self._indexes:
+            return
+        index = None
+        try:
+            index = search_index.TrigramIndex(project_path, filters)
+            folders = index.refresh(self._cancel)
+        except Exception as reason:
+            logger.error("Search index for %s failed: %r",
+                         project_path, reason)
+            folders = None
+        if folders is None or self._cancel.is_set():
+            if index is not None:
+                index.close()
+            return
+        self._indexes[project_path] = index
+        self._watch(folders)
+        self.indexReady.emit(project_path)
+
+    @pyqtSlot('QString')
+    def close_index(self, project_path):
+        index = self._indexes.pop(project_path, None)
+        if index is None:
+            return
+        index.close()
+        if self._watcher is None:
             return
-        stream = QTextStream(file_obj)
-        lines = []
-        append = lines.append
-        line_index = 0
-        line = stream.readLine()
-        while not self._cancel and not stream.atEnd():
-            column = self.search_pattern.indexIn(line)
-            if column != -1:
-                append((line_index, line))
-            # Take the next line
-            line = stream.readLine()
-            line_index += 1
-
-        p = os.path.join(self.root_dir, file_path)
-        self.resultAvailable.emit((p, lines))
+        prefix = os.path.join(project_path, '')
+        folders = [folder for folder in self._watcher.directories()
+                   if folder == project_path or folder.startswith(prefix)]
+        if folders:
+            self._watcher.removePaths(folders)
+
+    @pyqtSlot(str)
+    def update_file(self, file_path):
+        index = self._index_for(file_path)
+        if index is not None:
+            index.update_file(file_path)
+
+    def _on_folder_changed(self, folder):
+        # Changes come in bursts, e.g. a checkout
+        self._changed_folders.add(folder)
+        self._timer.start(500)
+
+    def _update_changed_folders(self):
+        folders = sorted(self._changed_folders)
+        self._changed_folders.clear()
+        for folder in folders:
+            index = self._index_for(folder)
+            if index is None:
+                continue
+            try:
+                self._watch(index.update_directory(folder))
+            except Exception as reason:
+                logger.error("Search index update failed: %r", reason)
+
+    def _update_changed_files(self):
+        for index in list(self._indexes.values()):
+            if self._cancel.is_set():
+                return
+            try:
+                index.update_changed_files()
+            except Exception as reason:
+                logger.error("Search index update failed: %r", reason)
+
+    def cancel(self):
+        self._cancel.set()
+
+    def shutdown(self):
+        for index in self._indexes.values():
+            index.close()
+        self._indexes.clear()
 
 
 class SearchResultTreeView(QTreeView):
@@ -135,12 +252,17 @@ class SearchResultTreeView(QTreeView):
     def clear(self):
         self._model.clear()
 
-    def add_result(self, results):
-        self._model.add_result(results)
+    def add_results(self, results):
+        self._model.add_results(results)
 
 
 class FindInFilesWidget(QWidget):
 
+    searchStarted = pyqtSignal(int, 'QString', 'PyQt_PyObject',
+                               'PyQt_PyObject', bool, bool)
+    indexRequested = pyqtSignal('QString', 'PyQt_PyObject')
+    indexClosed = pyqtSignal('QString')
+
     def __init__(self, parent=None):
         super().__init__(parent)
         _ToolsDock.register_widget(translations.TR_FIND_IN_FILES, self)
@@ -176,13 +298,34 @@ class FindInFilesWidget(QWidget):
 
         self._main_container = IDE.get_service("main_container")
         # Search worker
+        self._search_id = 0
         self._search_worker = FindInFilesWorker()
-        search_thread = QThread()
-        self._search_worker.moveToThread(search_thread)
-        self._search_worker.resultAvailable.connect(self._on_worker_finished)
-        search_thread.finished.connect(search_thread.deleteLater)
+        self._search_thread = QThread(self)
+        self._search_worker.moveToThread(self._search_thread)
+        self._search_worker.resultAvailable.connect(self._on_result_available)
+        self._search_worker.progress.connect(self._on_search_progress)
+        self._search_worker.finished.connect(self._on_search_finished)
+        self.searchStarted.connect(self._search_worker.find_in_files)
+        self._search_thread.start()
+        # Search index
+        self._indexed_projects = set()
+        self._index_worker = SearchIndexWorker()
+        self._index_thread = QThread(self)
+        self._index_worker.moveToThread(self._index_thread)
+        self._index_worker.indexReady.connect(self._on_index_ready)
+        self.indexRequested.connect(self._index_worker.open_index)
+        self.indexClosed.connect(self._index_worker.close_index)
+        self._index_thread.start()
+        ninjaide = IDE.get_service("ide")
+        ninjaide.goingDown.connect(self._stop_search_thread)
+        if settings.FIND_IN_FILES_USE_INDEX:
+            ninjaide.filesystem.projectOpened.connect(self._on_project_opened)
+            ninjaide.filesystem.projectClosed.connect(self._on_project_closed)
+            self._main_container.afterFileSaved.connect(
+                self._index_worker.update_file)
 
         self._actions.searchRequested.connect(self._on_search_requested)
+        self._actions.cancelRequested.connect(self._cancel_search)
         self._tree_results.activated.connect(self._go_to)
 
     def _clear_results(self):
@@ -198,31 +341,86 @@ class FindInFilesWidget(QWidget):
             # Open the file and jump to line
             self._main_container.open_file(file_name, line=lineno)
 
-    @pyqtSlot('PyQt_PyObject')
-    def _on_worker_finished(self, lines):
-        self.__count += len(lines[-1])
+    def _show_message(self, text):
         self._message_frame.show()
-        self._message_label.setText(
-            translations.TR_MATCHES_FOUND.format(self.__count))
-        self._tree_results.add_result(lines)
+        self._message_label.setText(text)
+
+    @pyqtSlot(int, 'PyQt_PyObject')
+    def _on_result_available(self, search_id, results):
+        if search_id != self._search_id:
+            return
+        self.__count += sum(len(lines) for _, lines in results)
+        self._tree_results.add_results(results)
+
+    @pyqtSlot(int, 'PyQt_PyObject')
+    def _on_search_progress(self, search_id, stats):
+        if search_id != self._search_id:
+            return
+        self._show_message(translations.TR_SEARCH_PROGRESS.format(
+            self.__count, stats.files, stats.files_per_second,
+            stats.bytes_per_second / 1048576.0, stats.workers))
+
+    @pyqtSlot(int, 'PyQt_PyObject')
+    def _on_search_finished(self, search_id, stats):
+        if search_id != self._search_id:
+            return
+        self._actions.set_searching(False)
+        if stats.cancelled:
+            self._show_message(translations.TR_SEARCH_CANCELLED)
+        else:
+            self._on_search_progress(search_id, stats)
+        logger.debug("Find in Files: %s", stats)
+
+    def _cancel_search(self):
+        self._search_id += 1
+        self._search_worker.cancel()
+        self._actions.set_searching(False)
+
+    def _stop_search_thread(self):
+        self._search_worker.cancel()
+        self._index_worker.cancel()
+        for thread in (self._search_thread, self._index_thread):
+            thread.quit()
+            thread.wait()
+        self._search_worker.shutdown()
+        self._index_worker.shutdown()
+
+    def _on_project_opened(self, project_path):
+        nproject = IDE.get_service("ide").get_projects().get(project_path)
+        if nproject is None:
+            return
+        filters = ["*{0}".format(ext) for ext in nproject.extensions]
+        self.indexRequested.emit(project_path, filters)
+
+    def _on_project_closed(self, project_path):
+        self._indexed_projects.discard(project_path)
+        self.indexClosed.emit(project_path)
+
+    @pyqtSlot('QString')
+    def _on_index_ready(self, project_path):
+        self._indexed_projects.add(project_path)
 
     @pyqtSlot('QString', bool, bool, bool)
     def _on_search_requested(self, to_find, cs, regex, wo):
+        # Stop the current search, if any
+        self._cancel_search()
         self._clear_results()
-        type_ = QRegExp.FixedString
-        if regex:
-            type_ = QRegExp.RegExp
-        if wo:
-            type_ = QRegExp.RegExp
-            to_find = "|".join(["\\b" + word.strip() + "\\b"
-                                for word in to_find.split()])
+        try:
+            pattern = file_search.compile_pattern(to_find, cs, regex, wo)
+        except re.error as reason:
+            self._show_message(
+                translations.TR_SEARCH_INVALID_REGEX.format(reason))
+            return
         filters = re.split(",", "*.py")
-        pattern = QRegExp(to_find, cs, type_)
-        self._search_worker.find_in_files(
-            self._actions.current_project_path,
+        project_path = self._actions.current_project_path
+        self._actions.set_searching(True)
+        self.searchStarted.emit(
+            self._search_id,
+            project_path,
             filters,
             pattern,
-            recursive=True
+            True,
+            project_path in self._indexed_projects
         )
 
     def showEvent(self, event):
@@ -245,10 +443,17 @@ class TreeItem(object):
         self.result = result_item
         self.parent_item = parent
         self.child_items = []
+        self._row = 0
 
     def append_child(self, item):
+        item._row = len(self.child_items)
         self.child_items.append(item)
 
+    def extend_children(self, items):
+        for row, item in enumerate(items, len(self.child_items)):
+            item._row = row
+        self.child_items.extend(items)
+
     def child(self, row):
         return self.child_items[row]
 
@@ -259,9 +464,7 @@ class TreeItem(object):
         return self.result
 
     def row(self):
-        if self.parent_item is not None:
-            return self.parent_item.child_items.index(self)
-        return 0
+        return self._row
 
     def parent(self):
         return self.parent_item
@@ -322,25 +525,28 @@ class SearchResultModel(QAbstractItemModel):
         super().__init__()
         self.root_item = TreeItem(None)
 
-    def add_result(self, result):
-        file_path = result[0]
-        items = result[1]
-        if items:
+    def add_results(self, results):
+        """Append a batch of (file_path, lines) with a single insertion"""
+        new_items = []
+        for file_path, lines in results:
+            if not lines:
+                continue
             parent = ResultItem()
             parent.file_path = file_path
             parent_item = TreeItem(parent, self.root_item)
-            self.beginInsertRows(QModelIndex(), 0, 0)
-            self.root_item.append_child(parent_item)
-            self.endInsertRows()
-            for item in items:
+            for lineno, text in lines:
                 io = ResultItem()
                 io.parent = parent
-                io.lineno = item[0]
-                io.text = item[1]
-                item_tree = TreeItem(io, parent_item)
-                self.beginInsertRows(QModelIndex(), 0, 0)
-                parent_item.append_child(item_tree)
-                self.endInsertRows()
+                io.lineno = lineno
+                io.text = text
+                parent_item.append_child(TreeItem(io, parent_item))
+            new_items.append(parent_item)
+        if not new_items:
+            return
+        first = self.root_item.child_count()
+        self.beginInsertRows(QModelIndex(), first, first + len(new_items) - 1)
+        self.root_item.extend_children(new_items)
+        self.endInsertRows()
 
     def parent(self, index=QModelIndex()):
         if not index.isValid():
@@ -398,6 +604,7 @@ class SearchResultModel(QAbstractItemModel):
 class FindInFilesActions(QWidget):
 
     searchRequested = pyqtSignal('QString', bool, bool, bool)
+    cancelRequested = pyqtSignal()
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -429,10 +636,17 @@ class FindInFilesActions(QWidget):
         self._check_recursive = QCheckBox('Recursive')
         widgets_layout.addWidget(self._check_recursive, 3, 1)
         main_layout.addLayout(widgets_layout)
+        self._btn_cancel = QPushButton(translations.TR_CANCEL_SEARCH)
+        self._btn_cancel.hide()
+        main_layout.addWidget(self._btn_cancel)
         main_layout.addStretch(1)
 
         # Connections
         self._line_search.returnPressed.connect(self.search_requested)
+        self._btn_cancel.clicked.connect(self.cancelRequested.emit)
+
+    def set_searching(self, searching):
+        self._btn_cancel.setVisible(searching)
 
     def _update_combo_projects(self):
         projects = self.ninjaide.get_projects()
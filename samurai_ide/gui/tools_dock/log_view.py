@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""View of the output of a program saved to a file.
+
+Only the lines on screen are read from the tools.output_log.OutputLog, so
+huge outputs don't grow the memory of the IDE.
+"""
+
+import os
+import re
+import time
+
+from PyQt5.QtWidgets import QAbstractScrollArea
+from PyQt5.QtWidgets import QHBoxLayout
+from PyQt5.QtWidgets import QLineEdit
+from PyQt5.QtWidgets import QVBoxLayout
+from PyQt5.QtWidgets import QWidget
+
+from PyQt5.QtGui import QColor
+from PyQt5.QtGui import QIntValidator
+from PyQt5.QtGui import QPainter
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtCore import pyqtSignal
+
+from samurai_ide import resources
+from samurai_ide import translations
+from samurai_ide.core import settings
+from samurai_ide.tools.output_log import OutputLog
+
+# Milliseconds between two checks of the size of the log
+REFRESH_INTERVAL = 100
+# Characters of the program name kept in the name of its log
+MAX_NAME_LENGTH = 40
+
+_UNSAFE_CHARS = re.compile(r'[^\w.-]+')
+
+
+def new_log_path(name):
+    """Return a new file path for the output of the program name, name
+    can be a path or a command line, only a safe file name is taken
+    from it"""
+    name = _UNSAFE_CHARS.sub('_', name).strip('._-')[-MAX_NAME_LENGTH:]
+    return os.path.join(resources.OUTPUT_LOGS, '{}-{}-{}.log'.format(
+        name or 'output', os.getpid(), int(time.time() * 1000)))
+
+
+class LogView(QAbstractScrollArea):
+    """Paint the visible lines of an OutputLog"""
+
+    def __init__(self, log, parent=None):
+        super().__init__(parent)
+        self._log = log
+        self._current_line = -1
+        self.setFont(settings.FONT)
+        self.setFrameShape(0)
+        palette = self.palette()
+        palette.setColor(
+            palette.Base,
+            QColor(resources.COLOR_SCHEME.get('editor.background')))
+        palette.setColor(
+            palette.Text,
+            QColor(resources.COLOR_SCHEME.get('editor.foreground')))
+        self.setPalette(palette)
+        self._current_color = QColor(
+            resources.COLOR_SCHEME.get('editor.line'))
+
+    @property
+    def current_line(self):
+        return self._current_line
+
+    def visible_lines(self):
+        return max(1, self.viewport().height() //
+                   self.fontMetrics().lineSpacing())
+
+    def refresh(self):
+        """Update the scroll range to the lines of the log, the view
+        follows the end if it was showing it"""
+        scrollbar = self.verticalScrollBar()
+        follow = scrollbar.value() == scrollbar.maximum()
+        visible = self.visible_lines()
+        scrollbar.setPageStep(visible)
+        scrollbar.setRange(0, max(0, self._log.line_count - visible))
+        if follow:
+            scrollbar.setValue(scrollbar.maximum())
+        self.viewport().update()
+
+    def go_to_line(self, lineno):
+        self._current_line = max(0, min(lineno, self._log.line_count - 1))
+        self.verticalScrollBar().setValue(
+            self._current_line - self.visible_lines() // 2)
+        self.viewport().update()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.refresh()
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        metrics = self.fontMetrics()
+        height = metrics.lineSpacing()
+        first = self.verticalScrollBar().value()
+        lines = self._log.lines(first, self.visible_lines() + 1)
+        painter.setPen(self.palette().text().color())
+        width = self.viewport().width()
+        for index, text in enumerate(lines):
+            top = index * height
+            if first + index == self._current_line:
+                painter.fillRect(0, top, width, height, self._current_color)
+            painter.drawText(2, top + metrics.ascent(), text)
+        painter.end()
+
+
+class LogOutputWidget(QWidget):
+    """Output of a program kept in a file, with search and go to line.
+
+    Offers the methods of run_widget.OutputWidget used by the Program."""
+
+    inputRequested = pyqtSignal("QString")
+
+    def __init__(self, log_path, parent=None):
+        super().__init__(parent)
+        self._log = OutputLog(log_path)
+        self._shown_size = -1
+        vbox = QVBoxLayout(self)
+        vbox.setContentsMargins(0, 0, 0, 0)
+        vbox.setSpacing(0)
+        hbox = QHBoxLayout()
+        hbox.setContentsMargins(0, 0, 0, 0)
+        self._search = QLineEdit()
+        self._search.setPlaceholderText(translations.TR_FIND)
+        self._search.returnPressed.connect(self.find_next)
+        hbox.addWidget(self._search)
+        self._line = QLineEdit()
+        self._line.setPlaceholderText(translations.TR_LINE)
+        self._line.setValidator(QIntValidator(1, 2 ** 31 - 1, self._line))
+        self._line.setMaximumWidth(120)
+        self._line.returnPressed.connect(self._go_to_line)
+        hbox.addWidget(self._line)
+        vbox.addLayout(hbox)
+        self.view = LogView(self._log)
+        vbox.addWidget(self.view)
+        self._input = QLineEdit()
+        self._input.returnPressed.connect(self._send_input)
+        vbox.addWidget(self._input)
+        self._timer = QTimer(self)
+        self._timer.setInterval(REFRESH_INTERVAL)
+        self._timer.timeout.connect(self._refresh)
+        self._timer.start()
+
+    @property
+    def log(self):
+        return self._log
+
+    def write(self, text, text_format=None):
+        self._log.write(text.encode('utf-8'))
+
+    def append_text(self, text, text_format=None):
+        self.write(text + '\n', text_format)
+
+    def gray_out_old_text(self):
+        # Only separate the runs, the log has no formats
+        self.append_text('')
+
+    def setReadOnly(self, read_only):
+        self._input.setEnabled(not read_only)
+
+    def _refresh(self):
+        if self._log.size != self._shown_size:
+            self._shown_size = self._log.size
+            self.view.refresh()
+
+    def find_next(self):
+        text = self._search.text()
+        if not text:
+            return
+        lineno = self.view.current_line + 1
+        if lineno >= self._log.line_count:
+            lineno = 0
+        found = self._log.find(text, lineno)
+        if found != -1:
+            self.view.go_to_line(found)
+
+    def _go_to_line(self):
+        text = self._line.text()
+        if text:
+            self.view.go_to_line(int(text) - 1)
+
+    def _send_input(self):
+        text = self._input.text()
+        self._input.clear()
+        self.append_text(text)
+        self.inputRequested.emit(text)
+
+    def close_log(self):
+        self._timer.stop()
+        self._log.close()
@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Hotspots, allocations and icicle graph of a profiled program.
+
+The profile saved by tools.profile_runner is read in a ProfileLoader
+thread, the table and the graph only get the result.
+"""
+
+import os
+import time
+import zlib
+
+from PyQt5.QtWidgets import QAbstractItemView
+from PyQt5.QtWidgets import QLabel
+from PyQt5.QtWidgets import QScrollArea
+from PyQt5.QtWidgets import QSplitter
+from PyQt5.QtWidgets import QTableView
+from PyQt5.QtWidgets import QToolTip
+from PyQt5.QtWidgets import QVBoxLayout
+from PyQt5.QtWidgets import QWidget
+
+from PyQt5.QtGui import QColor
+from PyQt5.QtGui import QPainter
+from PyQt5.QtGui import QStandardItem
+from PyQt5.QtGui import QStandardItemModel
+
+from PyQt5.QtCore import QRectF
+from PyQt5.QtCore import QThread
+from PyQt5.QtCore import Qt
+from PyQt5.QtCore import pyqtSignal
+
+from samurai_ide import resources
+from samurai_ide import translations
+from samurai_ide.gui.ide import IDE
+from samurai_ide.gui.tools_dock.tools_dock import _ToolsDock
+from samurai_ide.tools import process_stats
+from samurai_ide.tools import profile_data
+from samurai_ide.tools.logger import NinjaLogger
+
+logger = NinjaLogger(__name__)
+
+# Rows of the table, the ones with the largest values
+MAX_ROWS = 2000
+# Role of the values used to sort the table
+SORT_ROLE = Qt.UserRole
+# Role of the (path, lineno) of the first column
+LOCATION_ROLE = Qt.UserRole + 1
+
+
+def new_profile_path(name, profiler):
+    """Return a new file path for the profile of the program name"""
+    extension = 'prof' if profiler == profile_data.CPROFILE else 'snapshot'
+    return os.path.join(resources.PROFILES, '{}-{}-{}.{}'.format(
+        name, os.getpid(), int(time.time() * 1000), extension))
+
+
+def _format_time(seconds):
+    return '%.1f ms' % (seconds * 1000)
+
+
+class ProfileLoader(QThread):
+    """Read a profile with profile_data.load out of the GUI thread
+
+    SIGNALS:
+    @profileLoaded(PyQt_PyObject)  the profile_data.ProfileResult
+    @loadFailed(QString)  the reason
+    """
+
+    profileLoaded = pyqtSignal('PyQt_PyObject')
+    loadFailed = pyqtSignal('QString')
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._kind = None
+        self._path = None
+
+    def load(self, kind, path):
+        self.wait()
+        self._kind = kind
+        self._path = path
+        self.start()
+
+    def run(self):
+        try:
+            result = profile_data.load(self._kind, self._path)
+        except Exception as reason:
+            logger.warning('Profile not loaded: %r' % reason)
+            self.loadFailed.emit(str(reason))
+            return
+        self.profileLoaded.emit(result)
+
+
+class IcicleView(QWidget):
+    """Icicle graph of a profile_data.Frame, the root on top and the width
+    of the frames proportional to their value
+
+    SIGNALS:
+    @frameClicked(QString, int)  path and line of the clicked frame
+    """
+
+    frameClicked = pyqtSignal('QString', int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMouseTracking(True)
+        self.setToolTip(translations.TR_PROFILE_GRAPH_TOOLTIP)
+        self._root = None
+        # Frame shown with the whole width
+        self._zoom = None
+        self._format = str
+        # [(QRectF, frame)] of the last paint
+        self._rects = []
+
+    @property
+    def row_height(self):
+        return self.fontMetrics().height() + 6
+
+    def set_root(self, root, format_value):
+        self._root = self._zoom = root
+        self._format = format_value
+        self.setMinimumHeight(self.row_height * (self._depth(root) + 1))
+        self.update()
+
+    def _depth(self, frame):
+        depth = 0
+        pending = [(frame, 0)]
+        while pending:
+            frame, level = pending.pop()
+            depth = max(depth, level)
+            pending.extend((child, level + 1) for child in frame.children)
+        return depth
+
+    def _layout(self):
+        rects = []
+        if self._zoom is None or not self._zoom.value:
+            return rects
+        height = self.row_height
+        pending = [(self._zoom, 0.0, float(self.width()), 0)]
+        while pending:
+            frame, x, width, depth = pending.pop()
+            rects.append((QRectF(x, depth * height, width, height), frame))
+            for child in frame.children:
+                child_width = width * child.value / frame.value
+                if child_width >= 1:
+                    pending.append((child, x, child_width, depth + 1))
+                x += child_width
+        return rects
+
+    def _color(self, frame):
+        # The frames of a file have the same color
+        hue = zlib.crc32((frame.path or frame.name).encode(
+            'utf-8', 'surrogatepass')) % 360
+        return QColor.fromHsv(hue, 90, 210)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(event.rect(), QColor(
+            resources.COLOR_SCHEME.get('editor.background')))
+        self._rects = self._layout()
+        metrics = self.fontMetrics()
+        for rect, frame in self._rects:
+            if not rect.intersects(QRectF(event.rect())):
+                continue
+            painter.fillRect(rect.adjusted(0, 0, -1, -1), self._color(frame))
+            if rect.width() > metrics.averageCharWidth() * 3:
+                text = metrics.elidedText(frame.name, Qt.ElideRight,
+                                          int(rect.width()) - 6)
+                painter.setPen(Qt.black)
+                painter.drawText(rect.adjusted(3, 0, -3, 0),
+                                 Qt.AlignVCenter | Qt.AlignLeft, text)
+
+    def frame_at(self, pos):
+        for rect, frame in self._rects:
+            if rect.contains(pos):
+                return frame
+        return None
+
+    def mouseMoveEvent(self, event):
+        frame = self.frame_at(event.localPos())
+        if frame is None:
+            QToolTip.hideText()
+        else:
+            text = '{}\n{} ({:.1f}%)'.format(
+                frame.name, self._format(frame.value),
+                100.0 * frame.value / self._root.value)
+            if frame.path:
+                text += '\n{}:{}'.format(frame.path, frame.lineno)
+            QToolTip.showText(event.globalPos(), text, self)
+        super().mouseMoveEvent(event)
+
+    def mousePressEvent(self, event):
+        frame = self.frame_at(event.localPos())
+        if event.button() == Qt.LeftButton and frame is not None and \
+                frame.path and os.path.isfile(frame.path):
+            self.frameClicked.emit(frame.path, frame.lineno)
+        super().mousePressEvent(event)
+
+    def mouseDoubleClickEvent(self, event):
+        frame = self.frame_at(event.localPos())
+        if frame is not None:
+            # The top frame zooms out
+            self._zoom = self._root if frame is self._zoom else frame
+            self.update()
+        super().mouseDoubleClickEvent(event)
+
+
+class ProfilerWidget(QWidget):
+    """Show the last profile of a program run with a profiler"""
+
+    def __init__(self):
+        super().__init__()
+        self._path = None
+        vbox = QVBoxLayout(self)
+        vbox.setContentsMargins(0, 0, 0, 0)
+        vbox.setSpacing(0)
+        self._label = QLabel()
+        vbox.addWidget(self._label)
+        splitter = QSplitter(Qt.Vertical)
+        vbox.addWidget(splitter)
+
+        self._model = QStandardItemModel(self)
+        self._model.setSortRole(SORT_ROLE)
+        self._table = QTableView()
+        self._table.setModel(self._model)
+        self._table.setSortingEnabled(True)
+        self._table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self._table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self._table.verticalHeader().hide()
+        self._table.horizontalHeader().setStretchLastSection(True)
+        self._table.doubleClicked.connect(self._open_row)
+        splitter.addWidget(self._table)
+
+        self._icicle = IcicleView()
+        self._icicle.frameClicked.connect(self._open_file)
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setWidget(self._icicle)
+        splitter.addWidget(scroll)
+
+        self._loader = ProfileLoader(self)
+        self._loader.profileLoaded.connect(self._show_result)
+        self._loader.loadFailed.connect(self._show_error)
+
+        IDE.register_service("profiler", self)
+        _ToolsDock.register_widget(translations.TR_PROFILER, self)
+
+    def install(self):
+        ninjaide = IDE.get_service("ide")
+        ninjaide.goingDown.connect(self._remove_profile)
+
+    def _remove_profile(self):
+        """Only the last profile is kept while the IDE runs"""
+        if self._path is not None:
+            try:
+                os.remove(self._path)
+            except OSError:
+                pass
+            self._path = None
+
+    def load(self, kind, path):
+        """Show the profile of kind (profile_data.CPROFILE or TRACEMALLOC)
+        saved in path"""
+        if path != self._path:
+            self._remove_profile()
+        self._path = path
+        self._label.setText(translations.TR_PROFILE_LOADING)
+        self._loader.load(kind, path)
+        tools_dock = IDE.get_service("tools_dock")
+        if tools_dock is not None:
+            tools_dock.show_widget(self)
+
+    def _show_error(self, reason):
+        self._label.setText(translations.TR_PROFILE_FAILED.format(reason))
+
+    def _show_result(self, result):
+        if result.kind == profile_data.CPROFILE:
+            headers = (translations.TR_FUNCTION, translations.TR_FILE,
+                       translations.TR_CALLS, translations.TR_OWN_TIME,
+                       translations.TR_CUMULATIVE_TIME)
+            formats = (str, _format_time, _format_time)
+            total = translations.TR_PROFILE_TOTAL_TIME.format(
+                _format_time(result.total))
+            format_value = _format_time
+        else:
+            headers = (translations.TR_LINE, translations.TR_FILE,
+                       translations.TR_SIZE, translations.TR_BLOCKS)
+            formats = (process_stats.format_size, str)
+            total = translations.TR_PROFILE_TOTAL_MEMORY.format(
+                process_stats.format_size(result.total))
+            format_value = process_stats.format_size
+        self._label.setText(total)
+        self._model.clear()
+        self._model.setHorizontalHeaderLabels(headers)
+        for name, path, lineno, *values in result.rows[:MAX_ROWS]:
+            name_item = QStandardItem(name)
+            name_item.setData(name, SORT_ROLE)
+            name_item.setData((path, lineno), LOCATION_ROLE)
+            location = ''
+            if path:
+                location = '{}:{}'.format(os.path.basename(path), lineno)
+            location_item = QStandardItem(location)
+            location_item.setData(location, SORT_ROLE)
+            location_item.setToolTip(path or '')
+            items = [name_item, location_item]
+            for value, format_value_text in zip(values, formats):
+                item = QStandardItem(format_value_text(value))
+                item.setData(value, SORT_ROLE)
+                item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                items.append(item)
+            self._model.appendRow(items)
+        self._table.resizeColumnsToContents()
+        self._icicle.set_root(result.root, format_value)
+
+    def _open_row(self, index):
+        path, lineno = self._model.index(index.row(), 0).data(LOCATION_ROLE)
+        if path and os.path.isfile(path):
+            self._open_file(path, lineno)
+
+    def _open_file(self, path, lineno):
+        main_container = IDE.get_service("main_container")
+        if main_container is not None:
+            main_container.open_file(path, line=max(lineno - 1, 0))
+
+
+ProfilerWidget()
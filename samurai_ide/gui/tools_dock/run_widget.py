@@ -15,9 +15,16 @@
 # You should have received a copy of the GNU General Public License
 # along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
 
+import os
 import re
+import shlex
+import codecs
+from collections import deque
 
 from PyQt5.QtWidgets import QPlainTextEdit
+from PyQt5.QtWidgets import QTableWidget
+from PyQt5.QtWidgets import QTableWidgetItem
+from PyQt5.QtWidgets import QTextEdit
 from PyQt5.QtWidgets import QTabWidget
 from PyQt5.QtWidgets import QWidget
 from PyQt5.QtWidgets import QVBoxLayout
@@ -36,31 +43,76 @@ from PyQt5.QtCore import QObject
 from PyQt5.QtCore import QProcess
 from PyQt5.QtCore import QProcessEnvironment
 from PyQt5.QtCore import QTime
+from PyQt5.QtCore import QTimer
 from PyQt5.QtCore import QElapsedTimer
 
 from samurai_ide import translations
 from samurai_ide import resources
 from samurai_ide.core import settings
 from samurai_ide.core.file_handling import file_manager
+from samurai_ide.tools import process_stats
+from samurai_ide.tools import profile_data
 from samurai_ide.gui.ide import IDE
+from samurai_ide.gui.tools_dock.log_view import LogOutputWidget
+from samurai_ide.gui.tools_dock.log_view import new_log_path
+from samurai_ide.gui.tools_dock.profiler_widget import new_profile_path
 from samurai_ide.gui.tools_dock.tools_dock import _ToolsDock
 
 
 # FIXME: tool buttons (clear, stop, re-start, etc)
 # FIXME: maybe improve the user input
 
+# Milliseconds the output of a program is buffered before being shown
+FLUSH_INTERVAL = 50
+# Milliseconds between two samples of the CPU and memory of the programs
+SAMPLE_INTERVAL = 1000
+
+
+def _new_decoder():
+    # Keeps the bytes of a character split between two reads
+    return codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+
+def _format_seconds(seconds):
+    return "%.1f s" % seconds
+
 
 class Program(QObject):
+    """A python program run in a tab of the RunWidget.
+
+    A file, some code or a target of the project: name and the python
+    arguments args, run from working_dir. While the main process runs
+    stats has its last sample, see RunWidget._sample. With a profiler
+    (profile_data.CPROFILE or TRACEMALLOC) the program is run by
+    tools.profile_runner, that saves the profile to profile_path.
+
+    SIGNALS:
+    @finished()  the main process finished or couldn't start
+    """
+
+    finished = pyqtSignal()
 
     def __init__(self, **kwargs):
         QObject.__init__(self)
         self.filename = kwargs.get("filename")
+        self.name = kwargs.get("name")
+        self.args = kwargs.get("args")
+        self.working_dir = kwargs.get("working_dir")
+        self.profiler = kwargs.get("profiler")
+        self.profile_path = kwargs.get("profile_path")
         self.text_code = kwargs.get("code")
         self.__python_exec = kwargs.get("python_exec")
         self.pre_script = kwargs.get("pre_script")
         self.post_script = kwargs.get("post_script")
         self.__params = kwargs.get("params")
         self.__elapsed = QElapsedTimer()
+        self.stats = None
+        # None while running
+        self.exit_code = None
+        self.crashed = False
+        self.wall_time = 0.0
+        self.__output_decoder = _new_decoder()
+        self.__error_decoder = _new_decoder()
 
         self.outputw = None
 
@@ -69,7 +121,9 @@ class Program(QObject):
         self.main_process = QProcess(self)
         self.main_process.started.connect(self._process_started)
         self.main_process.finished.connect(self._process_finished)
+        self.main_process.finished.connect(self._main_finished)
         self.main_process.finished.connect(self.__post_execution)
+        self.main_process.errorOccurred.connect(self._main_error)
         self.main_process.readyReadStandardOutput.connect(self._refresh_output)
         self.main_process.readyReadStandardError.connect(self._refresh_error)
 
@@ -87,6 +141,9 @@ class Program(QObject):
         self.post_process.readyReadStandardError.connect(self._refresh_error)
 
     def start(self):
+        self.stats = None
+        self.exit_code = None
+        self.crashed = False
         self.__pre_execution()
         self.outputw.setFocus()
 
@@ -116,7 +173,9 @@ class Program(QObject):
     def __main_execution(self):
         self.__elapsed.start()
         self.__current_process = self.main_process
-        if not self.only_text:
+        if self.working_dir:
+            self.main_process.setWorkingDirectory(self.working_dir)
+        elif not self.only_text:
             # In case a text is executed and not a file or project
             file_directory = file_manager.get_folder(self.filename)
             self.main_process.setWorkingDirectory(file_directory)
@@ -162,6 +221,10 @@ class Program(QObject):
         self.pre_script = kwargs.get("pre_script")
         self.post_script = kwargs.get("post_script")
         self.__params = kwargs.get("params")
+        self.args = kwargs.get("args")
+        self.working_dir = kwargs.get("working_dir")
+        self.profiler = kwargs.get("profiler")
+        self.profile_path = kwargs.get("profile_path")
 
     def set_output_widget(self, ow):
         self.outputw = ow
@@ -178,12 +241,22 @@ class Program(QObject):
         return running
 
     def _process_started(self):
+        self.__output_decoder = _new_decoder()
+        self.__error_decoder = _new_decoder()
         time_str = QTime.currentTime().toString("hh:mm:ss")
         text = time_str + " Running: " + self.process_name
         self.outputw.append_text(text)
         self.outputw.setReadOnly(False)
+        if self.__current_process is self.main_process:
+            self.stats = process_stats.ProcessStats(
+                self.main_process.processId())
+            self.stats.sample()
 
     def _process_finished(self, code, status):
+        self.outputw.write(self.__output_decoder.decode(b'', True),
+                           OutputWidget.Format.NORMAL)
+        self.outputw.write(self.__error_decoder.decode(b'', True),
+                           OutputWidget.Format.ERROR)
         frmt = OutputWidget.Format.NORMAL
         if status == QProcess.NormalExit == code:
             text = translations.TR_PROCESS_EXITED_NORMALLY % code
@@ -201,23 +274,55 @@ class Program(QObject):
             self.outputw.append_text(translations.TR_ELAPSED_TIME.format(time))
         self.outputw.setReadOnly(True)
 
+    def _main_finished(self, code, status):
+        self.wall_time = self.__elapsed.elapsed() / 1000.0
+        self.exit_code = code
+        self.crashed = status != QProcess.NormalExit
+        self.finished.emit()
+
+    def _main_error(self, error):
+        if error == QProcess.FailedToStart:
+            self.outputw.append_text(self.main_process.errorString(),
+                                     OutputWidget.Format.ERROR)
+            self.exit_code = -1
+            self.crashed = True
+            self.finished.emit()
+
+    def status_text(self):
+        """Short state of the program for its tab"""
+        if self.exit_code is None:
+            if self.stats is None:
+                return ""
+            return "%.0f%% %s" % (self.stats.cpu_percent,
+                                  process_stats.format_size(self.stats.rss))
+        if self.crashed:
+            return translations.TR_INTERRUPTED
+        return translations.TR_EXIT_CODE.format(self.exit_code)
+
+    def stats_text(self):
+        stats = self.stats
+        if stats is None:
+            return ""
+        return translations.TR_PROCESS_STATS.format(
+            stats.cpu_percent, stats.cpu_time,
+            process_stats.format_size(stats.rss),
+            process_stats.format_size(stats.peak_rss))
+
     def _refresh_output(self):
-        data = self.__current_process.readAllStandardOutput().data().decode()
-        for line in data.splitlines():
-            self.outputw.append_text(
-                line, text_format=OutputWidget.Format.NORMAL)
+        data = self.__current_process.readAllStandardOutput().data()
+        self.outputw.write(self.__output_decoder.decode(data),
+                           OutputWidget.Format.NORMAL)
 
     def _refresh_error(self):
-        data = self.__current_process.readAllStandardError().data().decode()
-        for line_text in data.splitlines():
-            frmt = OutputWidget.Format.ERROR
-            if self.outputw.patLink.match(line_text):
-                frmt = OutputWidget.Format.ERROR_UNDERLINE
-            self.outputw.append_text(line_text, frmt)
+        data = self.__current_process.readAllStandardError().data()
+        self.outputw.write(self.__error_decoder.decode(data),
+                           OutputWidget.Format.ERROR)
 
     def display_name(self):
         name = "New document"
-        if not self.only_text:
+        if self.name:
+            name = self.name
+        elif not self.only_text:
             name = file_manager.get_basename(self.filename)
         return name
 
@@ -242,7 +347,13 @@ class Program(QObject):
             # Force python to unbuffer stding and stdout
             args.append("-u")
             args += settings.EXECUTION_OPTIONS.split()
-            args.append(self.filename)
+            if self.profiler:
+                args += [profile_data.RUNNER, self.profiler,
+                         self.profile_path]
+            if self.args:
+                args += shlex.split(self.args)
+            else:
+                args.append(self.filename)
         return args
 
     def kill(self):
@@ -250,6 +361,12 @@ class Program(QObject):
 
 
 class RunWidget(QWidget):
+    """The output of the programs executed, one tab each.
+
+    The tab of a running program shows its CPU and memory use. The run
+    targets of a project are started at the same time, up to
+    settings.MAX_PARALLEL_RUNS, and a summary tab is added when all of
+    them finished."""
 
     allTabsClosed = pyqtSignal()
     projectExecuted = pyqtSignal(str)
@@ -258,6 +375,13 @@ class RunWidget(QWidget):
     def __init__(self):
         QWidget.__init__(self)
         self.__programs = []
+        # Targets waiting to start and the programs of the last targets run
+        self._queue = deque()
+        self._batch = []
+        self._summary = None
+        self._sample_timer = QTimer(self)
+        self._sample_timer.setInterval(SAMPLE_INTERVAL)
+        self._sample_timer.timeout.connect(self._sample)
 
         vbox = QVBoxLayout(self)
         vbox.setContentsMargins(0, 0, 0, 0)
@@ -279,6 +403,16 @@ class RunWidget(QWidget):
                 "signal_name": "executeSelection",
                 "slot": self.execute_selection
             },
+            {
+                "target": "tools_dock",
+                "signal_name": "profileFile",
+                "slot": self.execute_file
+            },
+            {
+                "target": "tools_dock",
+                "signal_name": "executeTargets",
+                "slot": self.run_targets
+            },
             {
                 "target": "tools_dock",
                 "signal_name": "stopApplication",
@@ -307,16 +441,24 @@ class RunWidget(QWidget):
 
     def _kill_processes(self):
         """Stop all applications"""
+        self._queue.clear()
         for program in self.__programs:
             program.kill()
+            if isinstance(program.outputw, LogOutputWidget):
+                program.outputw.close_log()
 
     def kill_application(self):
         """Stop application by current tab index"""
-        index = self._tabs.currentIndex()
-        if index == -1:
-            return
-        program = self.__programs[index]
-        program.kill()
+        program = self._program_at(self._tabs.currentIndex())
+        if program is not None:
+            program.kill()
+
+    def _program_at(self, tab_index):
+        widget = self._tabs.widget(tab_index)
+        for program in self.__programs:
+            if program.outputw is widget:
+                return program
+        return None
 
     def _menu_for_tabbar(self, position):
         menu = QMenu()
@@ -335,13 +477,23 @@ class RunWidget(QWidget):
             self.close_all_tabs_except_this()
 
     def close_tab(self, tab_index):
-        program = self.__programs[tab_index]
-        self.__programs.remove(program)
+        program = self._program_at(tab_index)
+        widget = self._tabs.widget(tab_index)
         self._tabs.removeTab(tab_index)
-        # Close process and delete OutputWidget
-        program.main_process.close()
-        program.outputw.deleteLater()
-        del program.outputw
+        if program is None:
+            # The summary of the targets
+            self._summary = None
+            widget.deleteLater()
+        else:
+            self.__programs.remove(program)
+            if program in self._batch:
+                self._batch.remove(program)
+            # Close process and delete OutputWidget
+            program.main_process.close()
+            if isinstance(program.outputw, LogOutputWidget):
+                program.outputw.close_log()
+            program.outputw.deleteLater()
+            del program.outputw
 
         if self._tabs.count() == 0:
             # Hide widget
@@ -358,8 +510,9 @@ class RunWidget(QWidget):
             if self._tabs.count() > 1:
                 self.close_tab(1)
 
-    def execute_file(self):
-        """Execute the current file"""
+    def execute_file(self, profiler=None):
+        """Execute the current file, with profile_data.CPROFILE or
+        TRACEMALLOC as profiler to profile it"""
         main_container = IDE.get_service("main_container")
         editor_widget = main_container.get_current_editor()
         if editor_widget is not None and (editor_widget.is_modified or
@@ -373,7 +526,13 @@ class RunWidget(QWidget):
             extension = file_manager.get_file_extension(file_path)
             # TODO: Remove the IF statment and use Handlers
             if extension == "py":
-                self.start_process(filename=file_path)
+                kwargs = {}
+                if profiler:
+                    kwargs = dict(profiler=profiler,
+                                  profile_path=new_profile_path(
+                                      file_manager.get_basename(file_path),
+                                      profiler))
+                self.start_process(filename=file_path, **kwargs)
 
     def execute_selection(self):
         """Execute selected text or current line if not have a selection"""
@@ -425,30 +584,133 @@ class RunWidget(QWidget):
                     program_params=nproject.program_params
                 )
 
+    def run_targets(self):
+        """Execute the run targets of the current project at the same
+        time, or its main file if it has none"""
+
+        projects_explorer = IDE.get_service("projects_explorer")
+        if projects_explorer is None:
+            return
+        nproject = projects_explorer.current_project
+        if not nproject:
+            return
+        targets = nproject.run_targets
+        if not targets and nproject.main_file:
+            targets = [nproject.main_file]
+        if not targets:
+            projects_explorer.current_tree.open_project_properties()
+            return
+        projects_explorer.save_project()
+        self.projectExecuted.emit(nproject.path)
+        self._batch = []
+        self._queue = deque(
+            dict(name=target, args=target, working_dir=nproject.path,
+                 python_exec=nproject.python_exec)
+            for target in targets)
+        self._start_queued()
+
+    def _start_queued(self):
+        limit = settings.MAX_PARALLEL_RUNS or os.cpu_count() or 1
+        running = len([program for program in self._batch
+                       if program.exit_code is None])
+        while self._queue and running < limit:
+            self._batch.append(self.start_process(**self._queue.popleft()))
+            running += 1
+
+    def _on_program_finished(self):
+        program = self.sender()
+        self._update_tab(program)
+        if program.profiler and os.path.exists(program.profile_path):
+            IDE.get_service("profiler").load(program.profiler,
+                                             program.profile_path)
+        if program not in self._batch:
+            return
+        self._start_queued()
+        if all(program.exit_code is not None for program in self._batch):
+            self._show_summary()
+
+    def _sample(self):
+        running = False
+        for program in self.__programs:
+            if program.exit_code is not None:
+                continue
+            running = True
+            if program.stats is not None:
+                program.stats.sample()
+                self._update_tab(program)
+        if not running:
+            self._sample_timer.stop()
+
+    def _update_tab(self, program):
+        index = self._tabs.indexOf(program.outputw)
+        if index == -1:
+            return
+        text = program.display_name()
+        status = program.status_text()
+        if status:
+            text += " (%s)" % status
+        self._tabs.setTabText(index, text)
+        self._tabs.setTabToolTip(index, program.stats_text())
+
+    def _show_summary(self):
+        """Add a tab with the exit status, times and peak memory of the
+        targets run"""
+
+        headers = (translations.TR_TARGET, translations.TR_EXIT_STATUS,
+                   translations.TR_WALL_TIME, translations.TR_CPU_TIME,
+                   translations.TR_PEAK_MEMORY)
+        if self._summary is None:
+            self._summary = QTableWidget(0, len(headers), self)
+            self._summary.setHorizontalHeaderLabels(headers)
+            self._summary.setEditTriggers(QTableWidget.NoEditTriggers)
+            self._summary.verticalHeader().hide()
+            self._summary.horizontalHeader().setStretchLastSection(True)
+            self._tabs.addTab(self._summary, translations.TR_RUN_SUMMARY)
+        self._summary.setRowCount(len(self._batch))
+        for row, program in enumerate(self._batch):
+            stats = program.stats
+            values = (program.display_name(), program.status_text(),
+                      _format_seconds(program.wall_time),
+                      _format_seconds(stats.cpu_time) if stats else "",
+                      process_stats.format_size(stats.peak_rss)
+                      if stats else "")
+            for column, value in enumerate(values):
+                self._summary.setItem(row, column, QTableWidgetItem(value))
+        self._summary.resizeColumnsToContents()
+        self._tabs.setCurrentWidget(self._summary)
+
     def start_process(self, **kwargs):
         # First look if we can reuse a tab
         fname = kwargs.get("filename")
+        name = kwargs.get("name")
         program = None
         for prog in self.__programs:
-            if prog.filename == fname:
+            if prog.filename == fname and prog.name == name:
                 if not prog.is_running():
                     program = prog
                     break
 
         if program is not None:
-            index = self.__programs.index(program)
             program.update(**kwargs)
-            self._tabs.setCurrentIndex(index)
+            self._tabs.setCurrentWidget(program.outputw)
             program.outputw.gray_out_old_text()
         else:
             program = Program(**kwargs)
+            program.finished.connect(self._on_program_finished)
             # Create new output widget
-            outputw = OutputWidget(self)
+            if settings.OUTPUT_TO_FILE:
+                outputw = LogOutputWidget(
+                    new_log_path(program.display_name()), self)
+            else:
+                outputw = OutputWidget(self)
             program.set_output_widget(outputw)
             self.add_tab(outputw, program.display_name())
             self.__programs.append(program)
 
         program.start()
+        self._update_tab(program)
+        self._sample_timer.start()
+        return program
 
     def add_tab(self, outputw, tab_text):
         inserted_index = self._tabs.addTab(outputw, tab_text)
@@ -457,7 +719,11 @@ class RunWidget(QWidget):
 
 class OutputWidget(QPlainTextEdit):
 
-    """Widget to handle the output of the running process"""
+    """Widget to handle the output of the running process.
+
+    The output is buffered and inserted every FLUSH_INTERVAL ms in a single
+    edit, only the last settings.OUTPUT_MAX_LINES lines are kept. The
+    traceback links are found when the mouse is over them."""
 
     inputRequested = pyqtSignal("QString")
 
@@ -474,6 +740,15 @@ class OutputWidget(QPlainTextEdit):
         self.setMouseTracking(True)
         self.setFrameShape(0)
         self.setUndoRedoEnabled(False)
+        self.setMaximumBlockCount(settings.OUTPUT_MAX_LINES)
+        # [([text], format)] waiting for the next flush
+        self._pending = []
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(FLUSH_INTERVAL)
+        self._flush_timer.timeout.connect(self.flush)
+        # Block of the traceback link under the mouse
+        self._link_block = None
         # Traceback pattern
         self.patLink = re.compile(r'(\s)*File "(.*?)", line \d.+')
         # For user input
@@ -500,9 +775,6 @@ class OutputWidget(QPlainTextEdit):
             self.Format.ERROR_UNDERLINE: error_format2
         }
 
-        self.blockCountChanged[int].connect(
-            lambda: self.moveCursor(QTextCursor.End))
-
         # Style
         palette = self.palette()
         palette.setColor(
@@ -519,15 +791,34 @@ class OutputWidget(QPlainTextEdit):
         self.go_to_error(event)
 
     def mouseMoveEvent(self, event):
-        cursor = self.cursorForPosition(event.pos())
-        text = cursor.block().text()
-        if text:
-            if self.patLink.match(text):
+        block = self.cursorForPosition(event.pos()).block()
+        if block.text():
+            if self.patLink.match(block.text()):
                 self.viewport().setCursor(Qt.PointingHandCursor)
+                self._show_link(block)
             else:
                 self.viewport().setCursor(Qt.IBeamCursor)
+                self._show_link(None)
         QPlainTextEdit.mouseMoveEvent(self, event)
 
+    def _show_link(self, block):
+        """Underline the traceback link in block, None to remove it"""
+        if block == self._link_block:
+            return
+        self._link_block = block
+        selections = []
+        tooltip = ''
+        if block is not None:
+            selection = QTextEdit.ExtraSelection()
+            selection.format = self._text_formats[self.Format.ERROR_UNDERLINE]
+            selection.cursor = QTextCursor(block)
+            selection.cursor.movePosition(
+                QTextCursor.EndOfBlock, QTextCursor.KeepAnchor)
+            selections.append(selection)
+            tooltip = translations.TR_CLICK_TO_SHOW_SOURCE
+        self.setExtraSelections(selections)
+        self.viewport().setToolTip(tooltip)
+
     def go_to_error(self, event):
         """Resolve the link and take the user to the error line."""
         cursor = self.cursorForPosition(event.pos())
@@ -550,11 +841,59 @@ class OutputWidget(QPlainTextEdit):
         return (file_name, lineno)
 
     def append_text(self, text, text_format=None):
-        cursor = self.textCursor()
+        """Add a line to the output"""
+        self.write(text + '\n', text_format)
+
+    def write(self, text, text_format=None):
+        """Add text to the output, shown at the next flush"""
+        if not text:
+            return
         if text_format is None:
             text_format = self.Format.PLAIN
-        cursor.insertText(text, self._text_formats[text_format])
-        cursor.insertBlock()
+        text = text.replace('\r\n', '\n')
+        if self._pending and self._pending[-1][1] == text_format:
+            self._pending[-1][0].append(text)
+        else:
+            self._pending.append(([text], text_format))
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush(self):
+        """Insert the pending output in one edit"""
+        self._flush_timer.stop()
+        pending, self._pending = self._pending, []
+        chunks = self._trim([(''.join(texts), text_format)
+                             for texts, text_format in pending])
+        if not chunks:
+            return
+        scrollbar = self.verticalScrollBar()
+        follow = scrollbar.value() == scrollbar.maximum()
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.beginEditBlock()
+        for text, text_format in chunks:
+            cursor.insertText(text, self._text_formats[text_format])
+        cursor.endEditBlock()
+        if follow:
+            # Don't move the view while the user reads the old output
+            self.moveCursor(QTextCursor.End)
+
+    def _trim(self, chunks):
+        """Drop the lines that the maximum block count would remove right
+        after inserting them"""
+        limit = self.maximumBlockCount()
+        if limit <= 0:
+            return chunks
+        lines = 0
+        for index in range(len(chunks) - 1, -1, -1):
+            text, text_format = chunks[index]
+            count = text.count('\n')
+            if lines + count > limit:
+                keep = limit - lines
+                text = '\n'.join(text.split('\n')[-keep - 1:])
+                return [(text, text_format)] + chunks[index + 1:]
+            lines += count
+        return chunks
 
     def wheelEvent(self, event):
         if event.modifiers() == Qt.ControlModifier:
@@ -596,6 +935,7 @@ class OutputWidget(QPlainTextEdit):
     def gray_out_old_text(self):
         """Puts the old text in gray"""
 
+        self.flush()
         cursor = self.textCursor()
         end_format = cursor.charFormat()
         cursor.select(QTextCursor.Document)
@@ -607,7 +947,7 @@ class OutputWidget(QPlainTextEdit):
         red = backfactor * backcolor.red() + forefactor * forecolor.red()
         green = backfactor * backcolor.green() + forefactor * forecolor.green()
         blue = backfactor * backcolor.blue() + forefactor * forecolor.blue()
-        format_.setForeground(QColor(red, green, blue))
+        format_.setForeground(QColor(int(red), int(green), int(blue)))
         cursor.mergeCharFormat(format_)
         cursor.movePosition(QTextCursor.End)
         cursor.setCharFormat(end_format)
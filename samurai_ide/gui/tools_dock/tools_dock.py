@@ -60,6 +60,8 @@ class _ToolsDock(QWidget):
     executeFile = pyqtSignal()
     executeProject = pyqtSignal()
     executeSelection = pyqtSignal()
+    executeTargets = pyqtSignal()
+    profileFile = pyqtSignal('QString')
     stopApplication = pyqtSignal()
 
     def __init__(self, parent=None):
@@ -222,6 +224,24 @@ class _ToolsDock(QWidget):
         self._show(index)
         self.executeSelection.emit()
 
+    def execute_targets(self):
+        run_widget = IDE.get_service("run_widget")
+        index = self.get_widget_index_by_instance(run_widget)
+        self._show(index)
+        self.executeTargets.emit()
+
+    def profile_file(self):
+        self._profile_file("cprofile")
+
+    def profile_file_memory(self):
+        self._profile_file("tracemalloc")
+
+    def _profile_file(self, profiler):
+        run_widget = IDE.get_service("run_widget")
+        index = self.get_widget_index_by_instance(run_widget)
+        self._show(index)
+        self.profileFile.emit(profiler)
+
     def kill_application(self):
         self.stopApplication.emit()
 
@@ -250,6 +270,9 @@ class _ToolsDock(QWidget):
         self.widget(index).setVisible(False)
         self.hide()
 
+    def show_widget(self, obj):
+        self._show(self.get_widget_index_by_instance(obj))
+
     def hide_widget(self, obj):
         index = self.get_widget_index_by_instance(obj)
         self.set_current_index(index)
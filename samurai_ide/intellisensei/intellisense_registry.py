@@ -17,6 +17,7 @@
 
 import time
 import abc
+import itertools
 from collections import namedtuple
 from collections.abc import Callable
 
@@ -58,8 +59,15 @@ class IntelliSenseWorker(QThread):
 
 
 class IntelliSense(QObject):
+    """
+    SIGNALS:
+    @resultAvailable(PyQt_PyObject)
+    @detailAvailable(int, PyQt_PyObject)
+    """
 
     resultAvailable = pyqtSignal("PyQt_PyObject")
+    # Request id, detail or None if it couldn't be obtained
+    detailAvailable = pyqtSignal(int, "PyQt_PyObject")
 
     services = ("completions", "calltips")
 
@@ -67,10 +75,29 @@ class IntelliSense(QObject):
         QObject.__init__(self)
         self.__providers = {}
         self.__thread = None
+        self.__running = None
+        self.__pending = None
+        self.__detail_ids = itertools.count(1)
 
         # Register service
         IDE.register_service("intellisense", self)
 
+    def install(self):
+        ninjaide = IDE.get_service("ide")
+        ninjaide.goingDown.connect(self.shutdown)
+        ninjaide.filesystem.projectOpened.connect(self._on_project_opened)
+
+    def _on_project_opened(self, project_path):
+        project = IDE.get_service("ide").get_projects().get(project_path)
+        if project is None:
+            return
+        for provider in self.__providers.values():
+            provider.project_opened(project)
+
+    def shutdown(self):
+        for provider in self.__providers.values():
+            provider.shutdown()
+
     def providers(self):
         return self.__providers.keys()
 
@@ -94,16 +121,24 @@ class IntelliSense(QObject):
 
     def process(self, kind, neditor):
         """Handle request from IntelliSense Assistant"""
+        code_info = self._code_info(neditor, kind)
+        provider = self.__providers.get(neditor.neditable.language())
         if self.__thread is not None:
             if self.__thread.isRunning():
-                logger.debug("Waiting...")
+                # The running request is stale, the new one runs when the
+                # provider gives up the old one
+                logger.debug("Cancelling '{}'".format(self.__running))
+                self.__pending = (provider, code_info)
+                self.__running.cancel()
                 return
-        code_info = self._code_info(neditor, kind)
+        self._run(provider, code_info)
+
+    def _run(self, provider, code_info):
         logger.debug("Running '{}'".format(code_info.pservice))
-        provider = self.__providers.get(neditor.neditable.language())
         setattr(provider, "_code_info", code_info)
-        provider_service = getattr(provider, kind, None)
+        provider_service = getattr(provider, code_info.pservice, None)
         if isinstance(provider_service, Callable):
+            self.__running = provider
             self.__thread = IntelliSenseWorker(self)
             self.__thread.finished.connect(self._on_worker_finished)
             self.__thread.finished.connect(self.__thread.deleteLater)
@@ -114,8 +149,24 @@ class IntelliSense(QObject):
             return
         result = self.__thread.result
         self.__thread = None
+        self.__running = None
+        if self.__pending is not None:
+            provider, code_info = self.__pending
+            self.__pending = None
+            self._run(provider, code_info)
+            return
         self.resultAvailable.emit(result)
 
+    def request_detail(self, provider, completion):
+        """Ask provider for the detail of completion and return the id
+        of the request, the detail is emitted with detailAvailable"""
+
+        request_id = next(self.__detail_ids)
+        provider.request_detail(
+            completion,
+            lambda detail: self.detailAvailable.emit(request_id, detail))
+        return request_id
+
     def provider_services(self, language):
         """Returns the services available for a provider"""
 
@@ -157,12 +208,36 @@ class Provider(abc.ABC):
         The "text" key is the text that will be displayed in the list.
         The "type" key can be: function, class, instance.
         The "detail" key is a text that will be displayed next to the list
-        as a tool tip.
+        as a tool tip, when it's slow to get it can be left out and returned
+        by Provider.detail or Provider.request_detail.
         """
 
     def calltips(self):
         pass
 
+    def detail(self, completion):
+        """Return the detail of one of the completions, it's only asked
+        for the selected completion, so it can be computed here"""
+
+        return completion.get("detail")
+
+    def request_detail(self, completion, callback):
+        """Like detail but without blocking the GUI, callback(detail) is
+        called when it's ready, maybe from another thread, detail is None
+        if it couldn't be obtained"""
+
+        callback(self.detail(completion))
+
+    def project_opened(self, project):
+        """A project was opened, a chance to get ready for its files"""
+
+    def cancel(self):
+        """A newer request was made, return from the running service as
+        soon as possible (the result is discarded)"""
+
+    def shutdown(self):
+        """The IDE is closing"""
+
 
 # Register service
 IntelliSense()
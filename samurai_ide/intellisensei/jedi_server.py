@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Jedi completion server.
+
+Runs as a script in its own process (it must not import samurai_ide), the
+IDE writes one JSON request per line on stdin:
+
+    {"id": 1, "method": "completions", "params": {...}}
+
+and reads one JSON response per line on stdout:
+
+    {"id": 1, "result": ...}
+    {"id": 1, "error": "reason"}
+    {"id": 1, "cancelled": true}
+
+A request is cancelled with {"method": "cancel", "params": {"id": 1}}. The
+requests are answered in order, a cancelled request waiting in the queue
+is skipped and the result of a cancelled request is not sent.
+
+With --cache-dir the jedi caches are kept in a folder of the interpreter
+(--interpreter) and its version, with the modules to warm up. Those are
+loaded in the background when there are no requests waiting.
+"""
+
+import os
+import sys
+import json
+import queue
+import shutil
+import hashlib
+import argparse
+import threading
+from collections import deque
+from collections import OrderedDict
+
+import jedi
+
+# Completion lists kept to answer the docstring requests
+COMPLETIONS_KEPT = 8
+# Modules kept in the warm up index of an interpreter
+WARMUP_KEPT = 100
+WARMUP_INDEX = 'warmup.json'
+
+# jedi >= 0.16 gets the position in the methods, not in Script
+_NEW_API = hasattr(jedi.Script, 'complete')
+
+
+def _module_path(definition):
+    path = definition.module_path
+    if path is None:
+        return None
+    return str(path)
+
+
+def cache_folder(cache_dir, interpreter, version):
+    """Return the folder of the caches of an interpreter and version"""
+
+    path = os.path.realpath(interpreter or sys.executable)
+    digest = hashlib.sha1(path.encode('utf-8', 'surrogatepass')).hexdigest()
+    return os.path.join(cache_dir, '{}-{}-{}'.format(
+        os.path.basename(path), '.'.join(map(str, version[:2])),
+        digest[:12]))
+
+
+class Server(object):
+
+    def __init__(self, stdin=sys.stdin, stdout=sys.stdout, interpreter=None,
+                 cache_dir=None):
+        self._stdin = stdin
+        self._stdout = stdout
+        self._requests = queue.Queue()
+        self._lock = threading.Lock()
+        self._cancelled = set()
+        # {request id: [jedi completions]}
+        self._completions = OrderedDict()
+        jedi.settings.case_insensitive_completion = False
+        self._environment = None
+        version = sys.version_info
+        if interpreter:
+            interpreter = shutil.which(interpreter) or interpreter
+        if interpreter and _NEW_API:
+            try:
+                self._environment = jedi.create_environment(
+                    interpreter, safe=False)
+                version = self._environment.version_info
+            except Exception:
+                # Use the interpreter running the server
+                pass
+        # Modules to load when there is nothing else to do
+        self._warmup = deque()
+        self._warmup_index = []
+        self._cache_folder = None
+        if cache_dir is not None:
+            self._cache_folder = cache_folder(cache_dir, interpreter, version)
+            jedi.settings.cache_directory = self._cache_folder
+            self._load_warmup_index()
+
+    def _load_warmup_index(self):
+        try:
+            with open(os.path.join(
+                    self._cache_folder, WARMUP_INDEX)) as index:
+                self._warmup_index = json.load(index)['modules']
+        except (OSError, ValueError, KeyError):
+            self._warmup_index = []
+        self._warmup.extend(self._warmup_index)
+
+    def _save_warmup_index(self):
+        os.makedirs(self._cache_folder, exist_ok=True)
+        path = os.path.join(self._cache_folder, WARMUP_INDEX)
+        with open(path + '.tmp', 'w') as index:
+            json.dump({'modules': self._warmup_index}, index)
+        os.replace(path + '.tmp', path)
+
+    def _script(self, source, line, col, path):
+        if _NEW_API:
+            return jedi.Script(source, path=path,
+                               environment=self._environment)
+        return jedi.Script(source=source, line=line, column=col, path=path)
+
+    def _preload(self, module):
+        source = 'import {0}\n{0}.'.format(module)
+        col = len(module) + 1
+        script = self._script(source, 2, col, None)
+        if _NEW_API:
+            script.complete(2, col)
+        else:
+            script.completions()
+
+    def _read(self):
+        for line in self._stdin:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                continue
+            if request.get('method') == 'cancel':
+                with self._lock:
+                    self._cancelled.add(request['params']['id'])
+            else:
+                self._requests.put(request)
+        self._requests.put(None)
+
+    def _is_cancelled(self, request_id):
+        with self._lock:
+            if request_id in self._cancelled:
+                self._cancelled.discard(request_id)
+                return True
+        return False
+
+    def _write(self, response):
+        self._stdout.write(json.dumps(response) + '\n')
+        self._stdout.flush()
+
+    def serve(self):
+        reader = threading.Thread(target=self._read, daemon=True)
+        reader.start()
+        while True:
+            try:
+                # Warm up only while there are no requests
+                request = self._requests.get(block=not self._warmup)
+            except queue.Empty:
+                module = self._warmup.popleft()
+                try:
+                    self._preload(module)
+                except Exception:
+                    pass
+                continue
+            if request is None:
+                break
+            request_id = request.get('id')
+            if self._is_cancelled(request_id):
+                self._write({'id': request_id, 'cancelled': True})
+                continue
+            method = getattr(self, 'do_' + request.get('method', ''), None)
+            try:
+                if method is None:
+                    raise ValueError('Unknown method: %r' % request)
+                response = {'id': request_id,
+                            'result': method(request_id,
+                                             **request.get('params', {}))}
+            except Exception as reason:
+                response = {'id': request_id, 'error': repr(reason)}
+            if self._is_cancelled(request_id):
+                response = {'id': request_id, 'cancelled': True}
+            self._write(response)
+
+    def do_warmup(self, request_id, modules):
+        """Load modules in the background and remember them for the next
+        time the server starts"""
+
+        known = set(self._warmup_index)
+        new = [module for module in modules if module not in known]
+        self._warmup.extend(new)
+        if self._cache_folder is not None:
+            requested = set(modules)
+            index = list(modules)
+            index.extend(module for module in self._warmup_index
+                         if module not in requested)
+            self._warmup_index = index[:WARMUP_KEPT]
+            self._save_warmup_index()
+        return new
+
+    def do_completions(self, request_id, source, line, col, path):
+        script = self._script(source, line, col, path)
+        if _NEW_API:
+            completions = script.complete(line, col)
+        else:
+            completions = script.completions()
+        self._completions[request_id] = completions
+        while len(self._completions) > COMPLETIONS_KEPT:
+            self._completions.popitem(last=False)
+        # The docstrings are slow, they are asked for the selected one only
+        return [{'text': completion.name, 'type': completion.type,
+                 'index': index}
+                for index, completion in enumerate(completions)]
+
+    def do_docstring(self, request_id, completions_id, index):
+        completions = self._completions.get(completions_id)
+        if completions is None or not 0 <= index < len(completions):
+            return None
+        return completions[index].docstring()
+
+    def do_calltips(self, request_id, source, line, col, path):
+        script = self._script(source, line, col, path)
+        if _NEW_API:
+            signatures = script.get_signatures(line, col)
+        else:
+            signatures = script.call_signatures()
+        results = {}
+        for signature in signatures:
+            name = signature.name
+            if not name:
+                continue
+            results["signature.name"] = name
+            results["signature.params"] = self._get_params(signature.params)
+            results["signature.index"] = signature.index
+        return results
+
+    def _get_params(self, params):
+        params_list = []
+        for pos, param in enumerate(params):
+            # The new API has no full name for the parameters
+            name = param.full_name or param.name
+            if not name:
+                continue
+            if name == "self" and pos == 0:
+                continue
+            if not name.startswith("..."):
+                name = name.split(".")[-1]
+            params_list.append(name)
+        return params_list
+
+    def do_definitions(self, request_id, source, line, col, path):
+        script = self._script(source, line, col, path)
+        if _NEW_API:
+            definitions = script.goto(line, col)
+        else:
+            definitions = script.goto_assignments()
+        _definitions = []
+        for definition in definitions:
+            if definition.type == "import":
+                definition = self._get_top_definition(definition)
+            _definitions.append({
+                "text": definition.name,
+                "filename": _module_path(definition),
+                "line": definition.line,
+                "column": definition.column,
+            })
+        return _definitions
+
+    def _get_top_definition(self, definition):
+        if _NEW_API:
+            assignments = definition.goto()
+        else:
+            assignments = definition.goto_assignments()
+        for _def in assignments:
+            if _def == definition:
+                continue
+            if _def.type == "import":
+                return self._get_top_definition(_def)
+            return _def
+        return definition
+
+
+if __name__ == '__main__':
+    # Don't import the modules of the folder of this script
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path = [entry for entry in sys.path
+                if os.path.abspath(entry or os.curdir) != script_dir]
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--interpreter')
+    parser.add_argument('--cache-dir')
+    args = parser.parse_args()
+    Server(interpreter=args.interpreter, cache_dir=args.cache_dir).serve()
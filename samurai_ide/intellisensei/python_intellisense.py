@@ -16,105 +16,360 @@
 # along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
 
 import os
+import re
 import sys
+import json
+import threading
+import itertools
+import subprocess
+from collections import Counter
 
-# FIXME: when LSP works, delete this
-import jedi
-
+from samurai_ide import resources
+from samurai_ide.core import settings
+from samurai_ide.gui.ide import IDE
 from samurai_ide.intellisensei import intellisense_registry
+from samurai_ide.tools import file_search
+from samurai_ide.tools import introspection
+from samurai_ide.tools import parse_cache
 from samurai_ide.tools.logger import NinjaLogger
 
 logger = NinjaLogger(__name__)
 
+_SERVER_SCRIPT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "jedi_server.py")
+
+# Modules imported by a project that are loaded in the background
+WARMUP_MODULES = 30
+# Files of a project read to find those modules
+WARMUP_FILES = 2000
+
+_WORD_END = re.compile(r"\w*$")
+
+
+class _Request(object):
+
+    __slots__ = ("id", "event", "response", "callback")
+
+    def __init__(self, request_id, callback=None):
+        self.id = request_id
+        self.event = threading.Event()
+        self.response = None
+        # Called with the request when it's finished
+        self.callback = callback
+
+    def finish(self):
+        self.event.set()
+        if self.callback is not None:
+            self.callback(self)
+
+
+def project_imports(root, limit=WARMUP_MODULES, max_files=WARMUP_FILES):
+    """Return the modules most imported by the python files under root,
+    without the modules of the project itself"""
+
+    counter = Counter()
+    files = file_search.walk_files(root, ["*.py"])
+    for _, (path, _) in zip(range(max_files), files):
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                source = f.read()
+        except OSError:
+            continue
+        imports = introspection.obtain_imports(source)
+        counter.update(imports["imports"].keys())
+        counter.update(value["module"]
+                       for value in imports["fromImports"].values()
+                       if value["module"])
+    local = set()
+    for name in os.listdir(root):
+        local.add(name[:-3] if name.endswith(".py") else name)
+    modules = [module for module, _ in counter.most_common()
+               if module.split(".")[0] not in local]
+    return modules[:limit]
+
+
+class JediProcess(object):
+    """Client of a jedi_server process, the server is started when the
+    first request is sent and started again if it dies.
+
+    interpreter is the python used to resolve the imports, the caches of
+    jedi for it are kept under cache_dir"""
+
+    def __init__(self, interpreter=None, cache_dir=None):
+        self._interpreter = interpreter
+        self._cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._process = None
+        self._ids = itertools.count(1)
+        # {request id: _Request}
+        self._requests = {}
+
+    def _start(self):
+        if self._process is None or self._process.poll() is not None:
+            kwargs = {}
+            if os.name == "nt":
+                kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
+            command = [sys.executable, _SERVER_SCRIPT]
+            if self._interpreter:
+                command.extend(["--interpreter", self._interpreter])
+            if self._cache_dir:
+                command.extend(["--cache-dir", self._cache_dir])
+            self._process = subprocess.Popen(
+                command,
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL, universal_newlines=True, **kwargs)
+            reader = threading.Thread(
+                target=self._read, args=(self._process,), daemon=True)
+            reader.start()
+        return self._process
+
+    def _read(self, process):
+        for line in process.stdout:
+            try:
+                response = json.loads(line)
+            except ValueError:
+                continue
+            with self._lock:
+                request = self._requests.pop(response.get("id"), None)
+            if request is not None:
+                request.response = response
+                request.finish()
+        # The server died, don't let anybody wait for it
+        logger.debug("Jedi server finished")
+        with self._lock:
+            requests = list(self._requests.values())
+            self._requests.clear()
+        for request in requests:
+            request.finish()
+
+    def start(self):
+        """Start the server if it's not running, it warms up the modules
+        used the last time"""
+
+        with self._lock:
+            try:
+                self._start()
+            except OSError as reason:
+                logger.warning("Jedi server failed: %r" % reason)
+
+    def _write(self, message):
+        process = self._start()
+        process.stdin.write(json.dumps(message) + "\n")
+        process.stdin.flush()
+
+    def send(self, method, callback=None, **params):
+        """Send a request to the server and return it, the result is
+        obtained with wait or, without blocking, with result when
+        callback(request) is called from the reader thread"""
+
+        with self._lock:
+            request = _Request(next(self._ids), callback)
+            self._requests[request.id] = request
+            try:
+                self._write(
+                    {"id": request.id, "method": method, "params": params})
+            except (OSError, ValueError) as reason:
+                logger.warning("Jedi server failed: %r" % reason)
+                del self._requests[request.id]
+                failed = True
+            else:
+                failed = False
+        if failed:
+            request.finish()
+        return request
+
+    def wait(self, request, timeout=None):
+        """Return the result of request or None if it failed, was
+        cancelled or the timeout expired"""
+
+        if not request.event.wait(timeout):
+            self.cancel(request)
+            return None
+        return self.result(request)
+
+    def result(self, request):
+        """Return the result of a finished request or None if it failed
+        or was cancelled"""
+
+        response = request.response
+        if response is None or "result" not in response:
+            if response is not None and "error" in response:
+                logger.debug("Jedi error: '%s'" % response["error"])
+            return None
+        return response["result"]
+
+    def cancel(self, request):
+        with self._lock:
+            if self._requests.pop(request.id, None) is None:
+                # Already answered
+                return
+            try:
+                self._write({"method": "cancel", "params": {"id": request.id}})
+            except (OSError, ValueError):
+                pass
+        request.finish()
+
+    def shutdown(self):
+        with self._lock:
+            process, self._process = self._process, None
+        if process is not None:
+            process.kill()
+            process.wait()
+
 
 class PythonProvider(intellisense_registry.Provider):
 
+    def __init__(self):
+        self._lock = threading.Lock()
+        # {interpreter: JediProcess}
+        self._processes = {}
+        # (JediProcess, _Request) being waited
+        self._running = None
+        # (JediProcess, _Request) of the last docstring asked
+        self._docstring = None
+        # {path: (key, interpreter, request id, completions)} the last
+        # completions of each module, to filter them while typing
+        self._completions = {}
+
     def load(self):
-        jedi.settings.case_insensitive_completion = False
-        for module in ("PyQt4", "PyQt5", "numpy"):
-            try:
-                jedi.preload_module(module)
-            except AttributeError:
-                print("Jedi couldn't load: ", module)
+        self._process(settings.PYTHON_EXEC).start()
 
-    def __get_script(self):
-        info = self._code_info
+    def _process(self, interpreter):
+        with self._lock:
+            process = self._processes.get(interpreter)
+            if process is None:
+                process = self._processes[interpreter] = JediProcess(
+                    interpreter, resources.JEDI_CACHE_PATH)
+            return process
+
+    def _interpreter(self, path):
+        """Return the interpreter of the project of path"""
+
+        ninjaide = IDE.get_service("ide")
+        project = None
+        if ninjaide is not None:
+            project = ninjaide.get_project_for_file(path)
+        if project is not None:
+            return project.venv or project.python_exec
+        return settings.PYTHON_EXEC
+
+    def _request(self, method, interpreter, **params):
+        process = self._process(interpreter)
+        request = process.send(method, **params)
+        self._running = (process, request)
         try:
-            script = jedi.Script(
-                source=info.source,
-                line=info.line,
-                column=info.col,
-                path=info.path,
-                sys_path=sys.path
-            )
-        except Exception as reason:
-            logger.debug("Jedi error: '%s'" % reason)
-        return script
+            return request, process.wait(request)
+        finally:
+            self._running = None
+
+    def project_opened(self, project):
+        interpreter = project.venv or project.python_exec
+        thread = threading.Thread(
+            target=self._warmup, args=(project.path, interpreter),
+            daemon=True)
+        thread.start()
+
+    def _warmup(self, root, interpreter):
+        """Executed in a thread"""
+        modules = project_imports(root)
+        logger.debug("Warming up %s for %s" % (modules, interpreter))
+        self._process(interpreter).send("warmup", modules=modules)
+
+    def _code_params(self, col=None):
+        info = self._code_info
+        return {
+            "source": info.source,
+            "line": info.line,
+            "col": info.col if col is None else col,
+            "path": info.path
+        }
+
+    def _completions_key(self):
+        """Return the key of the completions at the start of the word
+        under the cursor and that word"""
+
+        info = self._code_info
+        lines = info.source.split("\n")
+        line_text = lines[info.line - 1][:info.col]
+        prefix = _WORD_END.search(line_text).group()
+        col = info.col - len(prefix)
+        # Edits on other lines may change the completions too
+        others = "\n".join(lines[:info.line - 1] + lines[info.line:])
+        key = (info.line, line_text[:col], parse_cache.source_digest(others))
+        return key, prefix
 
     def completions(self):
-        script = self.__get_script()
-        completions = []
-        append = completions.append
-        for completion in script.completions():
+        path = self._code_info.path
+        interpreter = self._interpreter(path)
+        key, prefix = self._completions_key()
+        cached = self._completions.get(path)
+        if cached is not None and cached[:2] == (key, interpreter):
+            _, _, request_id, completions = cached
+        else:
+            request, completions = self._request(
+                "completions", interpreter,
+                **self._code_params(self._code_info.col - len(prefix)))
+            if completions is None:
+                return []
+            request_id = request.id
+            self._completions[path] = (
+                key, interpreter, request_id, completions)
+        results = []
+        append = results.append
+        for completion in completions:
+            if not completion["text"].startswith(prefix):
+                continue
             append({
-                "text": completion.name,
-                "type": completion.type,
-                "detail": completion.docstring()
+                "text": completion["text"],
+                "type": completion["type"],
+                "interpreter": interpreter,
+                "completions_id": request_id,
+                "index": completion["index"]
             })
+        return results
+
+    def request_detail(self, completion, callback):
+        if "index" not in completion:
+            return super().request_detail(completion, callback)
+        previous = self._docstring
+        if previous is not None:
+            # Only the docstring of the selected completion is wanted
+            process, request = previous
+            process.cancel(request)
+        process = self._process(completion["interpreter"])
 
-        return completions
+        def finished(request):
+            callback(process.result(request))
+
+        request = process.send(
+            "docstring", finished,
+            completions_id=completion["completions_id"],
+            index=completion["index"])
+        self._docstring = (process, request)
 
     def definitions(self):
-        script = self.__get_script()
-        func = getattr(script, "goto_assignments", None)
-        _definitions = []
-        if func is not None:
-            definitions = func()
-            for definition in definitions:
-                if definition.type == "import":
-                    definition = self._get_top_definitions(definition)
-                _definitions.append({
-                    "text": definition.name,
-                    "filename": definition.module_path,
-                    "line": definition.line,
-                    "column": definition.column,
-                })
-        return _definitions
-
-    def __get_top_definitions(self, definition):
-        for _def in definition.goto_assignments():
-            if _def == definition:
-                continue
-            if _def.type == "import":
-                return self.__get_top_definitions(_def)
-            return _def
-        return definition
+        _, definitions = self._request(
+            "definitions", self._interpreter(self._code_info.path),
+            **self._code_params())
+        return definitions or []
 
     def calltips(self):
-        script = self.__get_script()
-        signatures = script.call_signatures()
-        results = {}
-        for signature in signatures:
-            name = signature.name
-            if not name:
-                continue
-            results["signature.name"] = name
-            results["signature.params"] = self._get_params(signature.params)
-            results["signature.index"] = signature.index
-        return results
+        _, calltips = self._request(
+            "calltips", self._interpreter(self._code_info.path),
+            **self._code_params())
+        return calltips or {}
 
-    def _get_params(self, params):
-        params_list = []
-        for pos, param in enumerate(params):
-            name = param.full_name
-            if not name:
-                continue
-            if name == "self" and pos == 0:
-                continue
-            if not name.startswith("..."):
-                name = name.split(".")[-1]
-            params_list.append(name)
-        return params_list
+    def cancel(self):
+        running = self._running
+        if running is not None:
+            process, request = running
+            process.cancel(request)
+
+    def shutdown(self):
+        with self._lock:
+            processes = list(self._processes.values())
+        for process in processes:
+            process.shutdown()
 
 
 PythonProvider.register()
@@ -59,12 +59,20 @@ DATA_SETTINGS_PATH = os.path.join(HOME_NINJA_PATH, 'data_settings.ini')
 
 EXTENSIONS_PATH = os.path.join(HOME_NINJA_PATH, "extensions")
 
+JEDI_CACHE_PATH = os.path.join(HOME_NINJA_PATH, "jedi_cache")
+
 SYNTAX_FILES = os.path.join(PRJ_PATH, "gui", "editor", "syntaxes")
 
+SYNTAX_BUNDLE = os.path.join(HOME_NINJA_PATH, "syntax_bundle.json")
+
 PLUGINS = os.path.join(HOME_NINJA_PATH, "extensions", "plugins")
 
 BACKUP_FILES = os.path.join(HOME_NINJA_PATH, "backups")
 
+OUTPUT_LOGS = os.path.join(HOME_NINJA_PATH, "output_logs")
+
+PROFILES = os.path.join(HOME_NINJA_PATH, "profiles")
+
 PLUGINS_DESCRIPTOR = os.path.join(EXTENSIONS_PATH,
                                   "plugins", "descriptor.json")
 
@@ -260,7 +268,7 @@ def create_home_dir_structure():
     """
     for directory in (HOME_NINJA_PATH, EXTENSIONS_PATH, PLUGINS, EDITOR_SKINS,
                       LANGS, NINJA_THEMES_DOWNLOAD, NINJA_KNOWLEDGE_PATH,
-                      BACKUP_FILES):
+                      BACKUP_FILES, OUTPUT_LOGS, PROFILES):
         if not os.path.isdir(directory):
             os.mkdir(directory)
 
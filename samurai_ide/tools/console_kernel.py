@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Python console kernel.
+
+Runs as a script in its own process (it must not import samurai_ide), with
+the interpreter selected for the console. The IDE writes one JSON request
+per line on stdin:
+
+    {"id": 1, "method": "push", "params": {"line": "print(1)"}}
+
+and reads one JSON message per line on stdout:
+
+    {"ready": true, "version": "3.11.7"}
+    {"stream": "stdout", "text": "1\n"}
+    {"id": 1, "result": {"more": false}}
+
+The output of the code is sent while it runs, more is True when the line
+doesn't complete a statement. SIGINT interrupts the running code with a
+KeyboardInterrupt. The kernel exits with the code (exit() or quit()).
+
+Only the writer thread writes to stdout, so an interrupt never cuts a
+message in half.
+"""
+
+import io
+import os
+import sys
+import code
+import json
+import threading
+
+# Seconds the output is buffered before being sent
+FLUSH_INTERVAL = 0.05
+# Characters of output that are sent at once without waiting
+FLUSH_SIZE = 64 * 1024
+
+
+class _Stream(io.TextIOBase):
+    """sys.stdout and sys.stderr of the console code"""
+
+    def __init__(self, kernel, name):
+        self._kernel = kernel
+        self._name = name
+
+    @property
+    def encoding(self):
+        return 'utf-8'
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        self._kernel.output(self._name, text)
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+class Kernel(object):
+
+    def __init__(self, stdin=sys.stdin, stdout=sys.stdout):
+        self._stdin = stdin
+        self._stdout = stdout
+        self._console = code.InteractiveConsole(
+            {'__name__': '__console__', '__doc__': None})
+        self._condition = threading.Condition()
+        # [[stream, [text]] or response] waiting for the writer
+        self._pending = []
+        self._size = 0
+        self._closed = False
+
+    def output(self, stream, text):
+        if not text:
+            return
+        with self._condition:
+            if self._pending and isinstance(self._pending[-1], list) and \
+                    self._pending[-1][0] == stream:
+                self._pending[-1][1].append(text)
+            else:
+                self._pending.append([stream, [text]])
+            # The writer waits FLUSH_INTERVAL after sending, see _writer
+            if not self._size or self._size + len(text) >= FLUSH_SIZE:
+                self._condition.notify()
+            self._size += len(text)
+
+    def _send(self, message):
+        with self._condition:
+            self._pending.append(message)
+            self._condition.notify()
+
+    def _writer(self):
+        while True:
+            with self._condition:
+                if not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending and self._closed:
+                    return
+                pending, self._pending = self._pending, []
+                self._size = 0
+            for item in pending:
+                if isinstance(item, list):
+                    item = {'stream': item[0], 'text': ''.join(item[1])}
+                self._stdout.write(json.dumps(item) + '\n')
+            self._stdout.flush()
+            # Let the output of the console code accumulate a little
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._closed or self._size >= FLUSH_SIZE or any(
+                        isinstance(item, dict) for item in self._pending),
+                    FLUSH_INTERVAL)
+
+    def _push(self, line):
+        try:
+            return self._console.push(line)
+        except KeyboardInterrupt:
+            # Out of the code, while compiling it
+            self._console.resetbuffer()
+            self._console.write('KeyboardInterrupt\n')
+            return False
+
+    def serve(self):
+        writer = threading.Thread(target=self._writer)
+        writer.start()
+        sys.stdout = _Stream(self, 'stdout')
+        sys.stderr = _Stream(self, 'stderr')
+        # The requests are read from the real stdin
+        sys.stdin = io.StringIO()
+        self._send({'ready': True, 'version': sys.version.split()[0]})
+        try:
+            while True:
+                try:
+                    line = self._stdin.readline()
+                except KeyboardInterrupt:
+                    # Nothing was running
+                    continue
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    continue
+                result = {'more': self._push(request['params']['line'])}
+                self._send({'id': request.get('id'), 'result': result})
+        except SystemExit:
+            pass
+        finally:
+            with self._condition:
+                self._closed = True
+                self._condition.notify()
+            writer.join()
+
+
+if __name__ == '__main__':
+    # Like the python console: the modules of the current folder, not the
+    # ones of the folder of this script
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path = [entry for entry in sys.path
+                if os.path.abspath(entry or os.curdir) != script_dir]
+    sys.path.insert(0, '')
+    Kernel().serve()
@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Find in Files engine.
+
+This module must not import Qt: the grep functions are executed inside
+worker processes spawned by the SearchEngine.
+"""
+
+import os
+import re
+import time
+import fnmatch
+import threading
+import multiprocessing
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    FIRST_COMPLETED,
+    wait
+)
+
+
+def compile_pattern(text, case_sensitive=True, regex=False,
+                    whole_words=False):
+    """Return a compiled pattern for the Find in Files options.
+
+    Raise re.error if the regular expression is not valid."""
+
+    if whole_words:
+        text = "|".join([r"\b" + re.escape(word) + r"\b"
+                         for word in text.split()])
+    elif not regex:
+        text = re.escape(text)
+    flags = re.MULTILINE
+    if not case_sensitive:
+        flags |= re.IGNORECASE
+    return re.compile(text, flags)
+
+
+def compile_filters(filters):
+    """Return a matcher function for a list of wildcard filters"""
+
+    if not filters:
+        return lambda name: True
+    regex = re.compile("|".join([fnmatch.translate(f) for f in filters]))
+    return regex.match
+
+
+def walk_files(root, filters, recursive=True, cancel_event=None):
+    """Yield (path, stat) for each readable file under root that match
+    the filters. Hidden files and directories are skipped."""
+
+    match = compile_filters(filters)
+    folders = [root]
+    while folders:
+        if cancel_event is not None and cancel_event.is_set():
+            return
+        current = folders.pop()
+        try:
+            entries = os.scandir(current)
+        except OSError:
+            # Skip not readable dirs!
+            continue
+        with entries:
+            for entry in entries:
+                name = entry.name
+                if name.startswith('.'):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            folders.append(entry.path)
+                    elif entry.is_file() and match(name):
+                        yield entry.path, entry.stat()
+                except OSError:
+                    continue
+
+
+def grep_text(text, pattern):
+    """Return a list of (lineno, line) for each line of text with a match.
+    Line numbers are 0-based."""
+
+    lines = []
+    append = lines.append
+    lineno = 0
+    position = 0
+    line_end = -1
+    for match in pattern.finditer(text):
+        start = match.start()
+        if start <= line_end:
+            # We already have this line
+            continue
+        lineno += text.count('\n', position, start)
+        position = start
+        line_start = text.rfind('\n', 0, start) + 1
+        line_end = text.find('\n', start)
+        if line_end == -1:
+            line_end = len(text)
+        append((lineno, text[line_start:line_end].rstrip('\r')))
+    return lines
+
+
+def grep_file(file_path, pattern):
+    """Return (file_path, size, lines) where lines are the matches of
+    pattern inside the file"""
+
+    try:
+        with open(file_path, 'rb') as fileobj:
+            content = fileobj.read()
+    except OSError:
+        return file_path, 0, []
+    size = len(content)
+    text = content.decode('utf-8', errors='replace')
+    # Most files don't match, avoid the line bookkeeping for them
+    if pattern.search(text) is None:
+        return file_path, size, []
+    return file_path, size, grep_text(text, pattern)
+
+
+def grep_files(file_paths, pattern):
+    """Grep a chunk of files, used as the unit of work of the pool"""
+
+    return [grep_file(file_path, pattern) for file_path in file_paths]
+
+
+class SearchStats(object):
+    """Throughput of a search"""
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.files = 0
+        self.bytes = 0
+        self.matches = 0
+        self.errors = 0
+        self.cancelled = False
+        self._start = time.monotonic()
+        self.elapsed = 0.0
+
+    def add(self, size, matches):
+        self.files += 1
+        self.bytes += size
+        self.matches += matches
+
+    def update(self):
+        self.elapsed = time.monotonic() - self._start
+
+    @property
+    def files_per_second(self):
+        if not self.elapsed:
+            return 0.0
+        return self.files / self.elapsed
+
+    @property
+    def bytes_per_second(self):
+        if not self.elapsed:
+            return 0.0
+        return self.bytes / self.elapsed
+
+    def __str__(self):
+        return ("{} files, {:.1f} MiB in {:.2f}s ({:.0f} files/s, "
+                "{:.1f} MiB/s, {} workers)").format(
+                    self.files, self.bytes / 1048576.0, self.elapsed,
+                    self.files_per_second, self.bytes_per_second / 1048576.0,
+                    self.workers)
+
+
+class SearchEngine(object):
+    """Walk a directory tree and grep its files on a pool of workers.
+
+    Results are delivered in batches through the on_results callback, at
+    most once per batch_interval seconds. The pool is kept alive between
+    searches, call shutdown when it's not needed anymore."""
+
+    def __init__(self, workers=0, use_processes=True, chunk_size=32,
+                 batch_interval=0.1):
+        self.workers = workers or os.cpu_count() or 1
+        self._use_processes = use_processes
+        self._chunk_size = chunk_size
+        self._batch_interval = batch_interval
+        self._executor = None
+        self._cancel = threading.Event()
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self._use_processes:
+                # Don't fork the IDE process
+                context = multiprocessing.get_context('spawn')
+                self._executor = ProcessPoolExecutor(
+                    self.workers, mp_context=context)
+            else:
+                self._executor = ThreadPoolExecutor(self.workers)
+        return self._executor
+
+    def cancel(self):
+        self._cancel.set()
+
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def shutdown(self):
+        self.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _chunks(self, root, filters, recursive, file_paths):
+        if file_paths is None:
+            file_paths = (file_path for file_path, _ in walk_files(
+                root, filters, recursive, self._cancel))
+        else:
+            match = compile_filters(filters)
+            file_paths = (file_path for file_path in file_paths
+                          if match(os.path.basename(file_path)))
+        chunk = []
+        for file_path in file_paths:
+            chunk.append(file_path)
+            if len(chunk) == self._chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def search(self, root, filters, pattern, recursive=True,
+               on_results=None, on_progress=None, file_paths=None):
+        """Search pattern in all the files under root and return the
+        SearchStats. Blocks until the search finishes or is cancelled.
+
+        If file_paths is given only those files are searched, this is used
+        with the candidates of a search_index.TrigramIndex."""
+
+        self._cancel.clear()
+        stats = SearchStats(self.workers)
+        executor = self._get_executor()
+        max_pending = self.workers * 4
+        pending = set()
+        batch = []
+        last_flush = time.monotonic()
+
+        def collect(done):
+            for future in done:
+                if future.cancelled():
+                    continue
+                try:
+                    results = future.result()
+                except Exception:
+                    stats.errors += 1
+                    continue
+                for file_path, size, lines in results:
+                    stats.add(size, len(lines))
+                    if lines:
+                        batch.append((file_path, lines))
+
+        def flush(force=False):
+            nonlocal batch, last_flush
+            now = time.monotonic()
+            if not force and now - last_flush < self._batch_interval:
+                return
+            last_flush = now
+            stats.update()
+            if batch and on_results is not None:
+                on_results(batch)
+            batch = []
+            if on_progress is not None:
+                on_progress(stats)
+
+        for chunk in self._chunks(root, filters, recursive, file_paths):
+            if self.cancelled():
+                break
+            pending.add(executor.submit(grep_files, chunk, pattern))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+                flush()
+        while pending and not self.cancelled():
+            done, pending = wait(pending, timeout=self._batch_interval,
+                                 return_when=FIRST_COMPLETED)
+            collect(done)
+            flush()
+        for future in pending:
+            future.cancel()
+        stats.cancelled = self.cancelled()
+        if stats.cancelled:
+            stats.update()
+        else:
+            flush(force=True)
+        return stats
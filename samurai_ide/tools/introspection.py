@@ -174,6 +174,13 @@ def obtain_symbols(source, with_docstrings=False, filename='',
             return {}, {}
         else:
             return {}
+    return module_symbols(module, with_docstrings, simple, only_simple)
+
+
+def module_symbols(module, with_docstrings=False, simple=False,
+                   only_simple=False):
+    """Obtain the symbols of an already parsed module, see obtain_symbols"""
+
     symbols = {}
     symbols_simplified = {}
     globalAttributes = {}
@@ -17,6 +17,8 @@
 
 import os
 import json
+import threading
+from collections.abc import MutableMapping
 
 from samurai_ide import resources
 from samurai_ide.core import settings
@@ -26,18 +28,112 @@ from samurai_ide.tools.logger import NinjaLogger
 logger = NinjaLogger('samurai_ide.tools.json_manager')
 
 
-def load_syntax():
-    """Load all the syntax files."""
+# Changed when the content of the syntax bundle changes
+SYNTAX_BUNDLE_VERSION = 1
 
-    files = os.listdir(resources.SYNTAX_FILES)
-    for _file in files:
-        name, file_extension = os.path.splitext(_file)
-        if file_extension != ".json":
+
+class SyntaxBundle(MutableMapping):
+    """The syntax definitions by language name.
+
+    The JSON source of each language is parsed the first time the
+    language is used, from any thread (the highlighters and their
+    workers)."""
+
+    def __init__(self, sources):
+        self._lock = threading.Lock()
+        # {name: JSON source}
+        self._sources = dict(sources)
+        # {name: structure or None if not parsed yet}
+        self._syntaxes = dict.fromkeys(self._sources)
+
+    def __getitem__(self, name):
+        structure = self._syntaxes[name]
+        if structure is None:
+            with self._lock:
+                structure = self._syntaxes[name]
+                if structure is None:
+                    structure = parse(self._sources[name])
+                    # Only dropped once parsed, a failure can be retried
+                    self._syntaxes[name] = structure
+                    del self._sources[name]
+        return structure
+
+    def __setitem__(self, name, structure):
+        with self._lock:
+            self._sources.pop(name, None)
+            self._syntaxes[name] = structure
+
+    def __delitem__(self, name):
+        with self._lock:
+            self._sources.pop(name, None)
+            del self._syntaxes[name]
+
+    def __iter__(self):
+        return iter(self._syntaxes)
+
+    def __len__(self):
+        return len(self._syntaxes)
+
+
+def _syntax_signature(folder):
+    """Return [[file name, mtime, size]] of the syntax files of folder"""
+
+    signature = []
+    for entry in os.scandir(folder):
+        if not entry.name.endswith(".json") or not entry.is_file():
             continue
-        filename = os.path.join(resources.SYNTAX_FILES, _file)
-        structure = read_json(filename)
-        if structure:
-            settings.SYNTAX[name] = structure
+        stat = entry.stat()
+        signature.append([entry.name, stat.st_mtime_ns, stat.st_size])
+    return sorted(signature)
+
+
+def _read_syntax_bundle(path, signature):
+    """Return the sources of the bundle or None if it's outdated"""
+
+    try:
+        with open(path, 'r') as fp:
+            bundle = json.load(fp)
+    except (OSError, ValueError):
+        return None
+    if (not isinstance(bundle, dict) or
+            bundle.get('version') != SYNTAX_BUNDLE_VERSION or
+            bundle.get('signature') != signature):
+        return None
+    return bundle.get('sources')
+
+
+def _write_syntax_bundle(path, signature, sources):
+    bundle = {'version': SYNTAX_BUNDLE_VERSION, 'signature': signature,
+              'sources': sources}
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'w') as fp:
+            json.dump(bundle, fp)
+        os.replace(path + '.tmp', path)
+    except OSError as reason:
+        logger.warning("The syntax bundle can't be saved: %s" % reason)
+
+
+def load_syntax(folder=None, bundle_path=None):
+    """Load all the syntax files.
+
+    The files are read from a single bundle file while they don't change
+    and each syntax is parsed the first time it's used."""
+
+    if folder is None:
+        folder = resources.SYNTAX_FILES
+    if bundle_path is None:
+        bundle_path = resources.SYNTAX_BUNDLE
+    signature = _syntax_signature(folder)
+    sources = _read_syntax_bundle(bundle_path, signature)
+    if sources is None:
+        sources = {}
+        for filename, _, _ in signature:
+            name = os.path.splitext(filename)[0]
+            with open(os.path.join(folder, filename), 'r') as fp:
+                sources[name] = fp.read()
+        _write_syntax_bundle(bundle_path, signature, sources)
+    settings.SYNTAX = SyntaxBundle(sources)
 
 
 def parse(descriptor):
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Pyflakes analysis of python sources.
+
+The results are plain tuples cached by the content of the source (and if
+it is an __init__.py, pyflakes treats those differently), the checker of
+the editors and the project lint share them. lint_files runs inside the
+worker processes of the project lint and must not import the GUI.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+from samurai_ide.dependencies.pyflakes_mod import checker
+from samurai_ide.tools import parse_cache
+
+
+# Number of lint results kept in memory
+CACHE_SIZE = 4096
+
+
+def cache_key(path, digest):
+    return digest, os.path.basename(path or '') == '__init__.py'
+
+
+def lint_result(result, lines=None):
+    """Return [(lineno, col, message, line text)] for a ParseResult,
+    lineno starts at 0 and a syntax error is a message starting with
+    [Error]"""
+
+    if lines is None:
+        lines = []
+    messages = []
+    if result.error is not None:
+        reason = result.error
+        if isinstance(reason, SyntaxError) and reason.text is not None:
+            messages.append((reason.lineno - 1, reason.offset,
+                             '[Error]: %s' % reason.args[0], ''))
+        return messages
+    lint_checker = checker.Checker(result.tree, result.path or '(none)')
+    lint_checker.messages.sort(key=lambda msg: msg.lineno)
+    for message in lint_checker.messages:
+        lineno = message.lineno - 1
+        line = lines[lineno].strip() if 0 <= lineno < len(lines) else ''
+        messages.append((lineno, message.col,
+                         message.message % message.message_args, line))
+    return messages
+
+
+def lint_source(path, source, digest=None):
+    """Lint source without using the caches"""
+
+    result = parse_cache.parse_source(path, source, digest)
+    return lint_result(result, source.split('\n'))
+
+
+def lint_files(sources):
+    """Lint a chunk of [(file_path, source)], used as the unit of work of
+    the pool. Return a list of (file_path, messages) where messages is None
+    if the file couldn't be linted"""
+
+    results = []
+    for file_path, source in sources:
+        try:
+            results.append((file_path, lint_source(file_path, source)))
+        except Exception:
+            results.append((file_path, None))
+    return results
+
+
+class LintCache(object):
+    """Thread safe LRU cache of the lint results by cache_key"""
+
+    def __init__(self, size=CACHE_SIZE):
+        self._size = size
+        self._lock = threading.Lock()
+        self._results = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            messages = self._results.get(key)
+            if messages is not None:
+                self._results.move_to_end(key)
+            return messages
+
+    def put(self, key, messages):
+        with self._lock:
+            self._results[key] = messages
+            self._results.move_to_end(key)
+            while len(self._results) > self._size:
+                self._results.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+
+
+# Shared by the whole IDE
+cache = LintCache()
+
+
+def lint(path, source):
+    """Return the cached lint results of source, using the shared parse
+    result when it has to be linted"""
+
+    key = cache_key(path, parse_cache.source_digest(source))
+    messages = cache.get(key)
+    if messages is None:
+        result = parse_cache.parse(path, source)
+        messages = lint_result(result, source.split('\n'))
+        cache.put(key, messages)
+    return messages
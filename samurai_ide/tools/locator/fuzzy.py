@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Fuzzy matching for the locator.
+
+The characters of the query must appear in order inside the text, the
+matches are ranked giving more points to word starts (after a separator or
+a camel case hump), consecutive characters and the last path segment.
+"""
+
+import re
+import heapq
+from itertools import compress
+
+
+# Number of results returned by FuzzyMatcher.search
+MAX_RESULTS = 200
+# With more matches than this only a cheap ranking is done (prefix first),
+# a query of one or two letters matches most of the symbols anyway
+SCORE_LIMIT = 20000
+
+_SEPARATORS = frozenset('/\\_-. ')
+
+_BONUS_BOUNDARY = 10
+_BONUS_CAMEL = 9
+_BONUS_CONSECUTIVE = 8
+_BONUS_LAST_SEGMENT = 2
+_PENALTY_GAP = 3
+
+
+def compile_query(query):
+    """Return a regex that matches the characters of query in order, with
+    one group per character to know where they matched"""
+
+    query = query.lower()
+    parts = ['({})'.format(re.escape(query[0]))]
+    for char in query[1:]:
+        # Skipping with a negated class can't backtrack like .*? does
+        parts.append('[^{0}]*({0})'.format(re.escape(char)))
+    return re.compile(''.join(parts))
+
+
+def score(text, spans):
+    """Return the score of the match of a query in text, spans are the
+    (start, end) of each character of the query, like Match.regs"""
+
+    segment_start = max(text.rfind('/'), text.rfind('\\')) + 1
+    result = 0
+    previous = -1
+    for pos, _ in spans:
+        if pos == previous + 1 and previous >= 0:
+            result += _BONUS_CONSECUTIVE
+        elif previous >= 0:
+            result -= min(pos - previous - 1, _PENALTY_GAP)
+        if pos == 0 or text[pos - 1] in _SEPARATORS:
+            result += _BONUS_BOUNDARY
+        elif text[pos].isupper() and not text[pos - 1].isupper():
+            result += _BONUS_CAMEL
+        if pos >= segment_start:
+            result += _BONUS_LAST_SEGMENT
+        previous = pos
+    return result
+
+
+def match(query, text):
+    """Return the score of query in text or None if it doesn't match"""
+
+    found = compile_query(query).search(text.lower())
+    if found is None:
+        return None
+    return score(text, found.regs[1:])
+
+
+class FuzzyMatcher(object):
+    """Fuzzy search over a fixed list of texts.
+
+    The lowercase keys and an index of the texts containing each character
+    are computed once. When the query grows (the user keeps typing) only the
+    matches of the previous query are checked again."""
+
+    def __init__(self, texts, categories=None):
+        self._texts = texts
+        self._keys = [text.lower() for text in texts]
+        self._categories = categories
+        self._chars = {}
+        for i, key in enumerate(self._keys):
+            for char in set(key):
+                self._chars.setdefault(char, []).append(i)
+        self._last = None
+
+    def __len__(self):
+        return len(self._texts)
+
+    def _candidates(self, query, category):
+        if self._last is not None:
+            last_query, last_category, last_matches = self._last
+            if last_category == category and query.startswith(last_query):
+                return last_matches
+        # Start from the less common character of the query
+        candidates = min((self._chars.get(char, []) for char in set(query)),
+                         key=len)
+        if category is not None:
+            categories = self._categories
+            candidates = [i for i in candidates if categories[i] == category]
+        return candidates
+
+    def search(self, query, category=None, limit=MAX_RESULTS):
+        """Return the indexes of the texts that match query, best first"""
+
+        query = query.lower()
+        if not query:
+            return []
+        candidates = self._candidates(query, category)
+        keys = self._keys
+        if len(query) > 1 or candidates is not self._chars.get(query):
+            # map and compress keep the loop in C
+            search = compile_query(query).search
+            candidates = list(compress(
+                candidates, map(search, map(keys.__getitem__, candidates))))
+        self._last = (query, category, candidates)
+
+        if len(candidates) > SCORE_LIMIT:
+            prefixed = []
+            others = []
+            for i in candidates:
+                if keys[i].startswith(query):
+                    prefixed.append(i)
+                    if len(prefixed) == limit:
+                        break
+                elif len(others) < limit:
+                    others.append(i)
+            return (prefixed + others)[:limit]
+
+        search = compile_query(query).search
+        texts = self._texts
+        ranked = []
+        for i in candidates:
+            spans = search(keys[i]).regs[1:]
+            ranked.append((score(texts[i], spans), -len(keys[i]), -i))
+        return [-item[2] for item in heapq.nlargest(limit, ranked)]
+
+
+def rank(items, query, key=str, limit=MAX_RESULTS):
+    """Return the items that match query, best first. Used for the short
+    lists that are not worth keeping a FuzzyMatcher"""
+
+    ranked = []
+    for i, item in enumerate(items):
+        text = key(item)
+        value = match(query, text)
+        if value is not None:
+            ranked.append((value, -len(text), -i, item))
+    return [entry[3] for entry in heapq.nlargest(
+        limit, ranked, key=lambda entry: entry[:3])]
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Symbols extraction for the locator.
+
+The functions of this module run inside the worker processes of the
+locator, they return plain tuples and must not import the GUI.
+"""
+
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+# @ FILES
+# < CLASSES
+# > FUNCTIONS
+# - MODULE ATTRIBUTES
+# ! NO PYTHON FILES
+# . SYMBOLS IN THIS FILE
+# / TABS OPENED
+# : LINE NUMBER
+FILTERS = {
+    'files': '@',
+    'classes': '<',
+    'functions': '>',
+    'attribs': '-',
+    'non-python': '!',
+    'this-file': '.',
+    'tabs': '/',
+    'lines': ':'}
+
+
+def file_signature(stat):
+    """Return the (mtime, size, inode) used to know if a file changed
+    without opening it"""
+
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+def _init_worker():
+    # Don't let the worker truncate the IDE log file
+    from samurai_ide.tools.logger import NinjaLogger, LOG_FORMAT, TIME_FORMAT
+    NinjaLogger.add_handler(os.devnull, 'a', LOG_FORMAT, TIME_FORMAT)
+
+
+def create_executor(workers=0):
+    """Return a process pool to run parse_files"""
+
+    # Don't fork the IDE process
+    context = multiprocessing.get_context('spawn')
+    return ProcessPoolExecutor(workers or os.cpu_count() or 1,
+                               mp_context=context, initializer=_init_worker)
+
+
+def stop_executor(executor, futures):
+    """Shutdown executor without waiting, the futures that didn't start
+    are cancelled (shutdown(cancel_futures=True) needs python 3.9)"""
+
+    for future in futures:
+        future.cancel()
+    executor.shutdown(wait=False)
+
+
+def flatten_symbols(symbols, results=None, parent=''):
+    """Convert the symbols returned by introspection.obtain_symbols into a
+    list of (symbol_type, name, lineno, parent)"""
+
+    if results is None:
+        results = []
+    if 'classes' in symbols:
+        _flatten_classes(symbols['classes'], results, parent)
+    if 'attributes' in symbols:
+        attributes = symbols['attributes']
+        for attr in attributes:
+            results.append(
+                (FILTERS['attribs'], attr, attributes[attr] - 1, parent))
+    if 'functions' in symbols:
+        _flatten_functions(symbols['functions'], results, parent)
+    return results
+
+
+def _flatten_classes(clazzes, results, parent):
+    for claz in clazzes:
+        members = clazzes[claz]['members']
+        results.append(
+            (FILTERS['classes'], claz, clazzes[claz]['lineno'] - 1, parent))
+        # Members are children of the class name, without the bases
+        name = claz.split('(', 1)[0]
+        if 'attributes' in members:
+            for attr in members['attributes']:
+                results.append((FILTERS['attribs'], attr,
+                                members['attributes'][attr] - 1, name))
+        if 'functions' in members:
+            _flatten_functions(members['functions'], results, name)
+        if 'classes' in members:
+            _flatten_classes(members['classes'], results, name)
+
+
+def _flatten_functions(functions, results, parent):
+    for func in functions:
+        results.append((FILTERS['functions'], func,
+                        functions[func]['lineno'] - 1, parent))
+        flatten_symbols(functions[func]['functions'], results,
+                        func.split('(', 1)[0])
+
+
+def parse_file(file_path):
+    """Return the list of (symbol_type, name, lineno, parent) of a python
+    file"""
+
+    from samurai_ide.tools import introspection
+    with open(file_path) as f:
+        content = f.read()
+    symbols = introspection.obtain_symbols(content, filename=file_path)
+    return flatten_symbols(symbols)
+
+
+def parse_files(file_paths):
+    """Parse a chunk of files, used as the unit of work of the pool.
+    Return a list of (file_path, symbols) where symbols is None if the file
+    couldn't be parsed"""
+
+    results = []
+    for file_path in file_paths:
+        try:
+            results.append((file_path, parse_file(file_path)))
+        except Exception:
+            results.append((file_path, None))
+    return results
@@ -19,18 +19,12 @@ from __future__ import unicode_literals
 from __future__ import print_function
 
 import os
-import sqlite3
-import pickle
-try:
-    import Queue
-except BaseException:
-    import queue as Queue  # lint:ok
+from concurrent.futures import as_completed
 
 from PyQt5.QtWidgets import QMessageBox
 from PyQt5.QtCore import (
     QObject,
     QThread,
-    QDir,
     QFile,
     QTextStream
 )
@@ -41,52 +35,30 @@ from samurai_ide.extensions import handlers
 from samurai_ide.gui.ide import IDE
 from samurai_ide.core.file_handling import file_manager
 from samurai_ide.core import settings
+from samurai_ide.tools import file_search
+from samurai_ide.tools import parse_cache
+from samurai_ide.tools.locator import fuzzy
+from samurai_ide.tools.locator import indexer
+from samurai_ide.tools.locator import symbols_db
+from samurai_ide.tools.locator.indexer import FILTERS
+from samurai_ide.tools.locator.symbols_db import ResultItem
 
 from samurai_ide.tools.logger import NinjaLogger
 
 
 logger = NinjaLogger('samurai_ide.tools.locator')
 
-mapping_symbols = {}
 files_paths = {}
 
-
-# @ FILES
-# < CLASSES
-# > FUNCTIONS
-# - MODULE ATTRIBUTES
-# ! NO PYTHON FILES
-# . SYMBOLS IN THIS FILE
-# / TABS OPENED
-# : LINE NUMBER
-FILTERS = {
-    'files': '@',
-    'classes': '<',
-    'functions': '>',
-    'attribs': '-',
-    'non-python': '!',
-    'this-file': '.',
-    'tabs': '/',
-    'lines': ':'}
+# Number of files sent to a worker at once, also one transaction per chunk
+CHUNK_SIZE = 64
 
 
 db_path = os.path.join(resources.NINJA_KNOWLEDGE_PATH, 'locator.db')
 
 
-def _initialize_db():
-    locator_db = sqlite3.connect(db_path)
-    cur = locator_db.cursor()
-    cur.execute("create table if not exists "
-                "locator(path text PRIMARY KEY, stat integer, data blob)")
-    locator_db.commit()
-    locator_db.close()
-
-
-# Initialize Database and open connection
-_initialize_db()
-
-
-# TODO: Clean non existent paths from the DB
+# Initialize Database
+symbols_db.SymbolsDB(db_path).close()
 
 
 class GoToDefinition(QObject):
@@ -124,50 +96,23 @@ class GoToDefinition(QObject):
             tool_dock.show_results(self._thread.results)
 
 
-class ResultItem(object):
-    """The Representation of each item found with the locator."""
-
-    def __init__(self, symbol_type='', name='', path='', lineno=-1):
-        if name:
-            self.type = symbol_type  # Function, Class, etc
-            self.name = name
-            self.path = path
-            self.lineno = lineno
-            self.comparison = self.name
-            index = self.name.find('(')
-            if index != -1:
-                self.comparison = self.name[:index]
-        else:
-            raise TypeError("name is not a string or unicode.")
-
-    def __str__(self):
-        return self.name
-
-    def __len__(self):
-        return len(self.name)
-
-    def __iter__(self):
-        for i in self.name:
-            yield i
-
-    def __getitem__(self, index):
-        return self.name[index]
-
-
 class LocateSymbolsThread(QThread):
 
     def __init__(self):
         super(LocateSymbolsThread, self).__init__()
         self.results = []
         self._cancel = False
-        self.locations = []
         self.execute = None
-        self.dirty = False
         self._search = None
         self._isVariable = None
 
-        # Locator Knowledge
+        # Locator Knowledge, one connection for the thread and one for
+        # the queries from the GUI
         self._locator_db = None
+        self._query_db = None
+        # (data version, projects, symbols, FuzzyMatcher) of the last
+        # fuzzy search, rebuilt when the knowledge changes
+        self._fuzzy = None
 
     def find(self, search, filePath, isVariable):
         self.cancel()
@@ -183,9 +128,7 @@ class LocateSymbolsThread(QThread):
         self.wait()
         self._cancel = False
         if not self.isRunning():
-            global mapping_symbols
             global files_paths
-            mapping_symbols = {}
             files_paths = {}
             self.execute = self.locate_code
             self.start()
@@ -200,113 +143,125 @@ class LocateSymbolsThread(QThread):
 
     def run(self):
         self.results = []
-        self.locations = []
-        self.execute()
+        self._locator_db = symbols_db.SymbolsDB(db_path)
+        self._locator_db.set_projects(self._get_projects())
+        try:
+            self.execute()
+        finally:
+            self._locator_db.commit()
+            self._locator_db.close()
+            self._locator_db = None
         if self._cancel:
             self.results = []
-            self.locations = []
         self._cancel = False
         self._search = None
         self._isVariable = None
-        if self._locator_db is not None:
-            self._locator_db.commit()
-            self._locator_db.close()
-            self._locator_db = None
 
-    def _save_file_symbols(self, path, stat, data):
-        if self._locator_db is not None:
-            pdata = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
-            cur = self._locator_db.cursor()
-            cur.execute("INSERT OR REPLACE INTO locator values (?, ?, ?)",
-                        (path, stat, sqlite3.Binary(pdata)))
-            self._locator_db.commit()
-
-    def _get_file_symbols(self, path):
-        if self._locator_db is not None:
-            cur = self._locator_db.cursor()
-            cur.execute("SELECT * FROM locator WHERE path=:path",
-                        {'path': path})
-            return cur.fetchone()
+    def _get_projects(self):
+        ide = IDE.get_service('ide')
+        if ide is None:
+            return []
+        return list(ide.filesystem.get_projects().keys())
+
+    def _get_query_db(self):
+        """Connection used by the queries done from the GUI thread"""
+        if self._query_db is None:
+            self._query_db = symbols_db.SymbolsDB(db_path)
+        self._query_db.set_projects(self._get_projects())
+        return self._query_db
+
+    def _file_symbol(self, file_path):
+        """Return the (kind, name) of the locator entry of a file"""
+        exts = settings.SYNTAX.get('python')['extension']
+        file_ext = file_manager.get_file_extension(file_path)
+        kind = FILTERS['files']
+        if file_ext not in exts:
+            kind = FILTERS['non-python']
+        return kind, file_manager.get_basename(file_path)
 
     def locate_code(self):
-        self._locator_db = sqlite3.connect(db_path)
         ide = IDE.get_service('ide')
         projects = ide.filesystem.get_projects()
+        # Files outside of the projects are indexed again on demand
+        self._locator_db.remove_project('')
         if not projects:
             return
-        projects = list(projects.values())
-        for nproject in projects:
+        known = self._locator_db.signatures()
+        to_parse = []
+        for nproject in list(projects.values()):
             if self._cancel:
                 break
-            current_dir = QDir(nproject.path)
-            # Skip not readable dirs!
-            if not current_dir.isReadable():
-                continue
-
-            queue_folders = Queue.Queue()
-            queue_folders.put(current_dir)
             files_paths[nproject.path] = list()
-            self.__locate_code_in_project(queue_folders, nproject)
-        self.dirty = True
-        self.get_locations()
-
-    def __locate_code_in_project(self, queue_folders, nproject):
-        file_filter = QDir.Files | QDir.NoDotAndDotDot | QDir.Readable
-        dir_filter = QDir.Dirs | QDir.NoDotAndDotDot | QDir.Readable
-        while not self._cancel and not queue_folders.empty():
-            current_dir = QDir(queue_folders.get())
-            # Skip not readable dirs!
-            if not current_dir.isReadable():
+            self.__locate_code_in_project(nproject, known, to_parse)
+        self._locator_db.commit()
+        if to_parse and not self._cancel:
+            self.__parse_in_workers(to_parse)
+
+    def __locate_code_in_project(self, nproject, known, to_parse):
+        """Collect in to_parse the files that changed since the last time
+        and remove the ones that don't exist anymore.
+        Files are compared by (mtime, size, inode), without opening them"""
+        filters = ['*{0}'.format(x) for x in nproject.extensions]
+        found = set()
+        for file_path, stat in file_search.walk_files(nproject.path, filters):
+            if self._cancel:
+                return
+            files_paths[nproject.path].append(file_path)
+            found.add(file_path)
+            signature = indexer.file_signature(stat)
+            if known.get(file_path) == signature:
                 continue
-
-            # Collect all sub dirs!
-            current_sub_dirs = current_dir.entryInfoList(dir_filter)
-            for one_dir in current_sub_dirs:
-                queue_folders.put(one_dir.absoluteFilePath())
-
-            # all files in sub_dir first apply the filters
-            current_files = current_dir.entryInfoList(
-                ['*{0}'.format(x) for x in nproject.extensions], file_filter)
-            # process all files in current dir!
-            global files_paths
-            for one_file in current_files:
-                try:
-                    self._grep_file_symbols(one_file.absoluteFilePath(),
-                                            one_file.fileName())
-                    files_paths[nproject.path].append(
-                        one_file.absoluteFilePath())
-                except Exception as reason:
-                    logger.error(
-                        '__locate_code_in_project, error: %r' % reason)
-                    logger.error(
-                        '__locate_code_in_project fail for file: %r' %
-                        one_file.absoluteFilePath())
+            kind, file_name = self._file_symbol(file_path)
+            if kind == FILTERS['non-python']:
+                self._locator_db.save_file(nproject.path, file_path,
+                                           signature, (kind, file_name), [])
+            else:
+                to_parse.append((nproject.path, file_path, signature))
+        prefix = os.path.join(nproject.path, '')
+        self._locator_db.remove_files(
+            [file_path for file_path in known
+             if file_path.startswith(prefix) and file_path not in found])
+
+    def __parse_in_workers(self, to_parse):
+        """Parse the files in a process pool, the results of each chunk
+        are saved in a single transaction"""
+        entries = {file_path: (project, signature)
+                   for project, file_path, signature in to_parse}
+        paths = list(entries.keys())
+        executor = indexer.create_executor(settings.LOCATOR_WORKERS)
+        futures = []
+        try:
+            for i in range(0, len(paths), CHUNK_SIZE):
+                futures.append(executor.submit(indexer.parse_files,
+                                               paths[i:i + CHUNK_SIZE]))
+            for future in as_completed(futures):
+                if self._cancel:
+                    break
+                for file_path, symbols in future.result():
+                    if symbols is None:
+                        logger.error('__parse_in_workers fail for file: %r'
+                                     % file_path)
+                        continue
+                    project, signature = entries[file_path]
+                    self._locator_db.save_file(
+                        project, file_path, signature,
+                        self._file_symbol(file_path), symbols)
+                self._locator_db.commit()
+        finally:
+            indexer.stop_executor(executor, futures)
 
     def locate_file_code(self):
-        self._locator_db = sqlite3.connect(db_path)
-        file_name = file_manager.get_basename(self._file_path)
         try:
-            self._grep_file_symbols(self._file_path, file_name)
-            self.dirty = True
+            self._grep_file_symbols(self._file_path, self._locator_db)
         except Exception as reason:
             logger.error('locate_file_code, error: %r' % reason)
 
     def go_to_definition(self):
-        self.dirty = True
         self.results = []
-        locations = self.get_locations()
-        if self._isVariable:
-            preResults = [
-                [file_manager.get_basename(x.path), x.path, x.lineno, '']
-                for x in locations
-                if (x.type == FILTERS['attribs']) and (x.name == self._search)]
-        else:
-            preResults = [
-                [file_manager.get_basename(x.path), x.path, x.lineno, '']
-                for x in locations
-                if ((x.type == FILTERS['functions']) or
-                    (x.type == FILTERS['classes'])) and
-                   (x.name.startswith(self._search))]
+        preResults = [
+            [file_manager.get_basename(x.path), x.path, x.lineno, '']
+            for x in self._locator_db.definitions(
+                self._search, self._isVariable)]
         for data in preResults:
             file_object = QFile(data[1])
             if not file_object.open(QFile.ReadOnly):
@@ -324,122 +279,73 @@ class LocateSymbolsThread(QThread):
                 line = stream.readLine()
                 line_index += 1
 
-    def get_locations(self):
-        if self.dirty:
-            self.convert_map_to_array()
-            self.dirty = False
-        return self.locations
+    def find_symbols(self, text='', kind=None, path=None):
+        """Return the symbols whose name contains text, sorted by name.
+        The result is lazy, only the slices requested are loaded"""
+        return self._get_query_db().query(text, kind, path)
+
+    def _get_fuzzy_matcher(self):
+        db = self._get_query_db()
+        key = (db.data_version(), tuple(self._get_projects()))
+        if self._fuzzy is None or self._fuzzy[:2] != key:
+            symbols = db.all_symbols()
+            matcher = fuzzy.FuzzyMatcher(
+                [symbol[5] for symbol in symbols],
+                [symbol[0] for symbol in symbols])
+            self._fuzzy = key + (symbols, matcher)
+        return self._fuzzy[2:]
+
+    def fuzzy_symbols(self, text, kind=None):
+        """Return the best symbols for text, ranked by fuzzy matching"""
+        symbols, matcher = self._get_fuzzy_matcher()
+        return [ResultItem(*symbols[i][:5])
+                for i in matcher.search(text, kind)]
 
     def get_this_file_symbols(self, path):
-        global mapping_symbols
-        symbols = mapping_symbols.get(path, ())
+        symbols = []
         try:
+            db = self._get_query_db()
+            symbols = db.file_symbols(path)
             if not symbols:
-                file_name = file_manager.get_basename(path)
-                self._grep_file_symbols(path, file_name)
-                symbols = mapping_symbols.get(path, ())
-            symbols = sorted(symbols[1:], key=lambda item: item.name)
+                self._grep_file_symbols(path, db)
+                symbols = db.file_symbols(path)
+                # Our own commits don't change the data version
+                self._fuzzy = None
         except Exception as reason:
             logger.error('get_this_file_symbols, error: %r' % reason)
         return symbols
 
-    def convert_map_to_array(self):
-        global mapping_symbols
-        self.locations = [x for location in mapping_symbols
-                          for x in mapping_symbols[location]]
-        self.locations = sorted(self.locations, key=lambda item: item.name)
-
-    def _grep_file_symbols(self, file_path, file_name):
-        # type - file_name - file_path
-        global mapping_symbols
-        exts = settings.SYNTAX.get('python')['extension']
-        file_ext = file_manager.get_file_extension(file_path)
-        if file_ext not in exts:
-            mapping_symbols[file_path] = [
-                ResultItem(symbol_type=FILTERS['non-python'], name=file_name,
-                           path=file_path, lineno=-1)]
-        else:
-            mapping_symbols[file_path] = [
-                ResultItem(symbol_type=FILTERS['files'], name=file_name,
-                           path=file_path, lineno=-1)]
-        data = self._get_file_symbols(file_path)
-        # FIXME: stat not int
-        mtime = int(os.stat(file_path).st_mtime)
-        if data is not None and (mtime == int(data[1])):
-            try:
-                results = pickle.loads(data[2])
-                mapping_symbols[file_path] += results
-                return
-            except BaseException:
-                print("ResultItem couldn't be loaded, let's analyze it again'")
-        # obtain a symbols handler for this file extension
-        lang = settings.LANGUAGE_MAP.get(file_ext)
-        symbols_handler = handlers.get_symbols_handler(lang)
-        if symbols_handler is None:
+    def _grep_file_symbols(self, file_path, db):
+        signature = indexer.file_signature(os.stat(file_path))
+        if db.signature(file_path) == signature:
             return
-        results = []
-        with open(file_path) as f:
-            content = f.read()
-            symbols = symbols_handler.obtain_symbols(
-                content,
-                filename=file_path)
-            self.__parse_symbols(symbols, results, file_path)
-
-        if results:
-            self._save_file_symbols(file_path, mtime, results)
-            mapping_symbols[file_path] += results
-
-    def __parse_symbols(self, symbols, results, file_path):
-        if "classes" in symbols:
-            self.__parse_class(symbols, results, file_path)
-        if 'attributes' in symbols:
-            self.__parse_attributes(symbols, results, file_path)
-        if 'functions' in symbols:
-            self.__parse_functions(symbols, results, file_path)
-
-    def __parse_class(self, symbols, results, file_path):
-        clazzes = symbols['classes']
-        for claz in clazzes:
-            line_number = clazzes[claz]['lineno'] - 1
-            members = clazzes[claz]['members']
-            results.append(ResultItem(symbol_type=FILTERS['classes'],
-                           name=claz, path=file_path,
-                           lineno=line_number))
-            if 'attributes' in members:
-                for attr in members['attributes']:
-                    line_number = members['attributes'][attr] - 1
-                    results.append(ResultItem(symbol_type=FILTERS['attribs'],
-                                   name=attr, path=file_path,
-                                   lineno=line_number))
-            if 'functions' in members:
-                for func in members['functions']:
-                    line_number = members['functions'][func]['lineno'] - 1
-                    results.append(ResultItem(
-                        symbol_type=FILTERS['functions'], name=func,
-                        path=file_path, lineno=line_number))
-                    self.__parse_symbols(
-                        members['functions'][func]['functions'],
-                        results, file_path)
-            if 'classes' in members:
-                self.__parse_class(members, results, file_path)
-
-    def __parse_attributes(self, symbols, results, file_path):
-        attributes = symbols['attributes']
-        for attr in attributes:
-            line_number = attributes[attr] - 1
-            results.append(ResultItem(symbol_type=FILTERS['attribs'],
-                           name=attr, path=file_path,
-                           lineno=line_number))
-
-    def __parse_functions(self, symbols, results, file_path):
-        functions = symbols['functions']
-        for func in functions:
-            line_number = functions[func]['lineno'] - 1
-            results.append(ResultItem(
-                symbol_type=FILTERS['functions'], name=func,
-                path=file_path, lineno=line_number))
-            self.__parse_symbols(functions[func]['functions'],
-                                 results, file_path)
+        file_symbol = self._file_symbol(file_path)
+        symbols = []
+        if file_symbol[0] == FILTERS['files']:
+            # obtain a symbols handler for this file extension
+            file_ext = file_manager.get_file_extension(file_path)
+            lang = settings.LANGUAGE_MAP.get(file_ext)
+            symbols_handler = handlers.get_symbols_handler(lang)
+            if symbols_handler is not None:
+                with open(file_path) as f:
+                    content = f.read()
+                if lang == 'python':
+                    # Usually just parsed for the editor of the file
+                    file_symbols = parse_cache.parse(
+                        file_path, content).symbols
+                else:
+                    file_symbols = symbols_handler.obtain_symbols(
+                        content, filename=file_path)
+                symbols = indexer.flatten_symbols(file_symbols)
+        db.save_file(self._project_for(file_path), file_path, signature,
+                     file_symbol, symbols)
+        db.commit()
+
+    def _project_for(self, file_path):
+        for project in sorted(self._get_projects(), reverse=True):
+            if file_path.startswith(os.path.join(project, '')):
+                return project
+        return ''
 
     def get_symbols_for_class(self, file_path, clazzName):
         results = []
@@ -450,7 +356,11 @@ class LocateSymbolsThread(QThread):
             symbols_handler = handlers.get_symbols_handler(ext)
             symbols = symbols_handler.obtain_symbols(content,
                                                      filename=file_path)
-            self.__parse_symbols(symbols, results, file_path)
+        for symbol_type, name, lineno, parent in \
+                indexer.flatten_symbols(symbols):
+            results.append(ResultItem(symbol_type=symbol_type, name=name,
+                                      path=file_path, lineno=lineno,
+                                      parent=parent))
         return results
 
     def cancel(self):
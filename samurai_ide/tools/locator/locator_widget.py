@@ -32,6 +32,7 @@ from samurai_ide.core.file_handling import file_manager
 from samurai_ide.tools import ui_tools
 from samurai_ide.tools import utils
 from samurai_ide.gui.ide import IDE
+from samurai_ide.tools.locator import fuzzy
 from samurai_ide.tools.locator import locator
 from samurai_ide.tools.logger import NinjaLogger
 
@@ -185,11 +186,10 @@ class LocatorWidget(QDialog):
             del filterOptions[0]
 
         if len(filterOptions) == 0:
-            self.tempLocations = self.locate_symbols.get_locations()
+            self.tempLocations = self.locate_symbols.find_symbols()
         elif len(filterOptions) == 1:
-            self.tempLocations = [
-                x for x in self.locate_symbols.get_locations()
-                if x.comparison.lower().find(filterOptions[0].lower()) > -1]
+            self.tempLocations = self.locate_symbols.fuzzy_symbols(
+                filterOptions[0])
         else:
             index = 0
             if not self.tempLocations and (self.__pre_filters == filterOptions):
@@ -209,10 +209,12 @@ class LocatorWidget(QDialog):
     def _filter_generic(self, filterOptions, index):
         at_start = (index == 0)
         if at_start:
-            self.tempLocations = [
-                x for x in self.locate_symbols.get_locations()
-                if x.type == filterOptions[0] and
-                x.comparison.lower().find(filterOptions[1].lower()) > -1]
+            if filterOptions[1]:
+                self.tempLocations = self.locate_symbols.fuzzy_symbols(
+                    filterOptions[1], kind=filterOptions[0])
+            else:
+                self.tempLocations = self.locate_symbols.find_symbols(
+                    kind=filterOptions[0])
         else:
             currentItem = self._root.currentItem()
             if currentItem is not None:
@@ -223,15 +225,20 @@ class LocatorWidget(QDialog):
                         currentItem[2], currentItem[1])
                     self.tempLocations = symbols
                 elif currentItem:
-                    global mapping_symbols
-                    self.tempLocations = locator.mapping_symbols.get(
-                        currentItem[2], [])
-                self.tempLocations = [x for x in self.tempLocations
-                                      if x.type == filterOptions[index] and
-                                      x.comparison.lower().find(
-                                          filterOptions[index + 1].lower()) > -1]
+                    self.tempLocations = \
+                        self.locate_symbols.get_this_file_symbols(
+                            currentItem[2])
+                self.tempLocations = self._rank(
+                    [x for x in self.tempLocations
+                     if x.type == filterOptions[index]],
+                    filterOptions[index + 1])
         return index + 2
 
+    def _rank(self, locations, search):
+        if not search:
+            return locations
+        return fuzzy.rank(locations, search, key=lambda x: x.comparison)
+
     def _filter_this_file(self, filterOptions, index):
         at_start = (index == 0)
         if at_start:
@@ -252,9 +259,8 @@ class LocatorWidget(QDialog):
                 self.tempLocations = \
                     self.locate_symbols.get_this_file_symbols(
                         editorWidget.file_path)
-                search = filterOptions[index + 1].lstrip().lower()
-                self.tempLocations = [x for x in self.tempLocations
-                                      if x.comparison.lower().find(search) > -1]
+                self.tempLocations = self._rank(
+                    self.tempLocations, filterOptions[index + 1].lstrip())
         else:
             del filterOptions[index + 1]
             del filterOptions[index]
@@ -269,10 +275,8 @@ class LocatorWidget(QDialog):
                 locator.ResultItem(
                     locator.FILTERS['files'],
                     opened[f].file_name, opened[f].file_path) for f in opened]
-            search = filterOptions[index + 1].lstrip().lower()
-            self.tempLocations = [
-                x for x in self.tempLocations
-                if x.comparison.lower().find(search) > -1]
+            self.tempLocations = self._rank(
+                self.tempLocations, filterOptions[index + 1].lstrip())
             index += 2
         else:
             del filterOptions[index + 1]
@@ -296,18 +300,14 @@ class LocatorWidget(QDialog):
                 else:
                     filterOptions.insert(0, locator.FILTERS['non-python'])
                 filterOptions.insert(1, editorWidget.file_path)
-            self.tempLocations = [
-                x for x in self.locate_symbols.get_locations()
-                if x.type == filterOptions[0] and
-                x.path == filterOptions[1]]
+            self.tempLocations = self.locate_symbols.find_symbols(
+                kind=filterOptions[0], path=filterOptions[1])
         else:
             currentItem = self._root.currentItem()
             if currentItem is not None:
                 currentItem = currentItem.toVariant()
-                self.tempLocations = [
-                    x for x in self.locate_symbols.get_locations()
-                    if x.type == currentItem[0] and
-                    x.path == currentItem[2]]
+                self.tempLocations = self.locate_symbols.find_symbols(
+                    kind=currentItem[0], path=currentItem[2])
         if filterOptions[index + 1].isdigit():
             self._line_jump = int(filterOptions[index + 1]) - 1
         return index + 2
@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Locator knowledge: one row per symbol in a SQLite database.
+
+The locator and Go To Definition query the database directly, nothing but
+the current page of results is kept in memory.
+"""
+
+import sqlite3
+
+from samurai_ide.tools.locator.indexer import FILTERS
+
+
+# Substring searches shorter than this can't use the trigram index
+_MIN_FTS_LENGTH = 3
+
+
+class ResultItem(object):
+    """The Representation of each item found with the locator."""
+
+    def __init__(self, symbol_type='', name='', path='', lineno=-1,
+                 parent=''):
+        if name:
+            self.type = symbol_type  # Function, Class, etc
+            self.name = name
+            self.path = path
+            self.lineno = lineno
+            self.parent = parent
+            self.comparison = self.name
+            index = self.name.find('(')
+            if index != -1:
+                self.comparison = self.name[:index]
+        else:
+            raise TypeError("name is not a string or unicode.")
+
+    def __str__(self):
+        return self.name
+
+    def __len__(self):
+        return len(self.name)
+
+    def __iter__(self):
+        for i in self.name:
+            yield i
+
+    def __getitem__(self, index):
+        return self.name[index]
+
+
+def _escape_like(text):
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _fts_phrase(text):
+    """Quote text as a FTS5 phrase, with the trigram tokenizer it matches
+    the names that contain text"""
+
+    return '"{}"'.format(text.replace('"', '""'))
+
+
+class SymbolResults(object):
+    """Lazy result of a query, sorted by name.
+
+    Slicing only fetches the requested page from the database."""
+
+    def __init__(self, db, where, args):
+        self._db = db
+        self._where = where
+        self._args = tuple(args)
+        self._count = None
+
+    def _select(self, suffix='', args=()):
+        return self._db.execute(
+            "SELECT kind, name, path, lineno, parent FROM symbols "
+            "WHERE {} ORDER BY name {}".format(self._where, suffix),
+            self._args + tuple(args))
+
+    def __len__(self):
+        if self._count is None:
+            self._count = self._db.execute(
+                "SELECT COUNT(*) FROM symbols WHERE " + self._where,
+                self._args).fetchone()[0]
+        return self._count
+
+    def __iter__(self):
+        for row in self._select():
+            yield ResultItem(*row)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if stop <= start:
+                return []
+            items = [ResultItem(*row) for row in self._select(
+                "LIMIT ? OFFSET ?", (stop - start, start))]
+            return items[::step]
+        if index < 0:
+            index += len(self)
+        row = self._select("LIMIT 1 OFFSET ?", (index,)).fetchone()
+        if row is None:
+            raise IndexError(index)
+        return ResultItem(*row)
+
+
+class SymbolsDB(object):
+    """Normalized symbols of the projects.
+
+    The connection can only be used by one thread at a time, each thread
+    should open its own SymbolsDB."""
+
+    def __init__(self, db_path):
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self.has_fts = self._create_schema()
+        self._projects = ('',)
+
+    def _create_schema(self):
+        cur = self._db.cursor()
+        # Old versions stored pickled blobs, it is just a cache
+        cur.execute("DROP TABLE IF EXISTS locator")
+        cur.executescript("""
+            CREATE TABLE IF NOT EXISTS files(
+                path TEXT PRIMARY KEY,
+                project TEXT,
+                mtime INTEGER,
+                size INTEGER,
+                inode INTEGER);
+            CREATE INDEX IF NOT EXISTS files_project ON files(project);
+            CREATE TABLE IF NOT EXISTS symbols(
+                id INTEGER PRIMARY KEY,
+                name TEXT,
+                comparison TEXT,
+                kind TEXT,
+                path TEXT,
+                lineno INTEGER,
+                parent TEXT,
+                project TEXT);
+            CREATE INDEX IF NOT EXISTS symbols_name ON symbols(name);
+            CREATE INDEX IF NOT EXISTS symbols_kind_name
+                ON symbols(kind, name);
+            CREATE INDEX IF NOT EXISTS symbols_path ON symbols(path);
+        """)
+        try:
+            cur.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS symbols_fts USING fts5(
+                    comparison, content='symbols', content_rowid='id',
+                    tokenize='trigram');
+                CREATE TRIGGER IF NOT EXISTS symbols_ai AFTER INSERT
+                ON symbols BEGIN
+                    INSERT INTO symbols_fts(rowid, comparison)
+                    VALUES (new.id, new.comparison);
+                END;
+                CREATE TRIGGER IF NOT EXISTS symbols_ad AFTER DELETE
+                ON symbols BEGIN
+                    INSERT INTO symbols_fts(symbols_fts, rowid, comparison)
+                    VALUES ('delete', old.id, old.comparison);
+                END;
+            """)
+            has_fts = True
+        except sqlite3.OperationalError:
+            # SQLite without FTS5 or the trigram tokenizer
+            has_fts = False
+        self._db.commit()
+        return has_fts
+
+    def close(self):
+        self._db.close()
+        self._db = None
+
+    def commit(self):
+        self._db.commit()
+
+    def set_projects(self, projects):
+        """Restrict the queries to the symbols of these projects.
+        The files outside of any project are always included."""
+
+        self._projects = ('',) + tuple(projects)
+
+    def signatures(self):
+        """Return {path: (mtime, size, inode)} of the indexed files"""
+
+        cur = self._db.execute("SELECT path, mtime, size, inode FROM files")
+        return {row[0]: tuple(row[1:]) for row in cur}
+
+    def signature(self, path):
+        """Return the (mtime, size, inode) of an indexed file or None"""
+
+        row = self._db.execute(
+            "SELECT mtime, size, inode FROM files WHERE path=?",
+            (path,)).fetchone()
+        return tuple(row) if row is not None else None
+
+    def remove_files(self, paths):
+        args = [(path,) for path in paths]
+        self._db.executemany("DELETE FROM symbols WHERE path=?", args)
+        self._db.executemany("DELETE FROM files WHERE path=?", args)
+
+    def remove_project(self, project):
+        self._db.execute("DELETE FROM symbols WHERE project=?", (project,))
+        self._db.execute("DELETE FROM files WHERE project=?", (project,))
+
+    def save_file(self, project, path, signature, file_symbol, symbols):
+        """Replace the symbols of path, the caller commits.
+
+        file_symbol is the (kind, name) of the entry of the file itself and
+        symbols a list of (kind, name, lineno, parent)"""
+
+        self.remove_files((path,))
+        self._db.execute(
+            "INSERT INTO files(path, project, mtime, size, inode) "
+            "VALUES (?, ?, ?, ?, ?)", (path, project) + tuple(signature))
+        kind, name = file_symbol
+        rows = [(kind, name, -1, '')] + list(symbols)
+        self._db.executemany(
+            "INSERT INTO symbols(kind, name, comparison, lineno, parent, "
+            "path, project) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(kind, name, name.split('(', 1)[0], lineno, parent, path,
+              project) for kind, name, lineno, parent in rows])
+
+    def _where(self, text='', kind=None, path=None):
+        conditions = ["project IN ({})".format(
+            ", ".join("?" * len(self._projects)))]
+        args = list(self._projects)
+        if kind is not None:
+            conditions.append("kind=?")
+            args.append(kind)
+        if path is not None:
+            conditions.append("path=?")
+            args.append(path)
+        if text:
+            if self.has_fts and len(text) >= _MIN_FTS_LENGTH:
+                # LIKE with ESCAPE can't use the trigram index
+                conditions.append(
+                    "id IN (SELECT rowid FROM symbols_fts "
+                    "WHERE symbols_fts MATCH ?)")
+                args.append(_fts_phrase(text))
+            else:
+                conditions.append("comparison LIKE ? ESCAPE '\\'")
+                args.append("%{}%".format(_escape_like(text)))
+        return " AND ".join(conditions), args
+
+    def query(self, text='', kind=None, path=None):
+        """Return the symbols whose name contains text (ignoring the case),
+        optionally of a kind and inside path, as lazy SymbolResults"""
+
+        where, args = self._where(text, kind, path)
+        return SymbolResults(self._db, where, args)
+
+    def data_version(self):
+        """Return a number that changes when another connection commits"""
+
+        return self._db.execute("PRAGMA data_version").fetchone()[0]
+
+    def all_symbols(self):
+        """Return the (kind, name, path, lineno, parent, text) of every
+        symbol, where text is the name without arguments or, for files,
+        the path relative to its project"""
+
+        where, args = self._where()
+        cur = self._db.execute(
+            "SELECT kind, name, path, lineno, parent, "
+            "CASE WHEN lineno < 0 AND project != '' "
+            "THEN substr(path, length(project) + 2) ELSE comparison END "
+            "FROM symbols WHERE " + where, args)
+        return cur.fetchall()
+
+    def file_symbols(self, path):
+        """Return the symbols defined inside path, without the file entry"""
+
+        where, args = self._where(path=path)
+        return list(SymbolResults(self._db, where + " AND lineno >= 0", args))
+
+    def definitions(self, name, variable=False):
+        """Return the attributes named name if variable, otherwise the
+        classes and functions whose name starts with name"""
+
+        if variable:
+            where, args = self._where(kind=FILTERS['attribs'])
+            where += " AND name=?"
+            args.append(name)
+        else:
+            where, args = self._where()
+            # name is a prefix, compare as a range to use the index
+            where += " AND kind IN (?, ?) AND name >= ? AND name < ?"
+            args.extend([FILTERS['functions'], FILTERS['classes'],
+                         name, name + '\U0010ffff'])
+        return list(SymbolResults(self._db, where, args))
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Find the modules that an interpreter can't import.
+
+The lookup runs in a subprocess of the interpreter of the project (nothing
+is imported inside the IDE) and the results are cached.
+"""
+
+import os
+import json
+import queue
+import threading
+import subprocess
+
+from samurai_ide.dependencies import notimportchecker
+from samurai_ide.tools.logger import NinjaLogger
+
+
+logger = NinjaLogger(__name__)
+
+_SERVER_SCRIPT = os.path.abspath(notimportchecker.__file__)
+
+# Seconds to wait for an answer before restarting the server
+REQUEST_TIMEOUT = 10
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class ModuleResolver(object):
+    """Answer which modules can't be found by an interpreter.
+
+    There is one server process per interpreter. The results are cached
+    per interpreter and extra sys.path entries, the cache is dropped when
+    one of those folders or of the sys.path of the interpreter changes (a
+    module was added, installed or removed)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # {interpreter: (process, queue of the lines it writes)}
+        self._servers = {}
+        # {(interpreter, path): (mtimes, {module: exists})}
+        self._cache = {}
+        # {interpreter: sys.path entries reported by its server}
+        self._sys_paths = {}
+
+    def _server(self, interpreter):
+        entry = self._servers.get(interpreter)
+        if entry is None or entry[0].poll() is not None:
+            kwargs = {}
+            if os.name == 'nt':
+                kwargs['creationflags'] = subprocess.CREATE_NO_WINDOW
+            server = subprocess.Popen(
+                [interpreter, _SERVER_SCRIPT, '--serve'],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL, universal_newlines=True, **kwargs)
+            lines = queue.Queue()
+            # A reader thread, so that an answer can be waited with a
+            # timeout on every platform
+            reader = threading.Thread(
+                target=self._read, args=(server, lines), daemon=True)
+            reader.start()
+            entry = self._servers[interpreter] = (server, lines)
+        return entry
+
+    @staticmethod
+    def _read(server, lines):
+        for line in server.stdout:
+            lines.put(line)
+        # The server died
+        lines.put('')
+
+    def _request(self, interpreter, modules, path):
+        """Return the missing modules or None if the interpreter failed or
+        didn't answer in time"""
+        try:
+            server, lines = self._server(interpreter)
+            server.stdin.write(json.dumps(
+                {'modules': modules, 'path': list(path)}) + '\n')
+            server.stdin.flush()
+            line = lines.get(timeout=REQUEST_TIMEOUT)
+            response = json.loads(line)
+            self._sys_paths[interpreter] = tuple(
+                response.get('sys_path', ()))
+            return set(response['missing'])
+        except queue.Empty:
+            logger.warning('Module resolution timed out with %s' %
+                           interpreter)
+        except (OSError, ValueError) as reason:
+            logger.warning('Module resolution failed with %s: %r' %
+                           (interpreter, reason))
+        self._stop(interpreter)
+        return None
+
+    def _stop(self, interpreter):
+        entry = self._servers.pop(interpreter, None)
+        if entry is not None:
+            server = entry[0]
+            server.kill()
+            server.wait()
+
+    def find_missing(self, interpreter, modules, path=()):
+        """Return the modules that can't be imported by interpreter with
+        the entries of path added at the beginning of sys.path"""
+
+        key = (interpreter, tuple(path))
+        with self._lock:
+            mtimes = self._mtimes(interpreter, path)
+            entry = self._cache.get(key)
+            if entry is None or entry[0] != mtimes:
+                entry = self._cache[key] = (mtimes, {})
+            cache = entry[1]
+            unknown = [name for name in modules if name not in cache]
+            if unknown:
+                missing = self._request(interpreter, unknown, path)
+                if missing is None:
+                    # Don't report modules we couldn't check
+                    return []
+                for name in unknown:
+                    cache[name] = name not in missing
+                # The first answer tells the sys.path of the interpreter
+                self._cache[key] = (self._mtimes(interpreter, path), cache)
+            return [name for name in modules if not cache[name]]
+
+    def _mtimes(self, interpreter, path):
+        entries = tuple(path) + self._sys_paths.get(interpreter, ())
+        return tuple(_mtime(entry) for entry in entries)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._sys_paths.clear()
+
+    def shutdown(self):
+        with self._lock:
+            for interpreter in list(self._servers.keys()):
+                self._stop(interpreter)
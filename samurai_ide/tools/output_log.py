@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Output of a program written to a file and read back with mmap.
+
+Only a sparse index of the lines is kept in memory: the first line
+starting after every INDEX_STEP bytes. A line is found from the closest
+entry of the index, so the memory used doesn't grow with the output.
+"""
+
+import os
+import re
+import mmap
+import bisect
+
+
+# Bytes between two entries of the line index
+INDEX_STEP = 64 * 1024
+
+
+class OutputLog(object):
+    """Append only log file with access by line number"""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, 'w+b')
+        self._size = 0
+        self._newlines = 0
+        # Entry i: line _index_lines[i] starts at _index_offsets[i]
+        self._index_lines = [0]
+        self._index_offsets = [0]
+        self._map = None
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def line_count(self):
+        """Number of lines, the last one may be empty or incomplete"""
+        return self._newlines + 1
+
+    def write(self, data):
+        if not data:
+            return
+        self._file.write(data)
+        base = self._size
+        self._size += len(data)
+        boundary = self._index_offsets[-1] + INDEX_STEP
+        position = 0
+        while boundary < self._size:
+            newline = data.find(b'\n', max(boundary - base, position))
+            if newline == -1:
+                break
+            self._index_lines.append(
+                self._newlines + data.count(b'\n', 0, newline + 1))
+            self._index_offsets.append(base + newline + 1)
+            position = newline + 1
+            boundary = base + position + INDEX_STEP
+        self._newlines += data.count(b'\n')
+
+    def _buffer(self):
+        """Return a read only map of the file, remapped when it grew"""
+        if self._map is None or len(self._map) != self._size:
+            self._file.flush()
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            if self._size == 0:
+                return b''
+            self._map = mmap.mmap(self._file.fileno(), self._size,
+                                  access=mmap.ACCESS_READ)
+        return self._map
+
+    def line_offset(self, lineno):
+        """Return the offset of the first byte of a line"""
+        lineno = max(0, min(lineno, self._newlines))
+        buffer = self._buffer()
+        index = bisect.bisect_right(self._index_lines, lineno) - 1
+        offset = self._index_offsets[index]
+        for _ in range(lineno - self._index_lines[index]):
+            offset = buffer.find(b'\n', offset) + 1
+        return offset
+
+    def line_at(self, offset):
+        """Return the number of the line containing offset"""
+        index = bisect.bisect_right(self._index_offsets, offset) - 1
+        start = self._index_offsets[index]
+        return self._index_lines[index] + \
+            self._buffer()[start:offset].count(b'\n')
+
+    def lines(self, first, count):
+        """Return up to count lines from first, decoded"""
+        if first > self._newlines or count <= 0:
+            return []
+        buffer = self._buffer()
+        offset = self.line_offset(first)
+        lines = []
+        while len(lines) < count and offset <= self._size:
+            end = buffer.find(b'\n', offset)
+            if end == -1:
+                end = self._size
+            lines.append(buffer[offset:end].decode('utf-8', 'replace'))
+            offset = end + 1
+        return lines
+
+    def find(self, text, lineno=0, case_sensitive=False):
+        """Return the number of the first line from lineno containing
+        text, searching from the start when not found, or -1"""
+        flags = 0 if case_sensitive else re.IGNORECASE
+        pattern = re.compile(re.escape(text.encode('utf-8')), flags)
+        buffer = self._buffer()
+        start = self.line_offset(lineno)
+        match = pattern.search(buffer, start)
+        if match is None and start:
+            match = pattern.search(buffer, 0, start)
+        if match is None:
+            return -1
+        return self.line_at(match.start())
+
+    def close(self, remove=True):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+        if remove:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Shared parse results of python sources.
+
+The symbols combo, the symbols tree, the locator and the checkers ask for
+the same (path, content), the source is parsed only once and the AST and
+the symbols are kept in a small LRU cache. Results are read only: the
+consumers must not modify the tree or the symbols.
+"""
+
+import ast
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from samurai_ide.tools import introspection
+
+
+# Number of parse results kept in memory
+CACHE_SIZE = 32
+
+
+def source_digest(source):
+    if isinstance(source, str):
+        source = source.encode('utf-8', 'surrogatepass')
+    return hashlib.sha1(source).hexdigest()
+
+
+class ParseResult(object):
+    """AST and symbols of a source, error is the SyntaxError (or
+    ValueError) raised by the parser, tree is None in that case"""
+
+    def __init__(self, path, digest, tree=None, error=None):
+        self.path = path
+        self.digest = digest
+        self.tree = tree
+        self.error = error
+        self.symbols = {}
+        self.symbols_simplified = {}
+        if tree is not None:
+            self.symbols, self.symbols_simplified = \
+                introspection.module_symbols(tree, simple=True)
+
+
+def parse_source(path, source, digest=None):
+    """Parse source without using the cache"""
+
+    if digest is None:
+        digest = source_digest(source)
+    try:
+        tree = ast.parse(source, path or '<unknown>')
+    except (SyntaxError, ValueError) as reason:
+        return ParseResult(path, digest, error=reason)
+    return ParseResult(path, digest, tree)
+
+
+class ParseCache(object):
+    """Thread safe LRU cache of ParseResult keyed by (path, digest).
+
+    When several threads ask for the same source at the same time only
+    one of them parses it, the others wait for that result."""
+
+    def __init__(self, size=CACHE_SIZE):
+        self._size = size
+        self._lock = threading.Lock()
+        self._results = OrderedDict()
+        self._pending = {}
+
+    def lookup(self, path, source):
+        """Return the cached result for source or None"""
+
+        key = (path, source_digest(source))
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+            return result
+
+    def get(self, path, source):
+        """Return the ParseResult of source, parsing it if needed"""
+
+        digest = source_digest(source)
+        key = (path, digest)
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                return result
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                future = self._pending[key] = Future()
+        if not owner:
+            return future.result()
+        try:
+            result = parse_source(path, source, digest)
+        except BaseException as reason:
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(reason)
+            raise
+        with self._lock:
+            del self._pending[key]
+            self._results[key] = result
+            while len(self._results) > self._size:
+                self._results.popitem(last=False)
+        future.set_result(result)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+
+
+# Shared by the whole IDE
+cache = ParseCache()
+
+
+def parse(path, source):
+    """Return the shared ParseResult of source"""
+
+    return cache.get(path, source)
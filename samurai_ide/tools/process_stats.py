@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""CPU and memory use of a running process, read from /proc (Linux).
+
+The values are sampled by the caller: the ones of a finished process are
+those of its last sample.
+"""
+
+import os
+import time
+
+
+# Ticks per second of the CPU times of /proc/<pid>/stat
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+
+def format_size(size):
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return '%.1f %s' % (size, unit) if unit != 'B' else \
+                '%d B' % size
+        size /= 1024.0
+    return '%.1f GB' % size
+
+
+class ProcessStats(object):
+    """CPU % since the previous sample, CPU time (with the children that
+    were waited for), resident memory and its peak of a process"""
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.cpu_percent = 0.0
+        self.cpu_time = 0.0
+        self.rss = 0
+        self.peak_rss = 0
+        # (monotonic time, cpu seconds) of the previous sample
+        self._last = None
+
+    def sample(self):
+        """Read the current values, False if the process is gone or there
+        is no /proc"""
+        try:
+            with open('/proc/%d/stat' % self.pid, 'rb') as stat_file:
+                stat = stat_file.read()
+            with open('/proc/%d/status' % self.pid, 'rb') as status_file:
+                status = status_file.read()
+        except OSError:
+            return False
+        # The fields after the command name, that may have spaces, the
+        # first one is the state (field 3), utime is the field 14
+        fields = stat[stat.rindex(b')') + 2:].split()
+        cpu_time = sum(int(ticks) for ticks in fields[11:15]) / CLOCK_TICKS
+        now = time.monotonic()
+        if self._last is not None and now > self._last[0]:
+            self.cpu_percent = 100.0 * (cpu_time - self._last[1]) / \
+                (now - self._last[0])
+        self._last = (now, cpu_time)
+        self.cpu_time = cpu_time
+        for line in status.splitlines():
+            if line.startswith(b'VmRSS:'):
+                self.rss = int(line.split()[1]) * 1024
+            elif line.startswith(b'VmHWM:'):
+                self.peak_rss = max(self.peak_rss,
+                                    int(line.split()[1]) * 1024)
+        self.peak_rss = max(self.peak_rss, self.rss)
+        return True
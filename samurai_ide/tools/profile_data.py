@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Read the output of tools.profile_runner for the profiler views.
+
+A ProfileResult has the rows of the hotspots (cProfile) or allocations
+(tracemalloc) table and the root Frame of the icicle graph, where the value
+of a frame is its cumulative time or the memory allocated under it. The
+frames of the runner itself are not shown.
+"""
+
+import os
+import pstats
+import linecache
+import tracemalloc
+
+from samurai_ide.tools import profile_runner
+
+CPROFILE = 'cprofile'
+TRACEMALLOC = 'tracemalloc'
+
+RUNNER = os.path.abspath(profile_runner.__file__)
+# Depth of the icicle graph
+MAX_DEPTH = 64
+# The frames smaller than this part of the total are not in the graph
+MIN_FRACTION = 0.001
+
+
+def _is_runner(path):
+    if not path:
+        return False
+    return path == RUNNER or os.path.basename(path) in (
+        'runpy.py', '<frozen runpy>')
+
+
+class Frame(object):
+    """A node of the icicle graph, path is None for the builtins"""
+
+    __slots__ = ('name', 'path', 'lineno', 'value', 'children')
+
+    def __init__(self, name, path=None, lineno=0, value=0):
+        self.name = name
+        self.path = path
+        self.lineno = lineno
+        self.value = value
+        self.children = []
+
+    def add(self, child):
+        self.children.append(child)
+        return child
+
+
+class ProfileResult(object):
+    """rows are (name, path, lineno, values...) with the values of the
+    columns of kind: calls, own and cumulative seconds for CPROFILE, size
+    and count of blocks for TRACEMALLOC"""
+
+    def __init__(self, kind, rows, root):
+        self.kind = kind
+        self.rows = rows
+        self.root = root
+
+    @property
+    def total(self):
+        return self.root.value
+
+
+def _function_name(function):
+    path, lineno, name = function
+    if path == '~' and lineno == 0:
+        # A builtin: {built-in method builtins.exec}
+        return name.strip('<>{}'), None, 0
+    return name, path, lineno
+
+
+def load_profile(path):
+    """Return the ProfileResult of the pstats dumped to path"""
+
+    stats = pstats.Stats(path).stats
+    rows = []
+    # {caller: [(callee, cumulative seconds of the calls from caller)]}
+    callees = {}
+    roots = []
+    for function, (_, calls, own, cumulative, callers) in stats.items():
+        if not _is_runner(function[0]):
+            rows.append(
+                _function_name(function) + (calls, own, cumulative))
+        if not callers:
+            roots.append((function, cumulative))
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((function, edge[3]))
+    root = Frame('all')
+    root.value = sum(value for _, value in roots)
+    minimum = root.value * MIN_FRACTION
+
+    def expand(parent, children, stack):
+        if len(stack) >= MAX_DEPTH:
+            return
+        total = sum(value for _, value in children)
+        # The calls of recursive functions are counted more than once
+        scale = min(1.0, parent.value / total) if total else 0
+        for function, value in sorted(children, key=lambda item: -item[1]):
+            value *= scale
+            if value < minimum or function in stack:
+                continue
+            name, path, lineno = _function_name(function)
+            stack.add(function)
+            if _is_runner(path):
+                # Show what the runner called in its place
+                frame = parent
+                frame_children = [(callee, min(callee_value, value))
+                                  for callee, callee_value in
+                                  callees.get(function, [])]
+                saved, parent.value = parent.value, value
+                expand(frame, frame_children, stack)
+                parent.value = saved
+            else:
+                frame = parent.add(Frame(name, path, lineno, value))
+                expand(frame, callees.get(function, []), stack)
+            stack.discard(function)
+
+    expand(root, roots, set())
+    rows.sort(key=lambda row: row[-1], reverse=True)
+    return ProfileResult(CPROFILE, rows, root)
+
+
+def _line_name(path, lineno):
+    line = linecache.getline(path, lineno).strip()
+    return line or '{}:{}'.format(os.path.basename(path), lineno)
+
+
+def load_snapshot(path):
+    """Return the ProfileResult of the tracemalloc snapshot dumped to
+    path"""
+
+    snapshot = tracemalloc.Snapshot.load(path)
+    rows = [(_line_name(frame.filename, frame.lineno), frame.filename,
+             frame.lineno, statistic.size, statistic.count)
+            for statistic in snapshot.statistics('lineno')
+            for frame in statistic.traceback[-1:]]
+    root = Frame('all')
+    # {id(frame): {(path, lineno): child}}
+    children = {}
+    for statistic in snapshot.statistics('traceback'):
+        root.value += statistic.size
+        frame = root
+        # From the oldest frame
+        frames = [item for item in statistic.traceback
+                  if not _is_runner(item.filename)]
+        for item in frames[:MAX_DEPTH]:
+            key = (item.filename, item.lineno)
+            known = children.setdefault(id(frame), {})
+            child = known.get(key)
+            if child is None:
+                child = known[key] = frame.add(Frame(
+                    '{}:{}'.format(os.path.basename(item.filename),
+                                   item.lineno),
+                    item.filename, item.lineno))
+            child.value += statistic.size
+            frame = child
+    _prune(root, root.value * MIN_FRACTION)
+    return ProfileResult(TRACEMALLOC, rows, root)
+
+
+def _prune(frame, minimum):
+    frame.children = [child for child in frame.children
+                      if child.value >= minimum]
+    frame.children.sort(key=lambda child: child.value, reverse=True)
+    for child in frame.children:
+        _prune(child, minimum)
+
+
+def load(kind, path):
+    if kind == CPROFILE:
+        return load_profile(path)
+    return load_snapshot(path)
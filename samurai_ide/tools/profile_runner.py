@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Run a python program with cProfile or tracemalloc.
+
+Runs as a script in the interpreter of the program (it must not import
+samurai_ide):
+
+    python -u profile_runner.py cprofile OUTPUT script.py [args...]
+    python -u profile_runner.py tracemalloc OUTPUT -m module [args...]
+
+cprofile dumps the pstats of the program to OUTPUT, tracemalloc dumps a
+tracemalloc.Snapshot of the memory allocated by the program that is still
+alive when it ends.
+"""
+
+import os
+import sys
+import runpy
+import tracemalloc
+
+# Frames kept of the traceback of each memory block
+TRACEMALLOC_FRAMES = 32
+
+
+def _runner(target):
+    """Return a function running target as __main__"""
+
+    if target[0] == '-m':
+        module = target[1]
+        sys.argv = [module] + target[2:]
+        # Like python -m: the modules of the current folder first
+        sys.path[0] = os.getcwd()
+
+        def run():
+            runpy.run_module(module, run_name='__main__', alter_sys=True)
+        return run
+
+    # The IDE opens the files of the frames
+    path = os.path.abspath(target[0])
+    sys.argv = list(target)
+    sys.path[0] = os.path.dirname(path)
+    with open(path, 'rb') as source_file:
+        code = compile(source_file.read(), path, 'exec')
+    globs = {'__file__': path, '__name__': '__main__', '__package__': None,
+             '__cached__': None, '__builtins__': __builtins__}
+
+    def run():
+        exec(code, globs)
+    return run
+
+
+def _profile(run, output):
+    import cProfile
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(run)
+    finally:
+        profiler.dump_stats(output)
+
+
+def _trace_memory(run, output):
+    tracemalloc.start(TRACEMALLOC_FRAMES)
+    try:
+        run()
+    finally:
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, tracemalloc.__file__)))
+        snapshot.dump(output)
+
+
+def main(argv):
+    mode, output, target = argv[1], argv[2], argv[3:]
+    run = _runner(target)
+    if mode == 'cprofile':
+        _profile(run, output)
+    else:
+        _trace_memory(run, output)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+"""Persistent trigram index used to narrow Find in Files queries.
+
+Each project has its own SQLite database inside the knowledge folder. The
+index only answers which files *may* contain a match, the search engine
+still verifies every candidate.
+"""
+
+import os
+import sqlite3
+import hashlib
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:
+    import sre_parse  # lint:ok
+    import sre_constants  # lint:ok
+
+from samurai_ide import resources
+from samurai_ide.tools import file_search
+
+
+# Bigger files are not indexed, they are always a candidate
+MAX_FILE_SIZE = 1 << 20
+# Use at most this number of trigrams per literal in a query
+MAX_QUERY_TRIGRAMS = 12
+# Commit the index every this number of files
+BATCH_SIZE = 200
+
+
+def index_path(project_path):
+    """Return the path of the index database for a project"""
+
+    digest = hashlib.sha1(project_path.encode('utf-8')).hexdigest()
+    return os.path.join(resources.NINJA_KNOWLEDGE_PATH,
+                        'search-{}.db'.format(digest))
+
+
+def trigrams(text):
+    """Return the set of lowercase trigrams of text"""
+
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _literals(subpattern):
+    """Return the literal strings that every match of subpattern contains"""
+
+    literals = []
+    current = []
+    for op, av in subpattern:
+        if op is sre_constants.LITERAL:
+            current.append(chr(av))
+            continue
+        if current:
+            literals.append(''.join(current))
+            current = []
+        if op is sre_constants.SUBPATTERN:
+            literals.extend(_literals(av[-1]))
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            minimum, _, item = av
+            if minimum > 0:
+                literals.extend(_literals(item))
+    if current:
+        literals.append(''.join(current))
+    return literals
+
+
+def _alternatives(subpattern):
+    """Return a list of alternatives where each alternative is a list of
+    literals required by that branch"""
+
+    # A whole pattern like 'a|b', '(a|b)' or '\b(?:a|b)\b'
+    subpattern = [item for item in subpattern
+                  if item[0] is not sre_constants.AT]
+    if len(subpattern) == 1:
+        op, av = subpattern[0]
+        if op is sre_constants.BRANCH:
+            alternatives = []
+            for branch in av[1]:
+                alternatives.extend(_alternatives(branch))
+            return alternatives
+        if op is sre_constants.SUBPATTERN:
+            return _alternatives(av[-1])
+    return [_literals(subpattern)]
+
+
+def query_trigrams(pattern):
+    """Return a list of trigram sets, one per alternative of pattern.
+    A file is a candidate if it contains all the trigrams of at least one
+    of the sets. Return None if the pattern can't be narrowed."""
+
+    try:
+        parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return None
+    queries = []
+    for literals in _alternatives(list(parsed)):
+        query = set()
+        for literal in literals:
+            grams = sorted(trigrams(literal))
+            if len(grams) > MAX_QUERY_TRIGRAMS:
+                # Keep them spread over the literal
+                step = len(grams) / MAX_QUERY_TRIGRAMS
+                grams = [grams[int(i * step)]
+                         for i in range(MAX_QUERY_TRIGRAMS)]
+            query.update(grams)
+        if not query:
+            return None
+        queries.append(query)
+    return queries or None
+
+
+class TrigramIndex(object):
+    """Trigram index of the files of a project.
+
+    The index is not thread safe, it must be used from one thread at a
+    time (close may be called once that thread finished)."""
+
+    def __init__(self, root, filters=None, db_path=None):
+        self.root = root
+        self._match = file_search.compile_filters(filters)
+        self._db = sqlite3.connect(db_path or index_path(root),
+                                   check_same_thread=False)
+        self._db.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS files(
+                id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE,
+                dir TEXT,
+                mtime REAL,
+                size INTEGER,
+                indexed INTEGER);
+            CREATE INDEX IF NOT EXISTS files_dir ON files(dir);
+            CREATE TABLE IF NOT EXISTS trigrams(
+                trigram TEXT,
+                file_id INTEGER,
+                PRIMARY KEY(trigram, file_id)) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS trigrams_file ON trigrams(file_id);
+        """)
+
+    def close(self):
+        self._db.close()
+        self._db = None
+
+    def _stats(self, where='', args=()):
+        cur = self._db.execute(
+            "SELECT path, id, mtime, size FROM files " + where, args)
+        return {path: (file_id, mtime, size)
+                for path, file_id, mtime, size in cur}
+
+    def _remove(self, file_id):
+        self._db.execute("DELETE FROM trigrams WHERE file_id=?", (file_id,))
+        self._db.execute("DELETE FROM files WHERE id=?", (file_id,))
+
+    def _index(self, path, stat, old_id=None):
+        if old_id is not None:
+            self._remove(old_id)
+        indexed = stat.st_size <= MAX_FILE_SIZE
+        grams = ()
+        if indexed:
+            try:
+                with open(path, 'rb') as fileobj:
+                    content = fileobj.read()
+            except OSError:
+                return
+            grams = trigrams(content.decode('utf-8', errors='replace'))
+        cur = self._db.execute(
+            "INSERT INTO files(path, dir, mtime, size, indexed) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (path, os.path.dirname(path), stat.st_mtime, stat.st_size,
+             int(indexed)))
+        file_id = cur.lastrowid
+        self._db.executemany(
+            "INSERT INTO trigrams(trigram, file_id) VALUES (?, ?)",
+            ((gram, file_id) for gram in grams))
+
+    def _sync(self, found, known):
+        """Index the new and modified files in found and remove the
+        entries of known that don't exist anymore"""
+
+        changed = 0
+        for path, stat in found.items():
+            entry = known.pop(path, None)
+            if entry is not None and \
+                    (entry[1], entry[2]) == (stat.st_mtime, stat.st_size):
+                continue
+            self._index(path, stat, entry and entry[0])
+            changed += 1
+            if changed % BATCH_SIZE == 0:
+                self._db.commit()
+        for file_id, _, _ in known.values():
+            self._remove(file_id)
+            changed += 1
+        self._db.commit()
+        return changed
+
+    def _scan(self, folder, recursive, cancel_event=None):
+        """Return ({path: stat}, [folders]) for the files under folder"""
+
+        found = {}
+        folders = []
+        pending = [folder]
+        while pending:
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            current = pending.pop()
+            try:
+                entries = os.scandir(current)
+            except OSError:
+                continue
+            folders.append(current)
+            with entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                pending.append(entry.path)
+                        elif entry.is_file() and self._match(entry.name):
+                            found[entry.path] = entry.stat()
+                    except OSError:
+                        continue
+        return found, folders
+
+    def refresh(self, cancel_event=None):
+        """Bring the whole index up to date, only the files whose mtime or
+        size changed are read. Return the list of scanned folders."""
+
+        found, folders = self._scan(self.root, True, cancel_event)
+        if cancel_event is not None and cancel_event.is_set():
+            return folders
+        self._sync(found, self._stats())
+        return folders
+
+    def update_directory(self, folder):
+        """Update the index for the subtree of folder after its entries
+        changed. Return the list of scanned folders."""
+
+        found, folders = self._scan(folder, True)
+        prefix = os.path.join(folder, '')
+        known = self._stats("WHERE dir=? OR substr(path, 1, ?)=?",
+                            (folder, len(prefix), prefix))
+        self._sync(found, known)
+        return folders
+
+    def update_file(self, path):
+        """Update the index for a single file (saved, created or removed)"""
+
+        known = self._stats("WHERE path=?", (path,))
+        found = {}
+        if self._match(os.path.basename(path)):
+            try:
+                found[path] = os.stat(path)
+            except OSError:
+                pass
+        return self._sync(found, known)
+
+    def files(self):
+        """Return all the indexed paths"""
+
+        return [path for path, in self._db.execute("SELECT path FROM files")]
+
+    def update_changed_files(self):
+        """Update the index for the indexed files whose mtime or size
+        changed, e.g. rewritten in place by another program (that doesn't
+        change their folder). Only stats the files, it's slow on big trees.
+        Return the number of files updated."""
+
+        known = self._stats()
+        found = {}
+        for path in known:
+            try:
+                found[path] = os.stat(path)
+            except OSError:
+                continue
+        return self._sync(found, known)
+
+    def candidates(self, pattern):
+        """Return the paths that may contain a match of pattern, or None if
+        the index can't narrow the query"""
+
+        queries = query_trigrams(pattern)
+        if queries is None:
+            return None
+        paths = set(path for path, in self._db.execute(
+            "SELECT path FROM files WHERE indexed=0"))
+        for query in queries:
+            select = " INTERSECT ".join(
+                ["SELECT file_id FROM trigrams WHERE trigram=?"] * len(query))
+            cur = self._db.execute(
+                "SELECT path FROM files WHERE id IN ({})".format(select),
+                tuple(query))
+            paths.update(path for path, in cur)
+        return sorted(paths)
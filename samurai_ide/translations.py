@@ -54,6 +54,8 @@ TR_SAVE_PROJECT = tr("Samurai-IDE", "Save Project")
 TR_FIND_IN_FILES = tr("Samurai-IDE", "Find in Files")
 TR_RUN_FILE = tr("Samurai-IDE", "Run File")
 TR_RUN_PROJECT = tr("Samurai-IDE", "Run Project")
+TR_LINT_PROJECT = tr("Samurai-IDE", "Lint Project")
+TR_RUN_TARGETS = tr("Samurai-IDE", "Run Targets")
 TR_STOP = tr("Samurai-IDE", "Stop")
 TR_EDITOR_SCHEMES = tr("Samurai-IDE", "Editor Schemes")
 TR_LANGUAGE_MANAGER = tr("Samurai-IDE", "Language Manager")
@@ -171,6 +173,11 @@ TR_PROJECT_PARAMS_TOOLTIP = tr(
     "Samurai-IDE",
     "Separate the params with commas (ie: help, verbose)")
 TR_PROJECT_PARAMS = tr("Samurai-IDE", "Params (comma separated):")
+TR_PROJECT_RUN_TARGETS = tr("Samurai-IDE", "Run Targets (one per line):")
+TR_PROJECT_RUN_TARGETS_TOOLTIP = tr(
+    "Samurai-IDE",
+    "The python arguments of each target (ie: main.py, -m pytest tests), "
+    "they are run at the same time from the project folder")
 TR_PROJECT_VIRTUALENV = tr("Samurai-IDE", "Virtualenv Folder:")
 TR_PROJECT_SELECT_PYTHON_PATH = tr("Samurai-IDE", "Select Python Path")
 TR_PROJECT_SELECT_VIRTUALENV = tr("Samurai-IDE", "Select Virtualenv Folder")
@@ -346,6 +353,12 @@ TR_DIRECTORY = tr("Samurai-IDE", "Directory:")
 TR_FILTER = tr("Samurai-IDE", "Filter:")
 TR_TEXT = tr("Samurai-IDE", "Text:")
 TR_CLEAR = tr("Samurai-IDE", "Clear")
+TR_INTERRUPT = tr("Samurai-IDE", "Interrupt")
+TR_RESTART_CONSOLE = tr("Samurai-IDE", "Restart")
+TR_CONSOLE_RESTARTED = tr("Samurai-IDE", "Console restarted")
+TR_CONSOLE_EXITED = tr(
+    "Samurai-IDE",
+    "The console process exited, the next command starts a new one")
 TR_REPLACE_RESULTS_WITH = tr("Samurai-IDE", "Replace Results With:")
 TR_ARE_YOU_SURE_WANT_TO_REPLACE = tr(
     "Samurai-IDE",
@@ -363,7 +376,36 @@ TR_PROCESS_EXITED_NORMALLY = tr(
     "Samurai-IDE",
     "The process exited normally with code %d")
 TR_PROCESS_INTERRUPTED = tr("Samurai-IDE", "Execution Interrupted!")
+TR_PROCESS_STATS = tr(
+    "Samurai-IDE",
+    "CPU: {:.0f}%  CPU time: {:.1f} s\nMemory: {}  Peak: {}")
+TR_EXIT_CODE = tr("Samurai-IDE", "exit {}")
+TR_INTERRUPTED = tr("Samurai-IDE", "interrupted")
+TR_RUN_SUMMARY = tr("Samurai-IDE", "Summary")
+TR_TARGET = tr("Samurai-IDE", "Target")
+TR_EXIT_STATUS = tr("Samurai-IDE", "Exit")
+TR_WALL_TIME = tr("Samurai-IDE", "Wall Time")
+TR_CPU_TIME = tr("Samurai-IDE", "CPU Time")
+TR_PEAK_MEMORY = tr("Samurai-IDE", "Peak Memory")
 TR_CLOSE_TAB = tr("Samurai-IDE", "Close Tab")
+TR_PROFILER = tr("Samurai-IDE", "Profiler")
+TR_RUN_WITH_PROFILER = tr("Samurai-IDE", "Run File with Profiler")
+TR_RUN_WITH_MEMORY_PROFILER = tr("Samurai-IDE",
+                                 "Run File with Memory Profiler")
+TR_PROFILE_LOADING = tr("Samurai-IDE", "Reading the profile...")
+TR_PROFILE_FAILED = tr("Samurai-IDE", "The profile couldn't be read: {}")
+TR_PROFILE_TOTAL_TIME = tr("Samurai-IDE", "Total time: {}")
+TR_PROFILE_TOTAL_MEMORY = tr("Samurai-IDE",
+                             "Memory allocated at the end: {}")
+TR_PROFILE_GRAPH_TOOLTIP = tr(
+    "Samurai-IDE",
+    "Click a frame to open its line, double click to zoom in or out")
+TR_FUNCTION = tr("Samurai-IDE", "Function")
+TR_CALLS = tr("Samurai-IDE", "Calls")
+TR_OWN_TIME = tr("Samurai-IDE", "Own Time")
+TR_CUMULATIVE_TIME = tr("Samurai-IDE", "Cumulative Time")
+TR_SIZE = tr("Samurai-IDE", "Size")
+TR_BLOCKS = tr("Samurai-IDE", "Blocks")
 TR_CLOSE_ALL_TABS = tr("Samurai-IDE", "Close All Tabs")
 TR_CLOSE_OTHER_TABS = tr("Samurai-IDE", "Close Other Tabs")
 TR_CLICK_TO_SHOW_SOURCE = tr("Samurai-IDE", "Click to show the source")
@@ -864,6 +906,9 @@ TR_SELECT_EXEC_OPTION_3 = tr(
     "Samurai-IDE",
     "-3: warn about Python 3.x incompatibilities "
     "that 2to3 cannot trivially fix")
+TR_OUTPUT_TO_FILE = tr("Samurai-IDE",
+                       "Save the output of the programs to a file "
+                       "(for very long outputs)")
 
 
 # 2to3
@@ -902,5 +947,11 @@ TR_REMOVE_ALL_BOOKMARKS_QUESTION = tr(
 
 # Find in files
 TR_MATCHES_FOUND = tr("Samurai-IDE", "{} matches found.")
+TR_SEARCH_PROGRESS = tr(
+    "Samurai-IDE",
+    "{} matches found. {} files ({:.0f} files/s, {:.1f} MiB/s, {} workers)")
+TR_SEARCH_CANCELLED = tr("Samurai-IDE", "Search cancelled.")
+TR_SEARCH_INVALID_REGEX = tr("Samurai-IDE", "Invalid regular expression: {}")
+TR_CANCEL_SEARCH = tr("Samurai-IDE", "Cancel Search")
 
 TR_NO_PROJECTS = tr("Samurai-IDE", "No Projects")
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from samurai_ide.core import settings
+from samurai_ide.gui.editor.checkers import pep8_checker
+from samurai_ide.gui.editor.checkers.scheduler import Snapshot
+
+
+SOURCE = '''import os
+
+
+class Foo(object):
+
+    def first(self):
+        return 1
+
+    def second(self):
+        return 2
+
+    def third(self):
+        return 3
+
+
+def bar():
+    return os.sep
+'''
+
+
+@pytest.fixture(autouse=True)
+def python_syntax(monkeypatch):
+    monkeypatch.setattr(settings, 'SYNTAX',
+                        {'python': {'extension': ['py']}})
+
+
+def full_check(text):
+    return pep8_checker.Pep8Checker(None).check(Snapshot('file.py', text))
+
+
+def test_style_guide_shared():
+    assert pep8_checker.style_guide() is pep8_checker.style_guide()
+    assert pep8_checker.style_guide() is not \
+        pep8_checker.style_guide(max_line_length=100)
+
+
+def test_changed_lines():
+    old = ['a', 'b', 'c', 'd']
+    assert pep8_checker.changed_lines(old, old) == (4, 4, 4)
+    assert pep8_checker.changed_lines(old, ['a', 'x', 'y', 'c', 'd']) == \
+        (1, 2, 3)
+    assert pep8_checker.changed_lines(old, ['a', 'd']) == (1, 3, 1)
+
+
+@pytest.mark.parametrize(
+    'old, new',
+    [
+        ('        return 2\n', '        return  2\n'),
+        ('    def second(self):\n', '\n\n    def second(self):\n'),
+        ('def bar():\n', 'def bar( ):\n'),
+        ('    return os.sep\n', '    return os.sep\nx=1\n\n\n'),
+        ('import os\n', 'import os\nx = 1\nimport sys\n'),
+        ('class Foo(object):\n', 'class Foo(object):\n    x=1\n'),
+    ]
+)
+def test_incremental_check_like_full_check(old, new):
+    checker = pep8_checker.Pep8Checker(None)
+    checker.check(Snapshot('file.py', SOURCE))
+    text = SOURCE.replace(old, new, 1)
+    checks = checker.check(Snapshot('file.py', text, full=False))
+    assert dict(checks) == dict(full_check(text))
+
+
+def test_only_changed_statements_checked(monkeypatch):
+    checker = pep8_checker.Pep8Checker(None)
+    checker.check(Snapshot('file.py', SOURCE))
+    checked = []
+    check_lines = checker._check_lines
+
+    def _check_lines(path, lines, first=0, end=None, header=(0, 0)):
+        checked.append((header, first, end))
+        return check_lines(path, lines, first, end, header)
+
+    monkeypatch.setattr(checker, '_check_lines', _check_lines)
+    text = SOURCE.replace('return 1', 'return  1')
+    checks = checker.check(Snapshot('file.py', text, full=False))
+    # The class statement, then from first() to third()
+    assert checked == [((3, 5), 5, 11)]
+    assert [message for _, message, _ in checks[6]] == \
+        ['[PEP8]: multiple spaces after keyword']
+    checker.check(Snapshot('file.py', text))
+    assert checked[1:] == [((0, 0), 0, None)]
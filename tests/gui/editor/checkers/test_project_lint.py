@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from samurai_ide.core import settings
+from samurai_ide.gui.editor.checkers import project_lint
+from samurai_ide.tools import lint
+
+
+@pytest.fixture
+def linter(monkeypatch):
+    monkeypatch.setattr(settings, 'SYNTAX',
+                        {'python': {'extension': ['py']}})
+    submitted = []
+
+    def create_executor(workers=0):
+        executor = ThreadPoolExecutor(1)
+        submit = executor.submit
+
+        def _submit(function, sources):
+            submitted.extend(path for path, _ in sources)
+            return submit(function, sources)
+        executor.submit = _submit
+        return executor
+
+    monkeypatch.setattr(project_lint.indexer, 'create_executor',
+                        create_executor)
+    linter = project_lint.ProjectLinter()
+    linter.submitted = submitted
+    results = []
+    linter.lintFinished.connect(results.append)
+    linter.results = results
+    lint.cache.clear()
+    return linter
+
+
+def test_lint_project(linter, tmpdir):
+    tmpdir.join('module.py').write('import os\n')
+    tmpdir.join('clean.py').write('x = 1\n')
+    tmpdir.join('notes.txt').write('import os\n')
+    linter._path = str(tmpdir)
+    linter.run()
+    module = str(tmpdir.join('module.py'))
+    assert linter.results == [
+        {module: [(0, 0, "'os' imported but unused", 'import os')]}]
+    assert sorted(linter.submitted) == [str(tmpdir.join('clean.py')), module]
+
+
+def test_unchanged_files_not_linted_again(linter, tmpdir):
+    tmpdir.join('module.py').write('import os\n')
+    linter._path = str(tmpdir)
+    linter.run()
+    linter.run()
+    assert len(linter.submitted) == 1
+    # Same content as a file already linted
+    tmpdir.join('copy.py').write('import os\n')
+    tmpdir.join('module.py').write('import sys\n')
+    linter.run()
+    assert linter.submitted[1:] == [str(tmpdir.join('module.py'))]
+    assert len(linter.results[-1]) == 2
+
+
+def test_unchanged_files_not_linted_after_cache_eviction(linter, tmpdir):
+    tmpdir.join('module.py').write('import os\n')
+    linter._path = str(tmpdir)
+    linter.run()
+    # More files than lint.CACHE_SIZE evict everything between runs
+    lint.cache.clear()
+    linter.run()
+    assert len(linter.submitted) == 1
+    assert linter.results[0] == linter.results[1]
+    tmpdir.join('module.py').remove()
+    linter.run()
+    assert linter.results[-1] == {}
+    assert linter._signatures == {}
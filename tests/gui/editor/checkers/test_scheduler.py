@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from samurai_ide.core import settings
+from samurai_ide.gui.editor import helpers
+from samurai_ide.gui.editor.checkers import scheduler
+from samurai_ide.gui.editor.checkers.errors_checker import ErrorsChecker
+
+
+class FakeNEditable(object):
+    editor = None
+    file_path = 'file.py'
+    registered_checkers = []
+
+
+class FakeChecker(scheduler.BaseChecker):
+
+    def check(self, snapshot):
+        return {0: [((0, 1), 'message', snapshot.line_text(0))]}
+
+
+@pytest.fixture
+def python_syntax(monkeypatch):
+    monkeypatch.setattr(settings, 'SYNTAX',
+                        {'python': {'extension': ['py']}})
+
+
+def test_snapshot_like_editor():
+    snapshot = scheduler.Snapshot('file.py', 'def foo():\n    return 1\n')
+    assert snapshot.line_text(1) == '    return 1'
+    assert snapshot.line_text(5) == ''
+    assert snapshot.line_indent(1) == 4
+    assert helpers.get_range(snapshot, 0, 4) == (4, 10)
+    assert helpers.get_range(snapshot, 1) == (4, 12)
+
+
+@pytest.mark.parametrize(
+    'line, col, expected',
+    [
+        (0, 0, (0, 3)),
+        (0, 4, (4, 10)),
+        (0, 10, (10, 12)),
+        (0, 13, (13, 13)),
+        (0, 20, (20, 20)),
+        (1, 1, (1, 3)),
+        (2, 2, (2, 2)),
+    ]
+)
+def test_get_range_columns(line, col, expected):
+    snapshot = scheduler.Snapshot('file.py', 'def foo(): x\n   \n  ')
+    assert helpers.get_range(snapshot, line, col) == expected
+
+
+def test_latency_report():
+    scheduler.record_latency('TestChecker', 0.1)
+    scheduler.record_latency('TestChecker', 0.3)
+    report = dict((item[0], item[1:])
+                  for item in scheduler.latency_report())
+    runs, mean, maximum, last = report['TestChecker']
+    assert runs == 2
+    assert mean == pytest.approx(0.2)
+    assert maximum == pytest.approx(0.3)
+    assert last == pytest.approx(0.3)
+
+
+def test_stale_results_dropped():
+    checker_scheduler = scheduler.CheckerScheduler(FakeNEditable())
+    checker = FakeChecker(None)
+    snapshot = scheduler.Snapshot('file.py', 'import os')
+    generation = checker_scheduler._generation
+    checks = checker.check(snapshot)
+    checker_scheduler.cancel()
+    assert snapshot.cancelled() is False
+    checker_scheduler._on_check_done(generation, checker, checks)
+    assert checker.checks == {}
+    checker_scheduler._pending = 1
+    checker_scheduler._on_check_done(
+        checker_scheduler._generation, checker, checks)
+    assert checker.checks[0][0][1] == 'message'
+
+
+def test_cancelled_snapshot_not_checked():
+    checker_scheduler = scheduler.CheckerScheduler(FakeNEditable())
+    results = []
+    checker_scheduler._checkDone.connect(
+        lambda generation, checker, checks: results.append(checks))
+    snapshot = scheduler.Snapshot('file.py', 'import os')
+    snapshot.cancel()
+    checker_scheduler._check(0, FakeChecker(None), snapshot)
+    assert results == [None]
+
+
+def test_errors_checker_uses_snapshot(python_syntax):
+    checker = ErrorsChecker(None)
+    snapshot = scheduler.Snapshot('file.py', 'import os\n')
+    checks = checker.check(snapshot)
+    assert list(checks.keys()) == [0]
+    range_, message, line = checks[0][0]
+    assert 'os' in message
+    assert line == 'import os'
+
+
+def test_errors_checker_syntax_error(python_syntax):
+    checker = ErrorsChecker(None)
+    snapshot = scheduler.Snapshot('file.py', 'x = 1\ndef (:\n')
+    checks = checker.check(snapshot)
+    assert list(checks.keys()) == [1]
+    assert checks[1][0][1].startswith('[Error]:')
+
+
+def test_not_python_file_not_checked(python_syntax):
+    checker = ErrorsChecker(None)
+    snapshot = scheduler.Snapshot('file.txt', 'def (:\n')
+    assert checker.check(snapshot) == {}
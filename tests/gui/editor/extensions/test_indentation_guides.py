@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtGui import QTextCursor
+from PyQt5.QtWidgets import QPlainTextEdit
+
+from samurai_ide.gui.editor.extensions import indentation_guides
+
+
+class FakeEditor(QPlainTextEdit):
+    painted = pyqtSignal('PyQt_PyObject')
+    indentation_width = 4
+
+
+@pytest.fixture
+def guides():
+    editor = FakeEditor()
+    editor.setPlainText('def foo():\n    if x:\n        pass\n\n')
+    guide = indentation_guides.IndentationGuide()
+    guide.initialize(editor)
+    return guide
+
+
+def computed(guide):
+    editor = guide._neditor
+    block = editor.document().firstBlock()
+    while block.isValid():
+        guide._indentation(block.blockNumber(), block)
+        block = block.next()
+    return guide._indents
+
+
+def test_block_indentation():
+    assert indentation_guides.block_indentation('    pass') == 4
+    assert indentation_guides.block_indentation('pass') == 0
+    assert indentation_guides.block_indentation('') == -1
+    assert indentation_guides.block_indentation('  ') == -3
+
+
+def test_indentation_cached(guides):
+    assert computed(guides) == [0, 4, 8, -1, -1]
+
+
+def test_edit_invalidates_changed_blocks(guides):
+    computed(guides)
+    cursor = guides._neditor.textCursor()
+    cursor.setPosition(guides._neditor.document().findBlockByNumber(2)
+                       .position())
+    cursor.insertText('  ')
+    assert guides._indents == [0, 4, 10, -1, -1]
+    cursor.insertText('\n    x = 1')
+    assert guides._indents[:2] == [0, 4]
+    assert len(guides._indents) == 6
+    assert computed(guides) == [0, 4, -3, 4, -1, -1]
+
+
+def test_remove_blocks(guides):
+    computed(guides)
+    cursor = guides._neditor.textCursor()
+    cursor.setPosition(0)
+    cursor.movePosition(QTextCursor.Down, QTextCursor.KeepAnchor, 2)
+    cursor.removeSelectedText()
+    assert computed(guides) == [8, -1, -1]
+    guides._neditor.setPlainText('x')
+    assert computed(guides) == [0]
+
+
+def test_guide_offsets_cached(guides):
+    offsets = guides._guide_offsets(2)
+    assert len(offsets) == 2
+    assert offsets[0] < offsets[1]
+    assert guides._guide_offsets(1) is offsets
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from PyQt5.QtWidgets import QPlainTextEdit
+
+from samurai_ide.gui.editor import highlighter
+from samurai_ide.gui.editor.extensions import symbol_highlighter
+
+
+class FakeSelections(object):
+
+    def __init__(self):
+        self.selections = []
+
+    def add(self, kind, selections):
+        self.selections = [(selection.cursor.blockNumber(),
+                            selection.cursor.selectionStart() -
+                            selection.cursor.block().position())
+                           for selection in selections]
+
+    def remove(self, kind):
+        self.selections = []
+
+
+class FakeEditor(QPlainTextEdit):
+
+    def __init__(self):
+        super().__init__()
+        self.extra_selections = FakeSelections()
+
+
+TEXT = '''def foo(a, b):
+    x = ["(", {'a': (1, 2)},  # ]
+         3]
+    return (a +
+            b)
+'''
+
+
+@pytest.fixture
+def editor():
+    editor = FakeEditor()
+    editor.setPlainText(TEXT)
+    partitions = [{"name": "comment", "start": "#", "end": "\n"},
+                  {"name": "string", "start": "[\"']", "end": "[\"']"}]
+    hl = highlighter.IncrementalHighlighter(
+        editor, highlighter.PartitionScanner(partitions), {}, [])
+    while not hl.done:
+        hl._highlight_slice()
+    # The editor keeps its extensions
+    editor.matcher = symbol_highlighter.SymbolHighlighter()
+    editor.matcher.initialize(editor)
+    return editor
+
+
+def _move(editor, line, column):
+    cursor = editor.textCursor()
+    cursor.setPosition(
+        editor.document().findBlockByNumber(line).position() + column)
+    editor.setTextCursor(cursor)
+    return editor.extra_selections.selections
+
+
+def test_block_brackets_skip_strings_and_comments(editor):
+    brackets = highlighter.block_brackets(
+        editor.document().findBlockByNumber(1))
+    assert [bracket for _, bracket in brackets.positions] == list('[{()}')
+    assert brackets.depths == {'[': (1, 0, -1)}
+
+
+@pytest.mark.parametrize(
+    'position, expected',
+    [
+        ((0, 7), [(0, 7), (0, 12)]),
+        ((0, 13), [(0, 12), (0, 7)]),
+        ((1, 8), [(1, 8), (2, 10)]),
+        ((2, 10), [(2, 10), (1, 8)]),
+        ((3, 11), [(3, 11), (4, 13)]),
+        ((4, 14), [(4, 13), (3, 11)]),
+    ]
+)
+def test_matching_bracket(editor, position, expected):
+    assert _move(editor, *position) == expected
+
+
+def test_bracket_in_string_not_matched(editor):
+    assert _move(editor, 1, 11) == []
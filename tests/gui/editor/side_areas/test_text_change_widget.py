@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from PyQt5.QtCore import QObject
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtGui import QTextCursor
+from PyQt5.QtWidgets import QPlainTextEdit
+
+from samurai_ide.gui.editor.side_area import text_change_widget
+from samurai_ide.gui.editor.side_area.text_change_widget import (
+    UNCHANGED,
+    UNSAVED,
+    SAVED
+)
+
+
+class FakeNEditable(QObject):
+    fileSaved = pyqtSignal('PyQt_PyObject')
+
+
+class FakeEditor(QPlainTextEdit):
+
+    def __init__(self):
+        super().__init__()
+        self.neditable = FakeNEditable()
+
+
+@pytest.fixture
+def editor():
+    neditor = FakeEditor()
+    neditor.setPlainText("\n".join(["line {}".format(i) for i in range(6)]))
+    neditor.document().setModified(False)
+    widget = text_change_widget.TextChangeWidget()
+    widget.register(neditor)
+    neditor.widget = widget
+    return neditor
+
+
+def states(editor):
+    return [editor.widget.line_state(i)
+            for i in range(editor.document().blockCount())]
+
+
+def insert(editor, line, text):
+    cursor = QTextCursor(editor.document().findBlockByNumber(line))
+    cursor.insertText(text)
+
+
+def test_insert_lines(editor):
+    insert(editor, 2, "new\nlines\n")
+    assert states(editor) == [UNCHANGED, UNCHANGED, UNSAVED, UNSAVED,
+                              UNCHANGED, UNCHANGED, UNCHANGED, UNCHANGED]
+
+
+def test_split_line(editor):
+    cursor = QTextCursor(editor.document().findBlockByNumber(2))
+    cursor.movePosition(QTextCursor.Right, n=2)
+    cursor.insertText("new\n")
+    assert states(editor) == [UNCHANGED, UNCHANGED, UNSAVED, UNSAVED,
+                              UNCHANGED, UNCHANGED, UNCHANGED]
+
+
+def test_remove_lines(editor):
+    cursor = QTextCursor(editor.document().findBlockByNumber(1))
+    cursor.movePosition(QTextCursor.Down, QTextCursor.KeepAnchor, 2)
+    cursor.removeSelectedText()
+    assert states(editor) == [UNCHANGED, UNSAVED, UNCHANGED, UNCHANGED]
+
+
+def test_save_and_undo(editor):
+    insert(editor, 0, "x")
+    editor.document().setModified(False)
+    editor.neditable.fileSaved.emit(editor.neditable)
+    insert(editor, 4, "y")
+    assert states(editor) == [SAVED, UNCHANGED, UNCHANGED, UNCHANGED,
+                              UNSAVED, UNCHANGED]
+    editor.document().undo()
+    assert states(editor) == [SAVED] + [UNCHANGED] * 5
+
+
+def test_reload_resets_states(editor):
+    insert(editor, 0, "x")
+    editor.setPlainText("other\ntext")
+    assert states(editor) == [UNCHANGED, UNCHANGED]
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from PyQt5.QtWidgets import QPlainTextEdit
+from PyQt5.QtGui import QTextCursor
+
+from samurai_ide.gui.editor import highlighter
+
+
+PARTITIONS = [
+    {"name": "comment", "start": "#", "end": "\n"},
+    {"name": "string", "start": '"""', "end": '"""', "is_multiline": True},
+]
+TOKENS = [
+    {"name": "keyword", "pattern": ["def", "return"],
+     "prefix": "(^|[\\x08\\W])", "suffix": "[\\x08\\W]"},
+    {"name": "builtin", "pattern": ["len", "def"],
+     "prefix": "(?x)\\b", "suffix": "\\b"},
+    {"name": "number", "pattern": "(?<!\\w)\\d+"},
+    {"name": "decorator", "pattern": "@\\w+"},
+    {"name": "magic", "pattern": "(?x)\\b(__(?:init | len)__)\\b"},
+]
+FORMATS = [(name, {"color": color}) for name, color in (
+    ("comment", "#000001"), ("string", "#000002"), ("keyword", "#000003"),
+    ("builtin", "#000004"), ("number", "#000005"))]
+
+
+@pytest.fixture
+def scanner():
+    return highlighter.Scanner(TOKENS)
+
+
+def test_scanner_words_table(scanner):
+    assert scanner.words == {"def": "keyword", "return": "keyword",
+                             "len": "builtin"}
+
+
+@pytest.mark.parametrize(
+    'text, expected',
+    [
+        ('def f(x): return len(x) + 10\n',
+         [('keyword', 0, 3), ('keyword', 10, 16), ('builtin', 17, 20),
+          ('number', 26, 28)]),
+        ('@len\n', [('decorator', 0, 4)]),
+        ('undef x.len __len__\n',
+         [('builtin', 8, 11), ('magic', 12, 19)]),
+    ]
+)
+def test_scanner_scan(scanner, text, expected):
+    assert list(scanner.scan(text)) == expected
+
+
+def test_scanner_scan_range(scanner):
+    text = 'return 1 # len 2'
+    assert list(scanner.scan(text, 8, 16)) == [('builtin', 11, 14),
+                                               ('number', 15, 16)]
+
+
+def _formats(block):
+    return [(r.start, r.length, r.format.foreground().color().name())
+            for r in block.layout().formats()]
+
+
+@pytest.fixture
+def editor():
+    editor = QPlainTextEdit()
+    editor.resize(400, 300)
+    lines = ['def f%d(): return %d' % (i, i) for i in range(3000)]
+    editor.setPlainText('\n'.join(lines))
+    return editor
+
+
+def _highlighter(editor):
+    return highlighter.IncrementalHighlighter(
+        editor, highlighter.PartitionScanner(PARTITIONS),
+        {None: highlighter.Scanner(TOKENS)}, FORMATS)
+
+
+def _finish(highlighter):
+    while not highlighter.done:
+        highlighter._highlight_slice()
+
+
+def test_incremental_viewport_first(editor, monkeypatch):
+    monkeypatch.setattr(highlighter, 'SLICE_TIME', 0)
+    hl = _highlighter(editor)
+    assert not hl.done
+    document = editor.document()
+    assert _formats(document.firstBlock()) == [
+        (0, 3, '#000003'), (10, 6, '#000003'), (17, 1, '#000005')]
+    assert _formats(document.lastBlock()) == []
+    _finish(hl)
+    assert _formats(document.lastBlock()) == [
+        (0, 3, '#000003'), (13, 6, '#000003'), (20, 4, '#000005')]
+
+
+def test_incremental_edit_updates_next_blocks(editor, monkeypatch):
+    monkeypatch.setattr(highlighter, 'SLICE_TIME', 0)
+    hl = _highlighter(editor)
+    _finish(hl)
+    document = editor.document()
+    cursor = QTextCursor(document.findBlockByNumber(10))
+    cursor.insertText('"""')
+    _finish(hl)
+    block = document.findBlockByNumber(20)
+    assert block.userState() == 1
+    assert _formats(block) == [(0, 20, '#000002')]
+    cursor.deletePreviousChar()
+    _finish(hl)
+    assert block.userState() == -1
+    assert _formats(block)[0] == (0, 3, '#000003')
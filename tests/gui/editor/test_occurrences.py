@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from PyQt5.QtWidgets import QPlainTextEdit
+from PyQt5.QtGui import QTextCursor
+
+from samurai_ide.gui.editor import occurrences
+
+
+@pytest.fixture
+def editor():
+    editor = QPlainTextEdit()
+    editor.resize(400, 200)
+    editor.setPlainText('\n'.join(
+        'foo = Foo(food) + foo_%d' % i for i in range(2000)))
+    return editor
+
+
+def _finish(search):
+    while not search.done:
+        search._search_chunk()
+
+
+def test_visible_range_searched_first(editor, monkeypatch):
+    monkeypatch.setattr(occurrences, 'CHUNK_SIZE', 100)
+    search = occurrences.OccurrenceSearch(editor)
+    search.search('foo', whole_word=True)
+    start, end = search.visible_range()
+    assert end < len(editor.toPlainText())
+    visible = search.matches(start, end)
+    assert visible[:2] == [(0, 3), (6, 9)]
+    assert len(search) == len(visible)
+    _finish(search)
+    assert len(search) == 4000
+    assert search.matches(start, end) == visible
+
+
+def test_search_case_sensitive(editor):
+    search = occurrences.OccurrenceSearch(editor)
+    search.search('Foo', case_sensitive=True)
+    _finish(search)
+    assert len(search) == 2000
+    assert search.matches(0, 30) == [(6, 9)]
+
+
+def test_index(editor):
+    search = occurrences.OccurrenceSearch(editor)
+    search.search('foo')
+    _finish(search)
+    assert search.index(0) == 0
+    assert search.index(3) == 1
+    assert search.index(10) == 2
+    assert search.index(len(editor.toPlainText())) == 8000
+
+
+def test_growing_query_reuses_matches(editor, monkeypatch):
+    search = occurrences.OccurrenceSearch(editor)
+    search.search('fo')
+    _finish(search)
+    monkeypatch.setattr(
+        search, '_search_chunk',
+        lambda: pytest.fail('the document was searched again'))
+    search.search('FOOD')
+    assert len(search) == 2000
+    assert search.matches(0, 30) == [(10, 14)]
+
+
+def test_document_change_drops_results(editor):
+    search = occurrences.OccurrenceSearch(editor)
+    search.search('fo')
+    _finish(search)
+    QTextCursor(editor.document()).insertText('food ')
+    search.search('foo')
+    _finish(search)
+    assert search.matches(0, 10) == [(0, 3), (5, 8)]
+
+
+def test_growing_self_overlapping_query():
+    editor = QPlainTextEdit()
+    editor.setPlainText('x = a___b + c')
+    search = occurrences.OccurrenceSearch(editor)
+    search.search('__')
+    _finish(search)
+    assert search.matches() == [(5, 7)]
+    search.search('__b')
+    _finish(search)
+    assert search.matches() == [(6, 9)]
+
+
+def test_growing_query_matches_dont_overlap():
+    editor = QPlainTextEdit()
+    editor.setPlainText('aaaaa')
+    search = occurrences.OccurrenceSearch(editor)
+    search.search('a')
+    _finish(search)
+    search.search('aa')
+    assert search.matches() == [(0, 2), (2, 4)]
+
+
+def test_chunk_boundary(monkeypatch):
+    monkeypatch.setattr(occurrences, 'CHUNK_SIZE', 10)
+    editor = QPlainTextEdit()
+    editor.setPlainText('12345678 foo foobar foo')
+    search = occurrences.OccurrenceSearch(editor)
+    # Not visible, found by the chunks
+    search._search_visible = lambda: None
+    search.search('foo', whole_word=True)
+    _finish(search)
+    assert search.matches() == [(9, 12), (20, 23)]
+
+
+def test_edit_drops_stale_matches(editor):
+    search = occurrences.OccurrenceSearch(editor)
+    updates = []
+    search.updated.connect(lambda: updates.append(len(search)))
+    search.search('foo', whole_word=True)
+    assert search.matches(0, 10) == [(0, 3), (6, 9)]
+    QTextCursor(editor.document()).insertText('x = 1\n')
+    # The old offsets don't describe the new text
+    assert search.matches(0, 10) == []
+    assert updates[-1] == 0
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from PyQt5.QtWidgets import QPlainTextEdit
+
+from samurai_ide.gui.editor import scrollbar
+
+
+@pytest.fixture
+def nscrollbar():
+    editor = QPlainTextEdit()
+    bar = scrollbar.NScrollBar(editor)
+    bar.setRange(0, 9900)
+    bar.setPageStep(100)
+    bar.resize(15, 200)
+    # Keep the parent alive
+    bar.editor = editor
+    return bar
+
+
+def test_markers_binned_by_pixel_row(nscrollbar):
+    nscrollbar.add_markers('find', range(10000), '#ff0000')
+    overlay = nscrollbar._overlay
+    overlay.update_cache()
+    assert 0 < len(overlay.cache) <= nscrollbar.height()
+    assert overlay._pixmap is not None
+
+
+def test_priority_wins(nscrollbar):
+    nscrollbar.add_marker('checker', 10, '#00ff00', priority=1)
+    nscrollbar.add_marker('find', 10, '#ff0000')
+    overlay = nscrollbar._overlay
+    overlay.update_cache()
+    assert [marker.color for marker in overlay.cache.values()] == [
+        '#00ff00']
+    nscrollbar.remove_marker('checker')
+    overlay.update_cache()
+    assert [marker.color for marker in overlay.cache.values()] == [
+        '#ff0000']
+
+
+def test_categories_binned_independently(nscrollbar, monkeypatch):
+    nscrollbar.add_markers('find', range(100), '#ff0000')
+    nscrollbar.add_marker('current_line', 5, '#ffffff', priority=2)
+    overlay = nscrollbar._overlay
+    overlay.update_cache()
+    binned = []
+    bin_markers = overlay._bin
+    monkeypatch.setattr(
+        overlay, '_bin',
+        lambda markers: binned.append(len(markers)) or bin_markers(markers))
+    nscrollbar.remove_marker('current_line')
+    nscrollbar.add_marker('current_line', 50, '#ffffff', priority=2)
+    overlay.update_cache()
+    assert binned == [1]
+    # The geometry changed, every category is binned again
+    nscrollbar.resize(15, 400)
+    overlay.update_cache()
+    assert sorted(binned) == [1, 1, 100]
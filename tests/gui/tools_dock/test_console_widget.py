@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+from PyQt5.QtCore import QElapsedTimer
+from PyQt5.QtCore import QEventLoop
+from PyQt5.QtGui import QTextCursor
+
+import pytest
+
+from samurai_ide.core import settings
+from samurai_ide.gui.tools_dock import console_widget
+from samurai_ide.gui.tools_dock.console_widget import ConsoleSideBar
+
+
+@pytest.fixture
+def console(monkeypatch):
+    monkeypatch.setattr(settings, 'CONSOLE_MAX_LINES', 50)
+    widget = console_widget.ConsoleWidget()
+    yield widget
+    widget._kernel.shutdown()
+
+
+def _wait(condition):
+    loop = QEventLoop()
+    timer = QElapsedTimer()
+    timer.start()
+    while not condition() and timer.elapsed() < 20000:
+        loop.processEvents(QEventLoop.WaitForMoreEvents, 50)
+    assert condition()
+
+
+def _run(console, line):
+    console.moveCursor(QTextCursor.End)
+    console.insertPlainText(line)
+    console._write_command()
+    _wait(lambda: not console._kernel.busy)
+
+
+def _lines(console):
+    lines = []
+    block = console.document().firstBlock()
+    while block.isValid():
+        prompt = console.user_data(block).get('prompt')
+        lines.append((prompt, block.text()))
+        block = block.next()
+    return lines
+
+
+def test_command_output(console):
+    _run(console, 'for i in range(2):')
+    _run(console, 'print(i)')
+    _run(console, '')
+    assert _lines(console) == [
+        (None, 'for i in range(2):'),
+        (ConsoleSideBar.PROMPT_INCOMPLETE, '    print(i)'),
+        (ConsoleSideBar.PROMPT_INCOMPLETE, '    '),
+        (ConsoleSideBar.PROMPT_OUT, '0'),
+        (ConsoleSideBar.PROMPT_OUT, '1'),
+        (None, '')]
+
+
+def test_output_limit(console):
+    _run(console, 'for i in range(1000): print(i)')
+    _run(console, '')
+    lines = _lines(console)
+    assert len(lines) == 50
+    assert lines[-2] == (ConsoleSideBar.PROMPT_OUT, '999')
+
+
+def test_restart_while_busy(console):
+    console.moveCursor(QTextCursor.End)
+    console.insertPlainText('import time; time.sleep(60)')
+    console._write_command()
+    assert console._kernel.busy
+    console.restart()
+    assert not console._kernel.busy
+    assert _lines(console)[-2:] == [
+        (ConsoleSideBar.PROMPT_OUT, 'Console restarted'), (None, '')]
+    _run(console, 'print(6 * 7)')
+    assert _lines(console)[-2][1] == '42'
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+
+from samurai_ide.gui.tools_dock import find_in_files
+
+
+class BrokenIndex(object):
+
+    closed = False
+
+    def __init__(self, root, filters=None):
+        pass
+
+    def refresh(self, cancel_event=None):
+        raise OSError("disk full")
+
+    def close(self):
+        BrokenIndex.closed = True
+
+
+def test_failed_index_not_opened(monkeypatch, tmpdir):
+    monkeypatch.setattr(
+        find_in_files.search_index, 'TrigramIndex', BrokenIndex)
+    worker = find_in_files.SearchIndexWorker()
+    ready = []
+    worker.indexReady.connect(ready.append)
+    worker.open_index(str(tmpdir), ['*.py'])
+    assert ready == []
+    assert BrokenIndex.closed
+    assert worker._index_for(str(tmpdir.join('a.py'))) is None
+    # Nothing is watched yet
+    worker._indexes[str(tmpdir)] = BrokenIndex(str(tmpdir))
+    worker.close_index(str(tmpdir))
+    assert worker._indexes == {}
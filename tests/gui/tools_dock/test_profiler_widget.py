@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+from PyQt5.QtCore import QPointF
+
+from samurai_ide.tools import profile_data
+from samurai_ide.gui.tools_dock import profiler_widget
+
+
+def _result():
+    root = profile_data.Frame('all', value=10)
+    main = root.add(profile_data.Frame('main', '/tmp/main.py', 3, 10))
+    main.add(profile_data.Frame('slow', '/tmp/main.py', 9, 8))
+    main.add(profile_data.Frame('fast', '/tmp/main.py', 12, 2))
+    rows = [('fast', '/tmp/main.py', 12, 7, 0.002, 0.002),
+            ('slow', '/tmp/main.py', 9, 1, 0.008, 0.008)]
+    return profile_data.ProfileResult(profile_data.CPROFILE, rows, root)
+
+
+def test_show_result():
+    widget = profiler_widget.ProfilerWidget()
+    widget._show_result(_result())
+    model = widget._model
+    assert model.rowCount() == 2
+    assert model.index(0, 2).data() == '7'
+    assert model.index(1, 4).data() == '8.0 ms'
+    widget._table.sortByColumn(4, 1)
+    assert model.index(0, 0).data() == 'slow'
+    assert model.index(0, 0).data(profiler_widget.LOCATION_ROLE) == (
+        '/tmp/main.py', 9)
+
+
+def test_icicle_layout():
+    view = profiler_widget.IcicleView()
+    view.resize(100, 200)
+    view.set_root(_result().root, str)
+    view._rects = view._layout()
+    height = view.row_height
+    slow = view.frame_at(QPointF(10, height * 2.5))
+    fast = view.frame_at(QPointF(90, height * 2.5))
+    assert (slow.name, fast.name) == ('slow', 'fast')
+    assert view.frame_at(QPointF(10, height * 3.5)) is None
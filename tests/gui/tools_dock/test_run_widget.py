@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+import pytest
+
+from samurai_ide.core import settings
+from samurai_ide.gui.tools_dock import run_widget
+from samurai_ide.gui.tools_dock.run_widget import OutputWidget
+
+
+@pytest.fixture
+def output(monkeypatch):
+    monkeypatch.setattr(settings, 'OUTPUT_MAX_LINES', 100)
+    return OutputWidget(None)
+
+
+def test_output_buffered_until_flush(output):
+    output.write('first ', OutputWidget.Format.NORMAL)
+    output.write('line\r\nsecond', OutputWidget.Format.NORMAL)
+    output.write(' line\n', OutputWidget.Format.ERROR)
+    output.append_text('done')
+    assert output.toPlainText() == ''
+    assert len(output._pending) == 3
+    output.flush()
+    assert output.toPlainText() == 'first line\nsecond line\ndone\n'
+    assert output._pending == []
+
+
+def test_output_keeps_last_lines(output):
+    output.write(''.join('%d\n' % i for i in range(1000)))
+    output.write('partial')
+    output.flush()
+    assert output.blockCount() == 100
+    lines = output.toPlainText().split('\n')
+    assert lines[0] == '901'
+    assert lines[-1] == 'partial'
+
+
+def test_split_character_decoded():
+    decoder = run_widget._new_decoder()
+    data = 'ñandú\n'.encode('utf-8')
+    assert decoder.decode(data[:1]) + decoder.decode(data[1:]) == 'ñandú\n'
+
+
+def test_traceback_link_on_hover(output):
+    output.append_text('  File "/tmp/module.py", line 3, in <module>')
+    output.flush()
+    block = output.document().firstBlock()
+    output._show_link(block)
+    [selection] = output.extraSelections()
+    assert selection.cursor.selectedText() == block.text()
+    output._show_link(None)
+    assert output.extraSelections() == []
+
+
+def test_gray_out_old_text(output):
+    output.append_text('first run')
+    output.gray_out_old_text()
+    assert output.toPlainText() == 'first run\n\n'
+
+
+def test_log_output_widget(tmpdir):
+    from samurai_ide.gui.tools_dock.log_view import LogOutputWidget
+    outputw = LogOutputWidget(str(tmpdir.join('program.log')))
+    outputw.append_text('Running')
+    outputw.write('one\ntwo\n', OutputWidget.Format.ERROR)
+    outputw._search.setText('TWO')
+    outputw.find_next()
+    assert outputw.view.current_line == 2
+    assert outputw.log.lines(0, 3) == ['Running', 'one', 'two']
+    outputw.close_log()
+
+
+def test_targets_run_with_limit(monkeypatch):
+    from PyQt5.QtCore import QEventLoop
+    from PyQt5.QtCore import QTimer
+    monkeypatch.setattr(settings, 'MAX_PARALLEL_RUNS', 1)
+    widget = run_widget.RunWidget()
+    widget._queue.extend(
+        dict(name=name, args='-c "import sys; sys.exit(%d)"' % code)
+        for name, code in (('first', 0), ('second', 3)))
+    widget._start_queued()
+    assert len(widget._batch) == 1
+    loop = QEventLoop()
+    timeout = QTimer()
+    timeout.timeout.connect(loop.quit)
+    timeout.start(20000)
+    while widget._summary is None and timeout.isActive():
+        loop.processEvents(QEventLoop.WaitForMoreEvents, 100)
+    summary = widget._summary
+    assert summary is not None
+    assert [summary.item(row, 1).text() for row in range(2)] == [
+        'exit 0', 'exit 3']
+    assert widget._tabs.tabText(1) == 'second (exit 3)'
+
+
+@pytest.mark.parametrize('name', [
+    '-m pytest tests/unit', '/abs/path/main.py', '../..', ''])
+def test_log_path_inside_output_logs(name, monkeypatch, tmpdir):
+    from samurai_ide.gui.tools_dock import log_view
+    monkeypatch.setattr(log_view.resources, 'OUTPUT_LOGS', str(tmpdir))
+    path = log_view.new_log_path(name)
+    assert os.path.dirname(path) == str(tmpdir)
+    assert path.endswith('.log')
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import io
+import json
+import threading
+
+import pytest
+
+pytest.importorskip("jedi")
+
+from samurai_ide.intellisensei import jedi_server  # noqa
+from samurai_ide.intellisensei import intellisense_registry  # noqa
+from samurai_ide.intellisensei import python_intellisense  # noqa
+
+SOURCE = "import os\nos.pa"
+
+
+def serve(requests, cancelled=()):
+    stdin = io.StringIO(
+        "".join(json.dumps(request) + "\n" for request in requests))
+    stdout = io.StringIO()
+    server = jedi_server.Server(stdin, stdout)
+    server._cancelled.update(cancelled)
+    server.serve()
+    return [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+
+def completions_request(request_id, source=SOURCE, col=5):
+    return {"id": request_id, "method": "completions",
+            "params": {"source": source, "line": 2, "col": col,
+                       "path": "module.py"}}
+
+
+def test_completions_and_lazy_docstring():
+    responses = serve([
+        completions_request(1),
+        {"id": 2, "method": "docstring",
+         "params": {"completions_id": 1, "index": 0}}
+    ])
+    assert [response["id"] for response in responses] == [1, 2]
+    completions = responses[0]["result"]
+    assert "path" in [completion["text"] for completion in completions]
+    assert "detail" not in completions[0]
+    assert isinstance(responses[1]["result"], str)
+
+
+def test_cancelled_request_skipped():
+    responses = serve([completions_request(1), completions_request(2)],
+                      cancelled={1})
+    assert responses[0] == {"id": 1, "cancelled": True}
+    assert responses[1]["result"]
+
+
+def test_errors_reported():
+    responses = serve([{"id": 1, "method": "unknown", "params": {}}])
+    assert "error" in responses[0]
+
+
+def test_provider_filters_cached_completions(monkeypatch):
+    provider = python_intellisense.PythonProvider()
+    requests = []
+
+    def request(method, interpreter, **params):
+        requests.append(params)
+        return python_intellisense._Request(len(requests)), [
+            {"text": "path", "type": "module", "index": 0},
+            {"text": "pardir", "type": "statement", "index": 1},
+            {"text": "sep", "type": "statement", "index": 2}]
+
+    monkeypatch.setattr(provider, "_request", request)
+    provider._code_info = intellisense_registry.CodeInfo(
+        "completions", "import os\nos.", 2, 3, "module.py")
+    assert len(provider.completions()) == 3
+    provider._code_info = intellisense_registry.CodeInfo(
+        "completions", "import os\nos.pa", 2, 5, "module.py")
+    texts = [completion["text"] for completion in provider.completions()]
+    assert texts == ["path", "pardir"]
+    # Both asked for the completions after the dot
+    assert len(requests) == 1
+    provider._code_info = intellisense_registry.CodeInfo(
+        "completions", "import sys\nos.pa", 2, 5, "module.py")
+    provider.completions()
+    assert len(requests) == 2
+    assert requests[1]["col"] == 3
+
+
+def test_docstring_requested_without_blocking():
+    process = python_intellisense.JediProcess()
+    provider = python_intellisense.PythonProvider()
+    provider._processes[None] = process
+    try:
+        request = process.send(
+            "completions", source=SOURCE, line=2, col=5, path="module.py")
+        completions = process.wait(request, 30)
+        completion = {"interpreter": None, "completions_id": request.id,
+                      "index": completions[0]["index"]}
+        details = []
+        answered = threading.Event()
+
+        def callback(detail):
+            details.append(detail)
+            if len(details) == 2:
+                answered.set()
+
+        provider.request_detail(completion, callback)
+        # A newer request cancels the one not answered yet
+        provider.request_detail(completion, callback)
+        assert answered.wait(30)
+        assert isinstance(details[-1], str)
+    finally:
+        process.shutdown()
+
+
+def test_warmup_index_persisted(tmp_path):
+    server = jedi_server.Server(io.StringIO(), io.StringIO(),
+                                cache_dir=str(tmp_path))
+    assert server.do_warmup(1, ["json", "os.path"]) == ["json", "os.path"]
+    server.do_warmup(2, ["re", "json"])
+    server = jedi_server.Server(io.StringIO(), io.StringIO(),
+                                cache_dir=str(tmp_path))
+    assert list(server._warmup) == ["re", "json", "os.path"]
+
+
+def test_cache_folder_per_interpreter(tmp_path):
+    python = str(tmp_path / "bin" / "python3")
+    other = str(tmp_path / "venv" / "bin" / "python3")
+    folder = jedi_server.cache_folder("/cache", python, (3, 6, 1))
+    assert folder.startswith("/cache/python3-3.6-")
+    assert folder != jedi_server.cache_folder("/cache", python, (3, 7, 0))
+    assert folder != jedi_server.cache_folder("/cache", other, (3, 6, 1))
+
+
+def test_project_imports(tmp_path):
+    package = tmp_path / "package"
+    package.mkdir()
+    (package / "__init__.py").write_text(
+        "import os\nimport json\nfrom package import module\n")
+    (package / "module.py").write_text(
+        "import os\nfrom os.path import join\nfrom . import other\n")
+    (tmp_path / "broken.py").write_text("import (\n")
+    modules = python_intellisense.project_imports(str(tmp_path))
+    assert modules[0] == "os"
+    assert sorted(modules) == ["json", "os", "os.path"]
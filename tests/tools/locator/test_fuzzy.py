@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+from samurai_ide.tools.locator import fuzzy
+
+TEXTS = [
+    'samurai_ide/tools/locator/locator_widget.py',
+    'LocatorWidget',
+    'load_widgets',
+    'clock_window',
+    'reload',
+]
+
+
+def test_match():
+    assert fuzzy.match('lw', 'LocatorWidget') is not None
+    assert fuzzy.match('wl', 'LocatorWidget') is None
+    # Word starts are better than letters in the middle of a word
+    assert fuzzy.match('lw', 'load_widgets') > fuzzy.match('lw', 'clock_window')
+
+
+def test_search_ranking():
+    matcher = fuzzy.FuzzyMatcher(TEXTS)
+    results = [TEXTS[i] for i in matcher.search('locwid')]
+    assert results[0] == 'LocatorWidget'
+    assert 'samurai_ide/tools/locator/locator_widget.py' in results
+    assert 'load_widgets' not in results
+    assert [TEXTS[i] for i in matcher.search('tools/loc')][0] == TEXTS[0]
+
+
+def test_search_narrows_previous_results():
+    matcher = fuzzy.FuzzyMatcher(TEXTS)
+    matcher.search('lo')
+    assert len(matcher.search('low')) == 4
+    assert [TEXTS[i] for i in matcher.search('lowin')] == ['clock_window']
+    # Deleting characters starts again from all the texts
+    assert len(matcher.search('l')) == 5
+
+
+def test_search_category():
+    matcher = fuzzy.FuzzyMatcher(TEXTS, ['@', '<', '>', '>', '>'])
+    assert matcher.search('lw', '<') == [1]
+    assert matcher.search('xyz', '@') == []
+
+
+def test_rank():
+    assert fuzzy.rank(['foo_bar', 'fb', 'other'], 'fb') == ['fb', 'foo_bar']
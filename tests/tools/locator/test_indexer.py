@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from samurai_ide.tools.locator import indexer
+
+SOURCE = '''
+CONSTANT = 1
+
+
+class Foo(object):
+    attr = 2
+
+    def method(self):
+        def inner():
+            pass
+
+    class Bar:
+        pass
+
+
+def function():
+    pass
+'''
+
+
+def test_parse_files(tmpdir):
+    module = tmpdir.join('module.py')
+    module.write(SOURCE)
+    broken = str(tmpdir.join('missing.py'))
+    results = dict(indexer.parse_files([str(module), broken]))
+    assert results[broken] is None
+    assert sorted(results[str(module)], key=lambda item: item[2]) == [
+        ('-', 'CONSTANT', 1, ''),
+        ('<', 'Foo(object)', 4, ''),
+        ('-', 'attr', 5, 'Foo'),
+        ('>', 'method()', 7, 'Foo'),
+        ('>', 'inner()', 8, 'method'),
+        ('<', 'Bar()', 11, 'Foo'),
+        ('>', 'function()', 15, ''),
+    ]
+
+
+def test_file_signature_changes(tmpdir):
+    module = tmpdir.join('module.py')
+    module.write('a = 1')
+    signature = indexer.file_signature(os.stat(str(module)))
+    assert signature == indexer.file_signature(os.stat(str(module)))
+    module.write('a = 10')
+    assert signature != indexer.file_signature(os.stat(str(module)))
+
+
+def test_stop_executor_cancels_pending():
+    executor = ThreadPoolExecutor(1)
+    started = threading.Event()
+    release = threading.Event()
+
+    def work():
+        started.set()
+        release.wait(10)
+
+    futures = [executor.submit(work), executor.submit(work)]
+    started.wait(10)
+    indexer.stop_executor(executor, futures)
+    release.set()
+    assert futures[1].cancelled()
+    assert futures[0].result() is None
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from samurai_ide.tools.locator import symbols_db
+
+
+def _create_db(tmpdir):
+    db = symbols_db.SymbolsDB(str(tmpdir.join('locator.db')))
+    db.set_projects(['/project'])
+    db.save_file('/project', '/project/module.py', (1, 2, 3),
+                 ('@', 'module.py'), [
+                     ('<', 'Foo(object)', 4, ''),
+                     ('>', 'method()', 7, 'Foo'),
+                     ('-', 'attr', 5, 'Foo'),
+                     ('>', 'function_name()', 15, '')])
+    db.commit()
+    return db
+
+
+def test_query(tmpdir):
+    db = _create_db(tmpdir)
+    assert [item.name for item in db.query('METH')] == ['method()']
+    assert [item.name for item in db.query('fu')] == ['function_name()']
+    assert [item.name for item in db.query('_')] == ['function_name()']
+    results = db.query(kind='>')
+    assert len(results) == 2
+    assert [item.name for item in results[:1]] == ['function_name()']
+    assert db.signatures() == {'/project/module.py': (1, 2, 3)}
+    db.close()
+
+
+def test_query_other_projects(tmpdir):
+    db = _create_db(tmpdir)
+    db.set_projects([])
+    assert len(db.query('Foo')) == 0
+    db.close()
+
+
+def test_definitions_and_file_symbols(tmpdir):
+    db = _create_db(tmpdir)
+    assert [item.lineno for item in db.definitions('Foo')] == [4]
+    assert [item.lineno for item in db.definitions('attr', True)] == [5]
+    assert len(db.file_symbols('/project/module.py')) == 4
+    db.save_file('/project', '/project/module.py', (4, 5, 6),
+                 ('@', 'module.py'), [('>', 'other()', 0, '')])
+    db.commit()
+    assert [item.name for item in db.file_symbols(
+        '/project/module.py')] == ['other()']
+    assert db.signature('/project/module.py') == (4, 5, 6)
+    db.close()
+
+
+def test_substring_query_uses_trigram_index(tmpdir):
+    db = _create_db(tmpdir)
+    if not db.has_fts:
+        db.close()
+        pytest.skip("SQLite without the trigram tokenizer")
+    where, args = db._where('ion_na')
+    plan = db._db.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM symbols WHERE " + where,
+        args).fetchall()
+    details = [row[-1] for row in plan]
+    assert any('symbols_fts VIRTUAL TABLE INDEX 0:M' in detail
+               for detail in details), details
+    assert [item.name for item in db.query('ION_NA')] == ['function_name()']
+    assert len(db.query('n%e')) == 0
+    assert len(db.query('"me')) == 0
+    db.close()
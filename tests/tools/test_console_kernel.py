@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import sys
+import json
+import signal
+import subprocess
+
+import pytest
+
+from samurai_ide.tools import console_kernel
+
+
+@pytest.fixture
+def kernel():
+    process = subprocess.Popen(
+        [sys.executable, '-u', console_kernel.__file__],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        universal_newlines=True)
+    assert json.loads(process.stdout.readline())['ready']
+    yield process
+    process.kill()
+    process.wait()
+
+
+def _push(kernel, line, request_id=1):
+    kernel.stdin.write(json.dumps(
+        {'id': request_id, 'method': 'push', 'params': {'line': line}}) + '\n')
+    kernel.stdin.flush()
+
+
+def _messages(kernel, request_id=1):
+    """Return the output and the result of request_id"""
+    output = []
+    for line in kernel.stdout:
+        message = json.loads(line)
+        if 'stream' in message:
+            output.append((message['stream'], message['text']))
+        elif message.get('id') == request_id:
+            return output, message['result']
+
+
+def test_push(kernel):
+    _push(kernel, 'for i in range(3):')
+    assert _messages(kernel) == ([], {'more': True})
+    _push(kernel, '    print(i)')
+    _messages(kernel)
+    _push(kernel, '')
+    assert _messages(kernel) == ([('stdout', '0\n1\n2\n')], {'more': False})
+    _push(kernel, 'i * 2')
+    assert _messages(kernel) == ([('stdout', '4\n')], {'more': False})
+
+
+def test_error(kernel):
+    _push(kernel, '1 / 0')
+    output, result = _messages(kernel)
+    assert output[-1][0] == 'stderr'
+    assert output[-1][1].endswith('ZeroDivisionError: division by zero\n')
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='no SIGINT')
+def test_interrupt(kernel):
+    _push(kernel, "import time; print('start'); time.sleep(60)")
+    assert json.loads(kernel.stdout.readline()) == {
+        'stream': 'stdout', 'text': 'start\n'}
+    kernel.send_signal(signal.SIGINT)
+    output, result = _messages(kernel)
+    assert output[-1][1].endswith('KeyboardInterrupt\n')
+    _push(kernel, 'print(1)', 2)
+    assert _messages(kernel, 2) == ([('stdout', '1\n')], {'more': False})
+
+
+def test_exit(kernel):
+    _push(kernel, 'exit()')
+    assert kernel.wait(10) == 0
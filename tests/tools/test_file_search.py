@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+import pytest
+
+from samurai_ide.tools import file_search
+
+
+@pytest.fixture
+def tree(tmpdir):
+    tmpdir.join('a.py').write('import os\nfoo = 1\n\nprint(foo)')
+    tmpdir.mkdir('pkg').join('b.py').write('bar = 2\n')
+    tmpdir.join('pkg', 'c.txt').write('foo\n')
+    tmpdir.mkdir('.git').join('d.py').write('foo\n')
+    return str(tmpdir)
+
+
+@pytest.mark.parametrize(
+    'text, cs, regex, wo, expected',
+    [
+        ('foo', True, False, False, [(1, 'foo = 1'), (3, 'print(foo)')]),
+        ('FOO', False, False, False, [(1, 'foo = 1'), (3, 'print(foo)')]),
+        ('FOO', True, False, False, []),
+        ('^f.o', True, True, False, [(1, 'foo = 1')]),
+        ('o', True, False, True, []),
+        ('os foo', True, False, True,
+         [(0, 'import os'), (1, 'foo = 1'), (3, 'print(foo)')]),
+    ]
+)
+def test_grep_text(text, cs, regex, wo, expected):
+    pattern = file_search.compile_pattern(text, cs, regex, wo)
+    assert file_search.grep_text(
+        'import os\nfoo = 1\n\nprint(foo)', pattern) == expected
+
+
+def test_walk_files_skips_hidden_and_filters(tree):
+    found = sorted(os.path.relpath(path, tree) for path, _ in
+                   file_search.walk_files(tree, ['*.py']))
+    assert found == ['a.py', os.path.join('pkg', 'b.py')]
+    found = [os.path.relpath(path, tree) for path, _ in
+             file_search.walk_files(tree, ['*.py'], recursive=False)]
+    assert found == ['a.py']
+
+
+def test_search_engine_streams_results(tree):
+    engine = file_search.SearchEngine(workers=2, use_processes=False)
+    batches = []
+    pattern = file_search.compile_pattern('foo')
+    stats = engine.search(tree, ['*.py'], pattern, on_results=batches.append)
+    engine.shutdown()
+    results = [result for batch in batches for result in batch]
+    assert results == [
+        (os.path.join(tree, 'a.py'), [(1, 'foo = 1'), (3, 'print(foo)')])]
+    assert stats.files == 2
+    assert stats.matches == 2
+    assert not stats.cancelled
+
+
+def test_search_engine_cancel_previous_search(tree):
+    engine = file_search.SearchEngine(workers=1, use_processes=False)
+    engine.cancel()
+    pattern = file_search.compile_pattern('foo')
+    # Cancelling the previous search doesn't affect the next one
+    stats = engine.search(tree, ['*.py'], pattern)
+    engine.shutdown()
+    assert stats.files == 2
+    assert not stats.cancelled
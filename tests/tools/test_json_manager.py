@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+import json
+import threading
+import time
+
+import pytest
+
+from samurai_ide.core import settings
+from samurai_ide.tools import json_manager
+
+
+@pytest.fixture
+def syntaxes(tmpdir, monkeypatch):
+    monkeypatch.setattr(settings, 'SYNTAX', {})
+    folder = tmpdir.mkdir('syntaxes')
+    folder.join('python.json').write(json.dumps({'extension': ['py']}))
+    folder.join('html.json').write(json.dumps({'extension': ['html']}))
+    folder.join('README').write('not a syntax')
+    return folder
+
+
+def test_load_syntax_parses_on_first_use(syntaxes, tmpdir):
+    json_manager.load_syntax(str(syntaxes), str(tmpdir.join('bundle.json')))
+    assert sorted(settings.SYNTAX.keys()) == ['html', 'python']
+    assert settings.SYNTAX._syntaxes['python'] is None
+    assert settings.SYNTAX['python'] == {'extension': ['py']}
+    assert settings.SYNTAX._syntaxes['html'] is None
+
+
+def test_load_syntax_from_bundle(syntaxes, tmpdir):
+    bundle = str(tmpdir.join('bundle.json'))
+    json_manager.load_syntax(str(syntaxes), bundle)
+    # The files aren't read while the bundle is up to date
+    syntaxes.join('python.json').rename(tmpdir.join('moved.json'))
+    syntaxes.join('python.json').write('{}')
+    signature = json_manager._syntax_signature(str(syntaxes))
+    with open(bundle) as fp:
+        content = json.load(fp)
+    content['signature'] = signature
+    with open(bundle, 'w') as fp:
+        json.dump(content, fp)
+    json_manager.load_syntax(str(syntaxes), bundle)
+    assert settings.SYNTAX['python'] == {'extension': ['py']}
+
+
+def test_load_syntax_outdated_bundle(syntaxes, tmpdir):
+    bundle = str(tmpdir.join('bundle.json'))
+    json_manager.load_syntax(str(syntaxes), bundle)
+    syntaxes.join('css.json').write(json.dumps({'extension': ['css']}))
+    json_manager.load_syntax(str(syntaxes), bundle)
+    assert settings.SYNTAX['css'] == {'extension': ['css']}
+
+
+def test_syntax_kept_when_parse_fails(monkeypatch):
+    bundle = json_manager.SyntaxBundle({'python': '{"extension": ["py"]}'})
+
+    def broken(source):
+        raise MemoryError()
+
+    monkeypatch.setattr(json_manager, 'parse', broken)
+    with pytest.raises(MemoryError):
+        bundle['python']
+    monkeypatch.undo()
+    assert bundle['python'] == {'extension': ['py']}
+    assert bundle['python'] == {'extension': ['py']}
+
+
+def test_syntax_parsed_once_by_threads(monkeypatch):
+    bundle = json_manager.SyntaxBundle({'python': '{"extension": ["py"]}'})
+    parse = json_manager.parse
+    parsed = []
+
+    def slow_parse(source):
+        parsed.append(source)
+        time.sleep(0.05)
+        return parse(source)
+
+    monkeypatch.setattr(json_manager, 'parse', slow_parse)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(
+        bundle['python'])) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [{'extension': ['py']}] * 4
+    assert len(parsed) == 1
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+from samurai_ide.tools import lint
+
+
+def test_lint_files(tmpdir):
+    results = dict(lint.lint_files([
+        ('module.py', 'import os\n'),
+        ('broken.py', 'x = 1\ndef (:\n'),
+    ]))
+    assert results['module.py'] == [
+        (0, 0, "'os' imported but unused", 'import os')]
+    [(lineno, col, message, line)] = results['broken.py']
+    assert lineno == 1
+    assert message.startswith('[Error]:')
+    assert line == ''
+
+
+def test_cache_key_init_file():
+    assert lint.cache_key('pkg/module.py', 'abc') != \
+        lint.cache_key('pkg/__init__.py', 'abc')
+    assert lint.cache_key('a.py', 'abc') == lint.cache_key('b.py', 'abc')
+
+
+def test_lint_cached_by_content():
+    lint.cache.clear()
+    messages = lint.lint('a.py', 'import sys\n')
+    assert lint.lint('b.py', 'import sys\n') is messages
+    assert lint.lint('a.py', 'import sys\nsys.exit()\n') == []
+
+
+def test_cache_size():
+    cache = lint.LintCache(size=2)
+    for key in 'abc':
+        cache.put(key, [])
+    assert cache.get('a') is None
+    assert cache.get('c') == []
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import sys
+
+import pytest
+
+from samurai_ide.dependencies import notimportchecker
+from samurai_ide.tools import module_resolver
+from samurai_ide.tools.module_resolver import ModuleResolver
+
+
+@pytest.fixture
+def resolver():
+    resolver = ModuleResolver()
+    yield resolver
+    resolver.shutdown()
+
+
+def test_find_missing_in_process():
+    assert notimportchecker.find_missing(
+        ['os', 'os.path', 'json.decoder', 'not_a_module',
+         'json.not_a_module']) == ['not_a_module', 'json.not_a_module']
+
+
+def test_checker_skips_relative_imports(tmpdir):
+    module = tmpdir.join('module.py')
+    module.write('import os\nimport sibling\nimport missing_module\n'
+                 'from . import relative\n')
+    tmpdir.join('sibling.py').write('')
+    checker = notimportchecker.Checker(str(module))
+    not_imports = checker.get_not_imports_on_file(checker.get_imports())
+    assert list(not_imports.keys()) == ['missing_module']
+
+
+def test_resolver(resolver, tmpdir):
+    folder = str(tmpdir)
+    assert resolver.find_missing(
+        sys.executable, ['os', 'sibling'], [folder]) == ['sibling']
+    # Cached, the interpreter is not asked again
+    resolver._request = None
+    assert resolver.find_missing(
+        sys.executable, ['sibling', 'os'], [folder]) == ['sibling']
+
+
+def test_resolver_notices_new_modules(resolver, tmpdir):
+    folder = str(tmpdir)
+    assert resolver.find_missing(
+        sys.executable, ['sibling'], [folder]) == ['sibling']
+    sibling = tmpdir.join('sibling.py')
+    sibling.write('')
+    # Make sure the mtime of the folder changes
+    tmpdir.setmtime(tmpdir.mtime() + 10)
+    assert resolver.find_missing(sys.executable, ['sibling'], [folder]) == []
+
+
+def test_resolver_bad_interpreter(resolver):
+    assert resolver.find_missing('/not/a/python', ['not_a_module']) == []
+
+
+def test_resolver_timeout(resolver, monkeypatch, tmpdir):
+    script = tmpdir.join('server.py')
+    script.write('import sys, time\nsys.stdin.readline()\ntime.sleep(60)\n')
+    monkeypatch.setattr(module_resolver, '_SERVER_SCRIPT', str(script))
+    monkeypatch.setattr(module_resolver, 'REQUEST_TIMEOUT', 0.5)
+    assert resolver.find_missing(sys.executable, ['not_a_module']) == []
+    # The server was killed and the module is still unknown
+    assert resolver._servers == {}
+    monkeypatch.undo()
+    assert resolver.find_missing(
+        sys.executable, ['not_a_module']) == ['not_a_module']
+
+
+def test_resolver_notices_installed_packages(resolver, monkeypatch, tmpdir):
+    site = tmpdir.mkdir('site-packages')
+    # A folder of the sys.path of the interpreter, not of the project
+    monkeypatch.setenv('PYTHONPATH', str(site))
+    assert resolver.find_missing(
+        sys.executable, ['installed']) == ['installed']
+    site.join('installed.py').write('')
+    site.setmtime(site.mtime() + 10)
+    assert resolver.find_missing(sys.executable, ['installed']) == []
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from samurai_ide.tools import output_log
+
+
+@pytest.fixture
+def log(tmpdir, monkeypatch):
+    # Small steps to use the index with a few lines
+    monkeypatch.setattr(output_log, 'INDEX_STEP', 16)
+    log = output_log.OutputLog(str(tmpdir.join('logs', 'program.log')))
+    yield log
+    log.close()
+
+
+def test_lines(log):
+    text = ''.join('line %d\n' % i for i in range(100)) + 'last'
+    for i in range(0, len(text), 7):
+        log.write(text[i:i + 7].encode('utf-8'))
+    assert log.line_count == 101
+    assert len(log._index_lines) > 10
+    assert log.lines(0, 2) == ['line 0', 'line 1']
+    assert log.lines(57, 2) == ['line 57', 'line 58']
+    assert log.lines(99, 5) == ['line 99', 'last']
+    assert log.lines(200, 5) == []
+    for lineno in (0, 33, 100):
+        assert log.line_at(log.line_offset(lineno)) == lineno
+
+
+def test_find_wraps(log):
+    log.write(b'alpha\nbeta\ngamma\nBeta\n')
+    assert log.find('beta') == 1
+    assert log.find('beta', 2) == 3
+    assert log.find('beta', 2, case_sensitive=True) == 1
+    assert log.find('delta') == -1
+
+
+def test_close_removes_file(tmpdir):
+    path = tmpdir.join('program.log')
+    log = output_log.OutputLog(str(path))
+    log.write('ñ\n'.encode('utf-8'))
+    assert log.lines(0, 1) == ['ñ']
+    log.close()
+    assert not path.exists()
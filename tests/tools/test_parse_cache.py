@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+
+from samurai_ide.tools import parse_cache
+
+SOURCE = '''
+class Foo(object):
+
+    def method(self):
+        pass
+
+
+def function():
+    pass
+'''
+
+
+def test_parse_result():
+    result = parse_cache.parse_source('module.py', SOURCE)
+    assert result.error is None
+    assert sorted(result.symbols) == ['classes', 'functions']
+    assert sorted(result.symbols_simplified) == [2, 4, 8]
+
+
+def test_parse_syntax_error():
+    result = parse_cache.parse_source('module.py', 'def (:\n')
+    assert result.tree is None
+    assert isinstance(result.error, SyntaxError)
+    assert result.symbols == {}
+
+
+def test_cache_parses_once(monkeypatch):
+    calls = []
+    parse_source = parse_cache.parse_source
+
+    def counting_parse(*args):
+        calls.append(args[0])
+        return parse_source(*args)
+
+    monkeypatch.setattr(parse_cache, 'parse_source', counting_parse)
+    cache = parse_cache.ParseCache(size=2)
+    threads = [threading.Thread(target=cache.get, args=('a.py', SOURCE))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.get('a.py', SOURCE) is cache.lookup('a.py', SOURCE)
+    assert calls == ['a.py']
+    # Other content or other path is another entry
+    assert cache.get('a.py', SOURCE + '\n') is not cache.get('a.py', SOURCE)
+    assert cache.lookup('b.py', SOURCE) is None
+
+
+def test_cache_evicts_least_recently_used():
+    cache = parse_cache.ParseCache(size=2)
+    cache.get('a.py', 'a = 1')
+    cache.get('b.py', 'b = 1')
+    cache.lookup('a.py', 'a = 1')
+    cache.get('c.py', 'c = 1')
+    assert cache.lookup('b.py', 'b = 1') is None
+    assert cache.lookup('a.py', 'a = 1') is not None
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import sys
+
+import pytest
+
+from samurai_ide.tools import process_stats
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'),
+                    reason='/proc is only on linux')
+def test_sample_current_process():
+    stats = process_stats.ProcessStats(os.getpid())
+    assert stats.sample()
+    sum(range(10 ** 6))
+    assert stats.sample()
+    assert stats.cpu_time > 0
+    assert stats.cpu_percent >= 0
+    assert 0 < stats.rss <= stats.peak_rss
+
+
+def test_sample_missing_process():
+    # Above the maximum pid of linux
+    assert not process_stats.ProcessStats(2 ** 23).sample()
+
+
+def test_format_size():
+    assert process_stats.format_size(512) == '512 B'
+    assert process_stats.format_size(1536) == '1.5 KB'
+    assert process_stats.format_size(3 * 1024 ** 3) == '3.0 GB'
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import sys
+import subprocess
+
+import pytest
+
+from samurai_ide.tools import profile_data
+
+PROGRAM = '''
+def fib(n):
+    return n if n < 2 else fib(n - 1) + fib(n - 2)
+
+
+def build():
+    return [str(i) * 10 for i in range(20000)]
+
+
+data = build()
+total = sum(fib(15) for _ in range(3))
+'''
+
+
+@pytest.fixture
+def program(tmpdir):
+    path = tmpdir.join('program.py')
+    path.write(PROGRAM)
+    return str(path)
+
+
+def _run(kind, program, output):
+    subprocess.check_call(
+        [sys.executable, profile_data.RUNNER, kind, output, program])
+
+
+def _names(frame):
+    yield frame.name
+    for child in frame.children:
+        yield from _names(child)
+
+
+def test_cprofile(program, tmpdir):
+    output = str(tmpdir.join('program.prof'))
+    _run(profile_data.CPROFILE, program, output)
+    result = profile_data.load(profile_data.CPROFILE, output)
+    functions = {row[0]: row for row in result.rows}
+    assert functions['fib'][1] == program
+    assert functions['fib'][2] == 2
+    # Called recursively
+    assert functions['fib'][3] > 3
+    assert 'run' not in functions
+    names = list(_names(result.root))
+    assert 'build' in names and 'fib' in names
+    assert not any(row[1] == profile_data.RUNNER for row in result.rows)
+    [module] = [child for child in result.root.children[0].children
+                if child.name == '<module>']
+    assert sum(child.value for child in module.children) <= module.value
+
+
+def test_tracemalloc(program, tmpdir):
+    output = str(tmpdir.join('program.snapshot'))
+    _run(profile_data.TRACEMALLOC, program, output)
+    result = profile_data.load(profile_data.TRACEMALLOC, output)
+    name, path, lineno, size, count = result.rows[0]
+    assert (path, lineno) == (program, 7)
+    assert name == 'return [str(i) * 10 for i in range(20000)]'
+    assert count >= 20000
+    assert result.total >= size
+    # The oldest frame is the module, not the runner
+    top = result.root.children[0]
+    assert (top.path, top.lineno) == (program, 10)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Samurai-IDE (https://samurai-ide.org).
+#
+# Samurai-IDE is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3 of the License, or
+# any later version.
+#
+# Samurai-IDE is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Samurai-IDE; If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+import pytest
+
+from samurai_ide.tools import file_search
+from samurai_ide.tools import search_index
+
+
+@pytest.fixture
+def index(tmpdir):
+    tmpdir.join('a.py').write('def hello_world():\n    pass\n')
+    tmpdir.mkdir('pkg').join('b.py').write('HELLO = "moon"\n')
+    tmpdir.join('pkg', 'c.txt').write('hello world\n')
+    root = str(tmpdir)
+    index = search_index.TrigramIndex(
+        root, ['*.py'], db_path=str(tmpdir.join('.index.db')))
+    index.refresh()
+    yield index
+    index.close()
+
+
+def _candidates(index, text, **kwargs):
+    pattern = file_search.compile_pattern(text, **kwargs)
+    candidates = index.candidates(pattern)
+    if candidates is None:
+        return None
+    return sorted(os.path.relpath(path, index.root) for path in candidates)
+
+
+@pytest.mark.parametrize(
+    'text, kwargs, expected',
+    [
+        ('hello', {}, ['a.py', os.path.join('pkg', 'b.py')]),
+        ('hello_world', {}, ['a.py']),
+        ('moon', {'case_sensitive': False}, [os.path.join('pkg', 'b.py')]),
+        ('nothing', {}, []),
+        ('pass moon', {'whole_words': True},
+         ['a.py', os.path.join('pkg', 'b.py')]),
+        (r'def \w+_world', {'regex': True}, ['a.py']),
+        ('he', {}, None),
+        ('.*', {'regex': True}, None),
+    ]
+)
+def test_candidates(index, text, kwargs, expected):
+    assert _candidates(index, text, **kwargs) == expected
+
+
+def test_update_file(index):
+    path = os.path.join(index.root, 'a.py')
+    with open(path, 'w') as fileobj:
+        fileobj.write('goodbye = True\n')
+    # Make sure the size changed, mtime resolution could be too coarse
+    assert index.update_file(path) == 1
+    assert _candidates(index, 'hello_world') == []
+    assert _candidates(index, 'goodbye') == ['a.py']
+    os.remove(path)
+    index.update_file(path)
+    assert _candidates(index, 'goodbye') == []
+
+
+def test_update_directory(index):
+    folder = os.path.join(index.root, 'pkg')
+    os.mkdir(os.path.join(folder, 'sub'))
+    with open(os.path.join(folder, 'sub', 'd.py'), 'w') as fileobj:
+        fileobj.write('hello_world()\n')
+    os.remove(os.path.join(folder, 'b.py'))
+    folders = index.update_directory(folder)
+    assert os.path.join(folder, 'sub') in folders
+    assert _candidates(index, 'hello') == [
+        'a.py', os.path.join('pkg', 'sub', 'd.py')]
+
+
+def test_refresh_skips_unchanged_files(index):
+    index.refresh()
+    assert index.update_file(os.path.join(index.root, 'a.py')) == 0
+
+
+def test_update_changed_files(index):
+    path = os.path.join(index.root, 'pkg', 'b.py')
+    # Rewritten in place without telling the index
+    with open(path, 'w') as fileobj:
+        fileobj.write('GOODBYE = "moon"\n')
+    assert _candidates(index, 'goodbye') == []
+    assert index.update_changed_files() == 1
+    assert _candidates(index, 'goodbye') == [os.path.join('pkg', 'b.py')]
+    assert index.update_changed_files() == 0